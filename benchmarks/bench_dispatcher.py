@@ -0,0 +1,114 @@
+"""
+Cost of keeping a day of posts on PostDispatcher, compared with one APScheduler 'date' job per post.
+
+For each plan size both run the same no-op coroutine jobs and are timed on:
+
+- add, scheduling every post an hour ahead
+- reschedule and remove, moving or dropping a tenth of them each, as a reloaded plan does
+- dispatch, running posts spread over one second, with the lateness of each run reported as percentiles
+
+Usage:
+    python -m benchmarks.bench_dispatcher --posts 10000 100000 [--dispatch-window 1.0]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from task_management.scheduling.async_task_scheduler import AsyncTaskScheduler
+from task_management.scheduling.post_dispatcher import PostDispatcher
+
+
+class APSchedulerAdapter:
+    """One 'date' job per post, the way PostExecutor used the AsyncTaskScheduler."""
+
+    def __init__(self):
+        self.scheduler = AsyncTaskScheduler()
+
+    def start(self):
+        self.scheduler.start()
+
+    def shutdown(self):
+        self.scheduler.shutdown(wait=False)
+
+    def add_job(self, job_id, run_date, func, args):
+        self.scheduler.add_job(func, 'date', run_date=run_date, args=args, id=job_id, replace_existing=True)
+
+    def reschedule_job(self, job_id, run_date):
+        self.scheduler.reschedule_job(job_id, trigger='date', run_date=run_date)
+
+    def remove_job(self, job_id):
+        self.scheduler.remove_job(job_id)
+
+
+async def benchmark(create, num_posts: int, dispatch_window: float) -> Dict[str, float]:
+    """Returns the seconds of every stage and the lateness percentiles of the dispatched posts."""
+    results = {}
+    lateness = []
+
+    async def post(due: float):
+        lateness.append(time.time() - due)
+
+    async def noop():
+        pass
+
+    scheduler = create()
+    scheduler.start()
+    later = datetime.now() + timedelta(hours=1)
+    start = time.perf_counter()
+    for i in range(num_posts):
+        scheduler.add_job(f'plan:{i}', later + timedelta(milliseconds=i), noop, [])
+    results['add'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, num_posts, 10):
+        scheduler.reschedule_job(f'plan:{i}', later + timedelta(minutes=30, milliseconds=i))
+    results['reschedule'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(5, num_posts, 10):
+        scheduler.remove_job(f'plan:{i}')
+    results['remove'] = time.perf_counter() - start
+
+    # The posts due now share the scheduler with the ones due later
+    first_due = time.time() + 0.5
+    for i in range(num_posts):
+        due = first_due + dispatch_window * i / num_posts
+        scheduler.add_job(f'now:{i}', datetime.fromtimestamp(due), post, [due])
+    while len(lateness) < num_posts and time.time() < first_due + dispatch_window + 120:
+        await asyncio.sleep(0.05)
+    scheduler.shutdown()
+
+    lateness.sort()
+    results['dispatched'] = len(lateness)
+    results['lateness p50'] = statistics.median(lateness)
+    results['lateness p99'] = lateness[int(len(lateness) * 0.99) - 1]
+    results['lateness max'] = lateness[-1]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--dispatch-window', type=float, default=1.0, help='Seconds the dispatched posts span')
+    args = parser.parse_args()
+
+    schedulers = {'APScheduler': APSchedulerAdapter, 'PostDispatcher': PostDispatcher}
+    for num_posts in args.posts:
+        print(f'{num_posts:,} posts')
+        results: Dict[str, Dict[str, float]] = {name: asyncio.run(benchmark(create, num_posts, args.dispatch_window))
+                                                for name, create in schedulers.items()}
+        stages: List[str] = list(results['APScheduler'])
+        print(f"  {'':<36}{'APScheduler':>14}{'PostDispatcher':>16}")
+        for stage in stages:
+            values = [results[name][stage] for name in schedulers]
+            if stage == 'dispatched':
+                print(f"  {stage + ':':<36}{values[0]:14,.0f}{values[1]:16,.0f}")
+            else:
+                print(f"  {stage + ':':<36}{values[0]:12.3f} s{values[1]:14.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Throughput of the shared HTTP client against the local mock Graph API server.
+
+Compares the pooled SharedHttpClient with opening a new session per request, which is what every bot
+making its own requests would do.
+
+Usage:
+    python -m benchmarks.bench_http_throughput --requests 5000 --concurrency 100 --latency 0.01
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+
+from bot_manager.bot_core.http_client import SharedHttpClient
+from bot_manager.bot_core.mock_platform_server import MockPlatformServer
+from config import HTTP_CONFIG
+
+
+async def run_requests(send, num_requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await send(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(num_requests)))
+    return time.perf_counter() - start
+
+
+async def benchmark(num_requests: int, concurrency: int, latency: float):
+    server = MockPlatformServer(latency=latency)
+    base_url = await server.start()
+    client = SharedHttpClient({**HTTP_CONFIG, 'graph_api_url': base_url,
+                               'max_connections': concurrency, 'max_connections_per_host': concurrency})
+    data = {'access_token': 'token', 'message': 'benchmark'}
+
+    async def pooled(i):
+        await client.post('me/feed', data=data)
+
+    async def unpooled(i):
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f'{base_url}/me/feed', data=data) as response:
+                await response.json()
+
+    try:
+        results = {
+            'shared pooled client': await run_requests(pooled, num_requests, concurrency),
+            'session per request': await run_requests(unpooled, num_requests, concurrency),
+        }
+    finally:
+        await client.close()
+        await server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.01, help='Seconds the mock server delays each request')
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args.requests, args.concurrency, args.latency))
+    print(f'{args.requests:,} requests, concurrency {args.concurrency}, server latency {args.latency * 1000:.0f} ms')
+    for name, seconds in results.items():
+        print(f"  {name + ':':<24}{seconds:8.2f} s {args.requests / seconds:10.0f} req/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Cold start-up cost of importing the application's entry modules, measured with `python -X importtime`.
+
+Every import runs in a fresh interpreter, after one untimed run that compiles the bytecode, and the median of the
+repeats is reported together with the packages that take the most time. The benchmark exits with status 1 when
+a module's import goes over its budget, so it can gate CI.
+
+Usage:
+    python -m benchmarks.bench_import_time --repeat 5 [--budget main=1500] [modules ...]
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Milliseconds of cumulative import time per module; main necessarily loads pandas, aiohttp and APScheduler
+BUDGETS_MS = {
+    'logger_config': 150,
+    'task_management': 150,
+    'social_media': 150,
+    'sharding': 300,
+    'main': 2500,
+}
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def measure_import(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Imports a module in a fresh interpreter.
+
+    :return: The module's cumulative import time in milliseconds, and the self time in milliseconds of every
+    top-level package it imported.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    total = 0.0
+    packages = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        packages[name.split('.')[0]] += int(self_us) / 1000
+        if not indent and name == module:
+            total = int(cumulative_us) / 1000
+    return total, packages
+
+
+def benchmark(module: str, repeat: int) -> Tuple[float, Dict[str, float]]:
+    """Returns the median cumulative import time and the median self time per package, in milliseconds."""
+    measure_import(module)  # Compile the bytecode and warm the file system cache
+    runs = [measure_import(module) for _ in range(repeat)]
+    packages = {package: statistics.median(run[1].get(package, 0.0) for run in runs)
+                for package in set().union(*(run[1] for run in runs))}
+    return statistics.median(run[0] for run in runs), packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=list(BUDGETS_MS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5, help='Packages to list per module')
+    parser.add_argument('--budget', action='append', default=[], metavar='MODULE=MS',
+                        help='Override the budget of a module')
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS_MS)
+    for budget in args.budget:
+        module, _, milliseconds = budget.partition('=')
+        budgets[module] = float(milliseconds)
+
+    over_budget = []
+    print(f'Median of {args.repeat} cold imports, Python {sys.version.split()[0]}')
+    for module in args.modules:
+        total, packages = benchmark(module, args.repeat)
+        budget = budgets.get(module)
+        verdict = '' if budget is None else f' (budget {budget:,.0f} ms{", OVER" if total > budget else ""})'
+        print(f"  {f'{module}:':<36}{total:8.1f} ms{verdict}")
+        for package, milliseconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {package:<34}{milliseconds:8.1f} ms")
+        if budget is not None and total > budget:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f'Over budget: {", ".join(over_budget)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
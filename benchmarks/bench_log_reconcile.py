@@ -0,0 +1,96 @@
+"""
+Benchmark for LogDataManager.update_df_from_logs.
+
+Compares the bulk reconciliation against the previous per-entry loop on a synthetic plan and log file.
+The per-entry loop is quadratic, so it is timed on a sample of the log entries and extrapolated.
+
+Usage:
+    python -m benchmarks.bench_log_reconcile --posts 100000 --log-lines 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from task_management.data_manager.log_data_manager import LogDataManager
+
+STATUSES = ['Posted', 'Error', 'Retrying']
+
+
+def make_plan(num_posts: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'Post ID': range(1, num_posts + 1),
+        'Status': ['Scheduled'] * num_posts,
+    })
+
+
+def write_log(log_file_path: Path, num_posts: int, num_lines: int, seed: int = 0):
+    rng = random.Random(seed)
+    with open(log_file_path, 'w') as log_file:
+        for i in range(num_lines):
+            post_id = rng.randint(1, num_posts * 2)  # Half of the ids are unknown to the plan
+            status = rng.choice(STATUSES)
+            log_file.write(f'2024-02-16 11:54:{i % 60:02d},303 - DEBUG - plan.xlsx - Facebook - '
+                           f'Post ID: {post_id} - {status} - message from app\n')
+
+
+def legacy_update(df: pd.DataFrame, log_entries):
+    """The per-entry loop used before the bulk path, kept as the reference implementation."""
+    for entry in log_entries:
+        if entry['post_id'] in df['Post ID'].values:
+            df.loc[df['Post ID'] == entry['post_id'], 'Status'] = entry['status']
+    return df
+
+
+def check_equivalence(work_dir: Path, num_posts: int = 2000, num_lines: int = 20000):
+    log_file_path = work_dir / 'equivalence_posts.log'
+    write_log(log_file_path, num_posts, num_lines, seed=1)
+    log_manager = LogDataManager(log_file_path)
+
+    expected = legacy_update(make_plan(num_posts), log_manager.read_logs())
+    actual = log_manager.update_df_from_logs(make_plan(num_posts))
+    assert expected['Status'].tolist() == actual['Status'].tolist(), 'Bulk path differs from the per-entry loop'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--log-lines', type=int, default=1_000_000)
+    parser.add_argument('--legacy-sample', type=int, default=2_000,
+                        help='Number of log entries the per-entry loop is timed on')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        check_equivalence(work_dir)
+
+        log_file_path = work_dir / 'plan_posts.log'
+        write_log(log_file_path, args.posts, args.log_lines)
+        log_manager = LogDataManager(log_file_path)
+
+        start = time.perf_counter()
+        log_entries = log_manager.read_logs()
+        read_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        log_manager.update_df_from_logs(make_plan(args.posts))
+        bulk_seconds = time.perf_counter() - start
+
+        sample = log_entries[:args.legacy_sample]
+        start = time.perf_counter()
+        legacy_update(make_plan(args.posts), sample)
+        legacy_sample_seconds = time.perf_counter() - start
+        legacy_seconds = legacy_sample_seconds / len(sample) * len(log_entries)
+
+    print(f'{args.posts:,} posts, {args.log_lines:,} log lines ({len(log_entries):,} entries)')
+    print(f"  {'read_logs:':<36}{read_seconds:8.2f} s")
+    print(f"  {'update_df_from_logs (read + bulk):':<36}{bulk_seconds:8.2f} s")
+    print(f"  {'per-entry loop, extrapolated:':<36}{legacy_seconds:8.2f} s "
+          f"({legacy_sample_seconds:.2f} s for {len(sample):,} entries)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark suite timing every stage of the posting pipeline on synthetic plans.
+
+For each plan size the suite generates a plan workbook and a bot log (see benchmarks.synthetic) and times:
+
+- load_excel_data, parsing the workbook, and again from the sidecar cache
+- load_current_date_posts, including building the date index
+- update_df_from_logs, reconciling the statuses with the log
+- save_changes_to_excel, writing the changed statuses
+- schedule_posts_from_dataframe, adding today's posts to a running dispatcher
+- dispatch, posting today's posts end to end: PostExecutor, the real bots, their logs and journal, and the
+  pooled HTTP client against the local mock Graph API server
+
+Generating the workbooks is not timed, but writing one with a million posts takes minutes. Dispatch is capped by
+--dispatch-posts per size. The results are written as JSON; --compare reports the change against an earlier
+run and exits with status 1 when a stage got slower than --threshold.
+
+Usage:
+    python -m benchmarks.bench_pipeline --posts 10000 100000 [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+from benchmarks.synthetic import make_plan, write_log, write_plan
+from bot_manager.bot_core.http_client import http_client
+from bot_manager.bot_core.logging_utils import shutdown_bot_logs
+from bot_manager.bot_core.mock_platform_server import MockPlatformServer
+from config import LOGGING_CONFIG, RETRY_CONFIG
+from metrics import POSTS
+from social_media.post_executor import PostExecutor
+from social_media.rate_limiter import RateLimiterRegistry
+from task_management.data_manager.excel_data_manager import ExcelDataManager
+from task_management.data_manager.log_data_manager import LogDataManager
+from task_management.scheduling.post_dispatcher import PostDispatcher
+
+
+def timed(function, *args, **kwargs):
+    """Returns the seconds a call took and its result."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def future_posts(df: pd.DataFrame) -> pd.DataFrame:
+    """Moves posts to the coming hour, one per millisecond, so the dispatcher neither fires nor catches them up."""
+    df = df.copy()
+    df['Scheduled Time'] = pd.Timestamp(datetime.now() + timedelta(hours=1)) + pd.to_timedelta(range(len(df)),
+                                                                                              unit='ms')
+    return df
+
+
+async def schedule(plan_path: Path, df: pd.DataFrame) -> float:
+    dispatcher = PostDispatcher()
+    dispatcher.start()
+    executor = PostExecutor(plan_path, df, dispatcher, RateLimiterRegistry({}))
+    try:
+        seconds, _ = timed(executor.schedule_posts_from_dataframe)
+    finally:
+        executor.shutdown()
+    return seconds
+
+
+def posted(plan_name: str, platforms) -> float:
+    """Returns the number of posts of a plan counted as 'Posted' so far."""
+    return sum(POSTS.value(plan_name, platform, 'Posted') for platform in platforms)
+
+
+async def dispatch(plan_path: Path, df: pd.DataFrame, concurrency: int) -> float:
+    """
+    Posts every row and returns the seconds it took.
+
+    :raises RuntimeError: If not every post was posted, e.g. they failed fast, which would read as a speedup.
+    """
+    server = MockPlatformServer()
+    http_client.base_url = await server.start()
+    executor = PostExecutor(plan_path, df, PostDispatcher(), RateLimiterRegistry({}))
+    semaphore = asyncio.Semaphore(concurrency)
+    platforms = df['Platform'].unique()
+    posted_before = posted(executor.plan_name, platforms)
+
+    async def execute(row):
+        async with semaphore:
+            await executor.execute_post(row['Platform'], row)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(execute(row) for _, row in df.iterrows()))
+        seconds = time.perf_counter() - start
+    finally:
+        await http_client.close()
+        await server.stop()
+        http_client.base_url = None
+    num_posted = posted(executor.plan_name, platforms) - posted_before
+    if num_posted != len(df):
+        raise RuntimeError(f'Only {num_posted:,.0f} of {len(df):,} dispatched posts were posted.')
+    return seconds
+
+
+def benchmark(num_posts: int, work_dir: Path, dispatch_posts: int, concurrency: int) -> List[Dict]:
+    """Runs every stage on a plan of num_posts posts and returns one result per stage."""
+    plan_path = work_dir / f'bench_pipeline_{num_posts}.xlsx'
+    log_path = work_dir / f'bench_pipeline_{num_posts}_posts.log'
+    plan = make_plan(num_posts)
+    write_plan(plan_path, plan)
+    write_log(log_path, plan, num_posts, unknown_share=0.05)
+
+    results = []
+
+    def record(stage, seconds, posts=num_posts):
+        results.append({'stage': stage, 'posts': num_posts, 'items': posts, 'seconds': round(seconds, 6),
+                        'items_per_second': round(posts / seconds, 1) if seconds else None})
+
+    seconds, excel_manager = timed(ExcelDataManager, plan_path, use_cache=False)
+    record('load_excel_data', seconds)
+    ExcelDataManager(plan_path)  # Writes the sidecar cache
+    seconds, excel_manager = timed(ExcelDataManager, plan_path)
+    record('load_excel_data (cached)', seconds)
+
+    seconds, todays_posts = timed(excel_manager.load_current_date_posts)
+    record('load_current_date_posts', seconds)
+
+    log_manager = LogDataManager(log_path)
+    seconds, excel_manager.df = timed(log_manager.update_df_from_logs, excel_manager.df)
+    record('update_df_from_logs', seconds)
+
+    seconds, saved = timed(excel_manager.save_changes_to_excel)
+    assert saved, 'save_changes_to_excel failed'
+    record('save_changes_to_excel', seconds)
+
+    todays_posts = future_posts(todays_posts.assign(Status='Scheduled'))
+    record('schedule_posts_from_dataframe', asyncio.run(schedule(plan_path, todays_posts)), len(todays_posts))
+
+    dispatched = todays_posts.head(dispatch_posts)
+    # The bots' logs, journal and dead letters go to the work directory rather than bot_manager/logs
+    LOGGING_CONFIG['bots_logs_directory'] = RETRY_CONFIG['dead_letter_directory'] = str(work_dir / 'logs')
+    # The bots print every post; keep the benchmark's output readable
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        seconds = asyncio.run(dispatch(plan_path, dispatched, concurrency))
+        shutdown_bot_logs()
+    record('dispatch', seconds, len(dispatched))
+    return results
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'timestamp': datetime.now().isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'pandas': pd.__version__, 'platform': platform.platform(),
+            'cpu_count': os.cpu_count()}
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float, min_seconds: float) -> List[str]:
+    """
+    Prints the change of every stage against a baseline run.
+
+    :return: The stages, with their plan size, that got slower than the threshold ratio. Stages that take less
+    than min_seconds are too noisy to be reported.
+    """
+    baseline_seconds = {(result['stage'], result['posts']): result['seconds'] for result in baseline}
+    regressions = []
+    print(f'Compared with the baseline (slower than {threshold:.2f}x is a regression):')
+    for result in results:
+        key = (result['stage'], result['posts'])
+        if key not in baseline_seconds:
+            continue
+        ratio = result['seconds'] / baseline_seconds[key] if baseline_seconds[key] else float('inf')
+        regressed = ratio > threshold and result['seconds'] >= min_seconds
+        label = f"{result['stage']} ({result['posts']:,}):"
+        print(f"  {label:<48}{baseline_seconds[key]:8.3f} s -> {result['seconds']:8.3f} s {ratio:6.2f}x"
+              f"{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(label.rstrip(':'))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, nargs='+', default=[10_000, 100_000], help='Plan sizes')
+    parser.add_argument('--dispatch-posts', type=int, default=2000, help='Posts dispatched end to end per size')
+    parser.add_argument('--concurrency', type=int, default=100, help='Posts in flight during dispatch')
+    parser.add_argument('--output', type=Path, help='JSON file the results are written to')
+    parser.add_argument('--compare', type=Path, help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Slowdown ratio reported as a regression')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='Stages faster than this are not reported as regressions')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for num_posts in args.posts:
+            print(f'{num_posts:,} posts')
+            for result in benchmark(num_posts, Path(temp_dir), args.dispatch_posts, args.concurrency):
+                results.append(result)
+                print(f"  {result['stage'] + ':':<36}{result['seconds']:8.3f} s "
+                      f"{result['items_per_second'] or 0:12,.0f} posts/s ({result['items']:,} posts)")
+
+    if args.output:
+        args.output.write_text(json.dumps({'environment': environment(), 'args': {
+            'posts': args.posts, 'dispatch_posts': args.dispatch_posts, 'concurrency': args.concurrency},
+            'results': results}, indent=2))
+        print(f'Results written to {args.output}')
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text())['results'], args.threshold,
+                              args.min_seconds)
+        if regressions:
+            print(f'Regressions: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
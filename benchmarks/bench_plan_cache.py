@@ -0,0 +1,64 @@
+"""
+Benchmark for loading a plan workbook through ExcelDataManager with and without the sidecar cache.
+
+A cold load parses the workbook and writes the cache; a warm load reads the cache only.
+
+Usage:
+    python -m benchmarks.bench_plan_cache --posts 50000 [--pickle]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from task_management.data_manager import plan_cache
+from task_management.data_manager.excel_data_manager import ExcelDataManager
+
+
+def make_plan(num_posts: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'Post ID': range(1, num_posts + 1),
+        'Platform': ['Facebook', 'Instagram'] * (num_posts // 2) + ['Facebook'] * (num_posts % 2),
+        'Content': [f'Check out our new product {i}' for i in range(1, num_posts + 1)],
+        'Image Path': ['img1'] * num_posts,
+        'Hashtags': ['#new #tech'] * num_posts,
+        'Scheduled Time': pd.date_range('2024-01-01', periods=num_posts, freq='min'),
+        'Status': ['Scheduled'] * num_posts,
+        'Remarks': [''] * num_posts,
+    })
+
+
+def timed_load(excel_file_path: Path, use_cache: bool) -> float:
+    start = time.perf_counter()
+    ExcelDataManager(excel_file_path, use_cache=use_cache)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=50_000)
+    parser.add_argument('--pickle', action='store_true', help='Use the pickle fallback even if pyarrow is installed')
+    args = parser.parse_args()
+
+    if args.pickle:
+        plan_cache.FEATHER_AVAILABLE = False
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        excel_file_path = Path(temp_dir) / 'plan.xlsx'
+        make_plan(args.posts).to_excel(excel_file_path, index=False)
+
+        no_cache_seconds = timed_load(excel_file_path, use_cache=False)
+        cold_seconds = timed_load(excel_file_path, use_cache=True)
+        warm_seconds = timed_load(excel_file_path, use_cache=True)
+        data_format = plan_cache.PlanCache(excel_file_path)._load_meta()['format']
+
+    print(f'{args.posts:,} posts, cache format: {data_format}')
+    print(f"  {'read_excel, no cache:':<36}{no_cache_seconds:8.3f} s")
+    print(f"  {'cold load (parse + write cache):':<36}{cold_seconds:8.3f} s")
+    print(f"  {'warm load (cache hit):':<36}{warm_seconds:8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
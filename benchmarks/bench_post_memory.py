@@ -0,0 +1,61 @@
+"""
+Memory and build time of the posts a PostExecutor keeps for its scheduled jobs.
+
+Compares one pandas Series per post, as taken from DataFrame.iterrows() and kept as the job's argument before,
+with the slotted ScheduledPost records built a column at a time. The allocations are traced with tracemalloc, in
+a second run so the build time is measured untraced. The Series are measured on a sample and extrapolated, a
+million of them do not fit in memory on small machines.
+
+Usage:
+    python -m benchmarks.bench_post_memory --posts 1000000 --series-sample 100000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_plan
+from bot_manager.bot_core.posts import ScheduledPost
+from bot_manager.bots.facebook import FacebookPost
+from bot_manager.bots.instagram import InstagramPost
+
+
+def measure(build):
+    """Returns the bytes still allocated by what build() returns, and the seconds it takes untraced."""
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return allocated, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--series-sample', type=int, default=100_000, help='Posts the Series are measured on')
+    args = parser.parse_args()
+
+    df = make_plan(args.posts)
+    post_classes = {'Facebook': FacebookPost, 'Instagram': InstagramPost}
+    sample = df.head(args.series_sample)
+
+    series_bytes, series_seconds = measure(lambda: [row for _, row in sample.iterrows()])
+    series_bytes = series_bytes / len(sample) * args.posts
+    series_seconds = series_seconds / len(sample) * args.posts
+    record_bytes, record_seconds = measure(lambda: ScheduledPost.from_dataframe(df, post_classes))
+
+    print(f'{args.posts:,} scheduled posts')
+    print(f"  {'pandas Series per post:':<36}{series_bytes / 2 ** 20:10.1f} MiB {series_bytes / args.posts:8.0f} B/post "
+          f"{series_seconds:8.2f} s (extrapolated from {len(sample):,})")
+    print(f"  {'ScheduledPost records:':<36}{record_bytes / 2 ** 20:10.1f} MiB {record_bytes / args.posts:8.0f} B/post "
+          f"{record_seconds:8.2f} s")
+    print(f"  {'ratio:':<36}{series_bytes / record_bytes:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
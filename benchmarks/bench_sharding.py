@@ -0,0 +1,104 @@
+"""
+Throughput of posting synthetic plans from one worker process versus several.
+
+Every post is dispatched right away and the bots simulate their requests, so the run is bound by the CPU time spent
+per post (scheduling, pandas, logging and journaling) rather than by the network. Rate limits are disabled.
+Start-up of the worker processes is included in the timings.
+
+Usage:
+    python -m benchmarks.bench_sharding --plans 8 --posts 2000 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from sharding import ShardCoordinator
+
+
+def make_plan(plan_name: str, num_posts: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'Post ID': range(1, num_posts + 1),
+        'Platform': ['Facebook', 'Instagram'] * (num_posts // 2) + ['Facebook'] * (num_posts % 2),
+        'Content': [f'{plan_name} post {i}' for i in range(1, num_posts + 1)],
+        'Image Path': ['img.png'] * num_posts,
+        'Hashtags': ['#bench'] * num_posts,
+        'Scheduled Time': [datetime.now()] * num_posts,
+        'Status': ['Scheduled'] * num_posts,
+    })
+
+
+def synthetic_worker(worker_id, plan_paths, status_queue, known_statuses, num_workers, num_posts, concurrency):
+    """Posts the synthetic plans of this worker once and exits."""
+    from bot_manager.bot_core.logging_utils import shutdown_bot_logs
+    from social_media.post_executor import PostExecutor
+    from social_media.rate_limiter import RateLimiterRegistry
+
+    def on_outcome(plan_name, platform, post_id, status):
+        status_queue.put((worker_id, plan_name, int(post_id), status))
+
+    async def run():
+        rate_limiter = RateLimiterRegistry({})
+        # Posts are dispatched directly rather than through the scheduler, whose one second misfire grace
+        # time thousands of simultaneous jobs would exceed
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def execute(executor, row):
+            async with semaphore:
+                await executor.execute_post(row['Platform'], row)
+
+        posts = []
+        for plan_path in plan_paths:
+            executor = PostExecutor(plan_path, make_plan(plan_path.stem, num_posts), rate_limiter=rate_limiter,
+                                    on_outcome=on_outcome)
+            posts.extend(execute(executor, row) for _, row in executor.df.iterrows())
+        await asyncio.gather(*posts)
+
+    # The bots print every post; keep the benchmark's output readable
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        asyncio.run(run())
+        # Write the queued log records while their console stream is still open
+        shutdown_bot_logs()
+
+
+def benchmark(num_plans: int, num_posts: int, num_workers: int, concurrency: int) -> float:
+    plan_paths = [Path(f'bench_shard_{i}.xlsx') for i in range(num_plans)]
+    target = partial(synthetic_worker, num_posts=num_posts, concurrency=concurrency)
+    coordinator = ShardCoordinator(plan_paths, num_workers, target=target, max_restarts=0)
+    start = time.perf_counter()
+    coordinator.start()
+    coordinator.run()
+    seconds = time.perf_counter() - start
+    coordinator.stop()
+
+    reported = sum(len(statuses) for statuses in coordinator.statuses.values())
+    assert reported == num_plans * num_posts, f'{reported} of {num_plans * num_posts} outcomes reported'
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--plans', type=int, default=8)
+    parser.add_argument('--posts', type=int, default=2000, help='Posts per plan')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--concurrency', type=int, default=500, help='Posts in flight per worker')
+    args = parser.parse_args()
+
+    total = args.plans * args.posts
+    print(f'{args.plans} plans x {args.posts:,} posts = {total:,} posts, {os.cpu_count()} CPU cores')
+    baseline = None
+    for num_workers in args.workers:
+        seconds = benchmark(args.plans, args.posts, num_workers, args.concurrency)
+        baseline = baseline or seconds
+        label = f'{num_workers} worker{"s" if num_workers > 1 else ""}:'
+        print(f"  {label:<36}{seconds:8.2f} s {total / seconds:10.0f} posts/s {baseline / seconds:6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Synthetic plans and bot logs for the benchmarks.
+
+Posts are spread over several platforms and accounts and over the days around today, so that date filters,
+per-account bots and status reconciliation see realistic shares of the data. Generation is seeded and
+reproducible.
+"""
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PLATFORMS = ('Facebook', 'Instagram')
+# None posts with the plan's default account
+ACCOUNTS = (None, 'brand', 'support')
+LOG_STATUSES = ('Posted', 'Error', 'Retrying')
+
+
+def make_plan(num_posts: int, platforms: Sequence[str] = PLATFORMS, accounts: Sequence[Optional[str]] = ACCOUNTS,
+              days: int = 7, start: Optional[datetime] = None, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a plan with the columns of a plan workbook.
+
+    :param num_posts: Number of posts.
+    :param platforms: Platforms the posts are spread over, round-robin.
+    :param accounts: Accounts the posts are spread over, at random.
+    :param days: Number of days the posts are spread over, evenly; today is the middle one.
+    :param start: Time of the first post; by default midnight (days // 2) days ago.
+    :param seed: Seed of the random choices.
+    """
+    rng = np.random.default_rng(seed)
+    if start is None:
+        start = datetime.combine(datetime.now().date() - timedelta(days=days // 2), datetime.min.time())
+    post_ids = np.arange(1, num_posts + 1)
+    offsets = np.sort(rng.integers(0, days * 24 * 60 * 60, num_posts))
+    return pd.DataFrame({
+        'Post ID': post_ids,
+        'Platform': [platforms[i % len(platforms)] for i in range(num_posts)],
+        'Account': rng.choice(np.array(accounts, dtype=object), num_posts),
+        'Content': [f'Check out our new product {i}' for i in post_ids],
+        'Image Path': ['https://example.com/img1.jpg'] * num_posts,
+        'Hashtags': ['#new #tech'] * num_posts,
+        'Scheduled Time': pd.Timestamp(start) + pd.to_timedelta(offsets, unit='s'),
+        'Status': ['Scheduled'] * num_posts,
+        'Remarks': [''] * num_posts,
+    })
+
+
+def write_plan(excel_file_path: Path, df: pd.DataFrame):
+    """Writes a plan to an Excel workbook, in the sheet ExcelDataManager reads by default."""
+    df.to_excel(excel_file_path, sheet_name='Sheet1', index=False)
+
+
+def write_log(log_file_path: Path, df: pd.DataFrame, num_lines: int, unknown_share: float = 0.0, seed: int = 0):
+    """
+    Writes a bot log in the format of the plan's posts log, read by LogDataManager.
+
+    :param log_file_path: Path of the log file, overwritten.
+    :param df: The plan the logged posts belong to.
+    :param num_lines: Number of log lines.
+    :param unknown_share: Share of lines about posts that are not in the plan.
+    :param seed: Seed of the random choices.
+    """
+    rng = random.Random(seed)
+    post_ids = df['Post ID'].tolist()
+    platforms = df['Platform'].tolist()
+    unknown_id = max(post_ids, default=0)
+    day = datetime.now().date().isoformat()
+    excel_file_name = log_file_path.stem.removesuffix('_posts') + '.xlsx'
+    with open(log_file_path, 'w') as log_file:
+        for i in range(num_lines):
+            position = rng.randrange(len(post_ids))
+            post_id = post_ids[position] if rng.random() >= unknown_share else unknown_id + 1 + i
+            log_file.write(f'{day} 11:{i // 60 % 60:02d}:{i % 60:02d},303 - DEBUG - {excel_file_name} - '
+                           f'{platforms[position]} - Post ID: {post_id} - {rng.choice(LOG_STATUSES)} - message\n')
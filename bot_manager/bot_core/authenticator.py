@@ -1,12 +1,12 @@
 from abc import ABC, abstractmethod
 
-from bot_manager.bot_core.singleton import SingletonMeta
 
-
-class PlatformAuthenticator(ABC, metaclass=SingletonMeta):
+class PlatformAuthenticator(ABC):
     """
     Abstract base class for authentication management with social media APIs.
 
+    Each bot creates and owns its authenticator, so there is one per plan, platform and account.
+
     Attributes:
         api_key (str): API key for the social media platform.
         api_secret (str): API secret for secure authentication.
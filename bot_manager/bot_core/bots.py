@@ -1,11 +1,15 @@
+import asyncio
 import logging
+import os
 import pandas as pd
 from abc import ABC, abstractmethod
-from typing import Protocol, runtime_checkable
+from typing import List, Protocol, Sequence, Tuple, runtime_checkable
 
 from bot_manager.bot_core import LogType
 from bot_manager.bot_core.authenticator import PlatformAuthenticator
-from bot_manager.bot_core.logging_utils import setup_bot_logs, ContextualLogger, LoggerSingleton
+from bot_manager.bot_core.http_client import http_client
+from bot_manager.bot_core.logging_utils import setup_bot_logs, setup_post_journal, ContextualLogger, LoggerSingleton
+from bot_manager.bot_core.media import media_cache
 from bot_manager.bot_core.posts import SocialMediaPost
 from bot_manager.bot_core.singleton import SingletonMeta
 
@@ -14,14 +18,18 @@ from bot_manager.bot_core.singleton import SingletonMeta
 class SocialMediaProtocol(Protocol):
     """
     A protocol for social media bots. Implementing classes are expected to accept
-    an 'excel_file_name' parameter in their constructor for initializing with a specific Excel file.
+    an 'excel_file_name' parameter in their constructor for initializing with a specific Excel file,
+    and an optional 'account' the bot posts with.
     """
 
-    def __init__(self, excel_file_name: str):
+    def __init__(self, excel_file_name: str, account: str = None):
         self.excel_file_name = excel_file_name
+        self.account = account
 
     def post(self, post: SocialMediaPost) -> LogType: ...
 
+    def post_many(self, posts: Sequence[SocialMediaPost]) -> List: ...
+
     def create_post_from_dataframe_row(self, row: pd.Series) -> SocialMediaPost: ...
 
 
@@ -29,24 +37,51 @@ class SocialMediaBot(ABC, metaclass=SingletonMeta):
     """
     Abstract base class for social media bots responsible for posting content.
 
+    There is one instance per plan and account (see SingletonMeta), so several plans and accounts can post from
+    one process without sharing logs or credentials.
+
     Attributes:
         logs (ContextualLogger): Logger for recording bot activities, configured per bot instance.
+        journal (logging.Logger): Logger writing the machine-readable outcome of each post, see journal_post.
         auth_manager (bot_manager.bot_core.authenticator.PlatformAuthenticator): Authentication manager instance for handling API authentication.
+        http (bot_manager.bot_core.http_client.SharedHttpClient): Pooled HTTP client shared by all bots.
+        media (bot_manager.bot_core.media.MediaCache): The posts' local media files, read ahead of time.
+        post_class (type): The platform's SocialMediaPost subclass, used to build its posts in bulk when they
+            are scheduled.
+        supports_batch (bool): Whether post_many sends several posts with fewer requests than post would, so
+            posts due at the same time are worth grouping.
+        upload_fields (Tuple[str, ...]): The media fields of a post whose local files post uploads, so they
+            are worth reading and checking ahead of time; bots that post media by URL, or only simulate posting,
+            never read any.
     """
+    post_class = SocialMediaPost
+    supports_batch = False
+    upload_fields: Tuple[str, ...] = ()
 
-    def __init__(self, excel_file_name):
+    def __init__(self, excel_file_name, account=None):
         """
         Initializes the social media bot with a specific Excel file context.
 
         Args:
             excel_file_name (str): The name of the Excel file used for sourcing post data.
+            account (Optional[str]): The account the bot posts with; None for the plan's default account.
         """
         """base_logger = setup_bot_logs(excel_file_name)
         self.logs = ContextualLogger(base_logger,
                                      {'excel_file': excel_file_name, 'platform_name': self.platform_name})"""
-        self.logs = LoggerSingleton.get_logger(excel_file_name, self.platform_name)
+        self.logs = LoggerSingleton.get_logger(excel_file_name, self.platform_name, account)
+        self.journal = setup_post_journal(excel_file_name)
         self.auth_manager = self.create_auth_manager(api_key="your_api_key", api_secret="your_api_secret")
+        self.http = http_client
+        self.media = media_cache
         self.excel_file_name = excel_file_name
+        self.account = account
+
+    def get_access_token(self) -> str:
+        """Returns the platform token, logging in first if there is none yet."""
+        if self.auth_manager.token is None:
+            self.auth_manager.login()
+        return self.auth_manager.token
 
     @property
     @abstractmethod
@@ -84,35 +119,65 @@ class SocialMediaBot(ABC, metaclass=SingletonMeta):
         """
         pass
 
+    async def post_many(self, posts: Sequence[SocialMediaPost]) -> List:
+        """
+        Posts several posts at once. Bots of platforms with a batch endpoint override this to send them with
+        one request and set supports_batch; by default the posts are posted concurrently, one by one.
+
+        Args:
+            posts (Sequence[SocialMediaPost]): The posts to share.
+
+        Returns:
+            List: For every post, in order, the result of post() or the exception the post failed with. Each
+            post's outcome is logged separately.
+        """
+        return await asyncio.gather(*(self.post(post) for post in posts), return_exceptions=True)
+
     def log_post(self, post: SocialMediaPost, level, message, data=None):
         """
         Logs actions related to a social media post, incorporating the post's ID into the logging context for
         enhanced traceability.
 
-        :param post: The social media post object that is central to the log entry. This object's ID is used to
-        update the logging context for improved specificity.
+        :param post: The social media post object that is central to the log entry. This object's ID is added to
+        the log line.
         :param level: The severity level of the log,
         corresponding to standard logging levels (e.g., logging.INFO, logging.ERROR), which dictates how the log is
         processed and filtered.
         :param message: A descriptive message detailing the nature of the log entry.
         :param data: Additional data or context that might be relevant to the log entry, provided as a dictionary.
         Optional.
-        :return: None. This method updates the logging context and performs logging without returning any value.
+        :return: None.
 
-        This method updates the logging context to include the ID of the post being acted upon before logging the
-        specified message. After logging, it cleans up by removing the post's ID from the context,
-        ensuring subsequent logs are not incorrectly associated with this post.
+        The post's ID is passed with this one call rather than stored in the logger's context, which is shared
+        by all posts of the bot, so concurrent posts cannot mix up their IDs.
         """
         if post:
-            # Temporarily augment the logging context with the post's ID for this entry
-            self.logs.update_context(post_id=post.post_id)
+            self.logs.log(level, message, extra={'post_id': post.post_id})
+        else:
+            self.logs.log(level, message)
 
-        # Perform the actual logging with the provided level and message
-        self.logs.log(level, message)
+    def journal_post(self, post: SocialMediaPost, status: str, latency: float, attempts: int = 1,
+                     error: BaseException = None):
+        """
+        Appends the outcome of a post to the plan's JSON lines journal, read back by JournalDataManager.
 
-        if post:
-            # Ensure the context is cleared of the post's ID after logging to maintain accuracy
-            self.logs.update_context(post_id=None)
+        :param post: The social media post the outcome belongs to.
+        :param status: The resulting status of the post, e.g. 'Posted' or 'Error'.
+        :param latency: Seconds from the first attempt to the outcome, including retries.
+        :param attempts: The number of attempts made.
+        :param error: The error of the last attempt, if the post failed.
+        """
+        post_id = post.post_id.item() if hasattr(post.post_id, 'item') else post.post_id  # numpy scalars from pandas
+        self.journal.info(status, extra={'outcome': {
+            'plan': os.path.splitext(os.path.basename(self.excel_file_name))[0],
+            'platform': self.platform_name,
+            'account': self.account,
+            'post_id': post_id,
+            'status': status,
+            'latency': round(latency, 6),
+            'attempts': attempts,
+            'error_class': type(error).__name__ if error is not None else None,
+        }})
 
     def log_action(self, level, message, data=None):
         # Convert string level to logging constants if necessary
@@ -8,3 +8,42 @@ class CredentialError(Exception):
     def __init__(self, message="Credentials are invalid or expired"):
         self.message = message
         super().__init__(self.message)
+
+
+class TransientError(Exception):
+    """Exception raised for temporary failures of a platform, e.g. a timeout or a server error.
+
+    Posts failing with a transient error are retried with backoff.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message="The platform is temporarily unavailable"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class MediaError(Exception):
+    """Exception raised for a media file of a post that is missing, unreadable, empty or too large.
+
+    Posts failing with a media error are not retried; they can be replayed once the file is fixed.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message="The media file of the post cannot be used"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class RateLimitError(TransientError):
+    """Exception raised when a platform rejects a request because of its rate limits.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message="Rate limit of the platform exceeded"):
+        super().__init__(message)
@@ -0,0 +1,103 @@
+import asyncio
+import weakref
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from bot_manager.bot_core.errors import CredentialError, RateLimitError, TransientError
+from config import HTTP_CONFIG
+
+
+def error_for_status(status: int, message: str) -> Optional[Exception]:
+    """
+    Returns the bot error of an error response the retry engine knows how to handle, see SharedHttpClient.
+
+    :param status: The HTTP status, also of a single response in a batch request.
+    :param message: The response body or a description of the failure.
+    :return: The error, or None for a successful response or an error status that is not mapped.
+    """
+    if status in (401, 403):
+        return CredentialError(message)
+    if status == 429:
+        return RateLimitError(message)
+    if status >= 500:
+        return TransientError(message)
+    return None
+
+
+class SharedHttpClient:
+    """
+    An HTTP client shared by all social media bots.
+
+    Requests go through one aiohttp session per event loop, whose connector keeps connections alive and pools
+    them, caps the number of connections in total and per host, and caches DNS lookups. Responses are mapped to
+    the bot errors, so the retry engine can handle them:
+
+    - 401 and 403 raise CredentialError,
+    - 429 raises RateLimitError,
+    - 5xx responses and connection failures raise TransientError,
+    - other error responses raise aiohttp.ClientResponseError.
+
+    Attributes:
+        base_url (Optional[str]): Base URL of the Graph API, including the version. None makes the bots simulate
+            their requests.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.base_url: Optional[str] = config.get('graph_api_url')
+        self._sessions = weakref.WeakKeyDictionary()
+
+    def session(self) -> aiohttp.ClientSession:
+        """Returns the session of the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config['max_connections'],
+                limit_per_host=self.config['max_connections_per_host'],
+                use_dns_cache=True,
+                ttl_dns_cache=self.config['dns_cache_ttl'],
+                keepalive_timeout=self.config['keepalive_timeout'],
+            )
+            timeout = aiohttp.ClientTimeout(total=self.config['total_timeout'],
+                                            connect=self.config['connect_timeout'])
+            session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._sessions[loop] = session
+        return session
+
+    async def request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """
+        Sends a request and returns its decoded JSON body.
+
+        :param method: The HTTP method.
+        :param path: A path relative to base_url, or an absolute URL.
+        :param kwargs: Further arguments of aiohttp.ClientSession.request, e.g. 'params' or 'data'.
+        :return: The JSON body of the response.
+        """
+        url = path if path.startswith(('http://', 'https://')) else f'{self.base_url}/{path.lstrip("/")}'
+        try:
+            async with self.session().request(method, url, **kwargs) as response:
+                if response.status >= 400:
+                    message = await response.text()
+                    error = error_for_status(response.status, message if response.status < 500 else
+                                             f'{response.status} from {url}: {message}')
+                    if error is not None:
+                        raise error
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        except aiohttp.ClientConnectionError as e:
+            raise TransientError(f'Connection to {url} failed: {e}') from e
+
+    async def post(self, path: str, **kwargs) -> Dict[str, Any]:
+        return await self.request('POST', path, **kwargs)
+
+    async def close(self):
+        """Closes the session of the running event loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+# The client shared by all bots
+http_client = SharedHttpClient(HTTP_CONFIG)
@@ -1,8 +1,15 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import threading
+import time
 
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, List
 
 from config import LOGGING_CONFIG
 from logger_config import logger
@@ -10,7 +17,7 @@ from logger_config import logger
 
 def setup_bot_logs(excel_file_name):
     """Set up a logs for a specific Excel file."""
-    logs_dir = 'bot_manager/logs'
+    logs_dir = LOGGING_CONFIG["bots_logs_directory"]
     excel_base_name = os.path.splitext(os.path.basename(excel_file_name))[0]
     log_file = f'{logs_dir}/{excel_base_name}_posts.log'
 
@@ -29,20 +36,249 @@ def setup_bot_logs(excel_file_name):
         file_handler.setFormatter(formatter)
         logs.addHandler(file_handler)"""
 
-        file_handler = logging.FileHandler(log_file)
-        console_handler = logging.StreamHandler()  # For console output
+        file_handler = BatchedFileHandler(log_file)
+        console_handler = BatchedStreamHandler()  # For console output
 
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)  # Using the same format for console output
 
-        logs.addHandler(file_handler)
-        logs.addHandler(console_handler)  # Add console handler
+        # Records are only queued here; the background writer thread does the I/O
+        bot_log_writer.add_handlers(logs.name, [file_handler, console_handler])
+        logs.addHandler(bot_log_writer.create_queue_handler())
 
     return logs
 
 
+def setup_post_journal(excel_file_name):
+    """Set up the JSON lines journal of post outcomes for a specific Excel file."""
+    excel_base_name = os.path.splitext(os.path.basename(excel_file_name))[0]
+    journal_dir = f'{LOGGING_CONFIG["bots_logs_directory"]}/journal/{excel_base_name}'
+
+    journal = logging.getLogger(f'journal.{excel_base_name}')
+    journal.setLevel(logging.INFO)
+    journal.propagate = False
+
+    if not journal.handlers:
+        bot_log_writer.add_handlers(journal.name, [DailyJournalHandler(journal_dir)])
+        journal.addHandler(bot_log_writer.create_queue_handler())
+
+    return journal
+
+
+class BatchedStreamHandler(logging.StreamHandler):
+    """A StreamHandler that leaves flushing to its caller, so several records can be written at once."""
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class BatchedFileHandler(logging.FileHandler):
+    """A FileHandler that leaves flushing to its caller, so several records can be written at once."""
+
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class DailyJournalHandler(logging.Handler):
+    """
+    Writes the 'outcome' dictionary of each record as one JSON line to a file per day, '<journal_dir>/YYYY-MM-DD.jsonl'.
+
+    The day and the 'ts' field are taken from the record's creation time. Like the batched handlers, it leaves
+    flushing to its caller.
+    """
+
+    def __init__(self, journal_dir):
+        super().__init__()
+        self.journal_dir = journal_dir
+        self.stream = None
+        self.day = None
+
+    def emit(self, record):
+        created = datetime.fromtimestamp(record.created)
+        day = created.date().isoformat()
+        try:
+            if day != self.day:
+                self.close_stream()
+                os.makedirs(self.journal_dir, exist_ok=True)
+                self.stream = open(os.path.join(self.journal_dir, f'{day}.jsonl'), 'a', encoding='utf-8')
+                self.day = day
+            outcome = {'ts': created.isoformat(timespec='milliseconds'), **getattr(record, 'outcome', {})}
+            self.stream.write(json.dumps(outcome, default=str) + '\n')
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if self.stream is not None:
+                self.stream.flush()
+
+    def close_stream(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+            self.day = None
+
+    def close(self):
+        with self.lock:
+            self.close_stream()
+        super().close()
+
+
+class WriterQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for a BatchingLogWriter, or writes them directly once the writer has stopped."""
+
+    def __init__(self, writer: 'BatchingLogWriter'):
+        super().__init__(writer.queue)
+        self.writer = writer
+
+    def emit(self, record):
+        # Checked and queued under the writer's lock, so a stop cannot drain the queue in between
+        with self.writer.queue_lock:
+            if self.writer.accepts_records:
+                super().emit(record)
+                return
+        self.writer.write_now(record)
+
+
+class BatchingLogWriter(threading.Thread):
+    def __init__(self, batch_size: int = 500, flush_interval: float = 1.0):
+        """
+        A background thread writing queued log records to their handlers.
+
+        Records are written as they arrive, but the handlers are flushed only after 'batch_size' records or
+        'flush_interval' seconds, and on stop. Stopping drains the queue first, so no queued record is lost.
+
+        :param batch_size: Number of records written between two flushes at most.
+        :param flush_interval: Seconds a written record may wait for a flush at most.
+        """
+        super().__init__(name='bot-log-writer', daemon=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        self.handlers: Dict[str, List[logging.Handler]] = {}
+        self._handlers_lock = threading.Lock()
+        self._stop_sentinel = object()
+        # Held while records are queued, and while the thread is marked as stopping
+        self.queue_lock = threading.Lock()
+        self._stopping = False
+
+    def add_handlers(self, logger_name: str, handlers: List[logging.Handler]):
+        """Registers the handlers that write the records of a logger."""
+        with self._handlers_lock:
+            self.handlers.setdefault(logger_name, []).extend(handlers)
+        if not self.is_alive() and self.ident is None:
+            self.start()
+
+    @property
+    def accepts_records(self) -> bool:
+        """Whether records may be queued, i.e. the thread runs and is not stopping. Check under queue_lock."""
+        return self.is_alive() and not self._stopping
+
+    def create_queue_handler(self) -> logging.Handler:
+        """Returns a handler to attach to a logger, so its records are written by this thread."""
+        return WriterQueueHandler(self)
+
+    def stop(self, timeout: float = None):
+        """Writes and flushes all queued records, then stops the thread."""
+        with self.queue_lock:
+            # From now on records are written synchronously, so none is queued after the final drain
+            self._stopping = True
+        if self.is_alive():
+            self.queue.put(self._stop_sentinel)
+            self.join(timeout)
+        # Records queued while the thread was exiting
+        with self._handlers_lock:
+            self._drain()
+            self._flush()
+
+    def write_now(self, record: logging.LogRecord):
+        """Writes and flushes a record in the calling thread."""
+        with self._handlers_lock:
+            self._write(record)
+            self._flush()
+
+    def run(self):
+        written = 0
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush)) if written else None
+            try:
+                record = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None  # Time to flush
+
+            stopping = record is self._stop_sentinel
+            with self._handlers_lock:
+                # Take whatever else is queued in the same pass
+                while record is not None and not stopping:
+                    self._write(record)
+                    written += 1
+                    if written >= self.batch_size:
+                        break
+                    try:
+                        record = self.queue.get_nowait()
+                    except queue.Empty:
+                        record = None
+                    stopping = record is self._stop_sentinel
+
+                if stopping:
+                    self._drain()
+                if stopping or written >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                    self._flush()
+                    written = 0
+                    last_flush = time.monotonic()
+            if stopping:
+                return
+
+    def _drain(self):
+        while True:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if record is not self._stop_sentinel:
+                self._write(record)
+
+    def _write(self, record: logging.LogRecord):
+        for handler in self.handlers.get(record.name, []):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _flush(self):
+        for handlers in self.handlers.values():
+            for handler in handlers:
+                try:
+                    handler.flush()
+                except (OSError, ValueError):
+                    pass  # e.g. the console stream was closed at interpreter exit
+
+
+# The post the running task is working on. Every asyncio task has its own value, so concurrent posts sharing
+# one bot (and its ContextualLogger) never see each other's post
+current_post_id: contextvars.ContextVar = contextvars.ContextVar('current_post_id', default=None)
+
+# The writer thread shared by all bot loggers
+bot_log_writer = BatchingLogWriter(LOGGING_CONFIG["bots_log_batch_size"], LOGGING_CONFIG["bots_log_flush_interval"])
+
+
+def shutdown_bot_logs():
+    """Writes out all queued bot log records. Call on shutdown; later records are written synchronously."""
+    bot_log_writer.stop()
+
+
+atexit.register(shutdown_bot_logs)
+
+
 class ContextualLogger(logging.LoggerAdapter):
     def process_(self, msg, kwargs):
         """
@@ -88,9 +324,17 @@ class ContextualLogger(logging.LoggerAdapter):
             logger.debug("ContextualLogger 'platform_name' is missing in logging context.")
 
         prefix = f'{excel_file if excel_file is not None else "unknown"} - {platform_name if platform_name is not None else "unknown"}'
+        if self.extra.get("account") is not None:
+            prefix += f' - {self.extra["account"]}'
 
-        if "post_id" in self.extra:
-            prefix += f' - Post ID: {self.extra["post_id"]}'
+        # A post passed with the call wins over the post of the running task, which wins over the shared context
+        post_id = (kwargs.get("extra") or {}).get("post_id")
+        if post_id is None:
+            post_id = current_post_id.get()
+        if post_id is None:
+            post_id = self.extra.get("post_id")
+        if post_id is not None:
+            prefix += f' - Post ID: {post_id}'
 
         return f'{prefix} - {msg}', kwargs
 
@@ -98,6 +342,9 @@ class ContextualLogger(logging.LoggerAdapter):
         """
         Update the logging context with new key-value pairs.
 
+        The context is shared by every task using this logger; use ``current_post_id`` or pass
+        ``extra={'post_id': ...}`` for per-post values.
+
         Args:
             **kwargs: Arbitrary keyword arguments to add to or update the logging context.
         """
@@ -109,11 +356,14 @@ class LoggerSingleton:
     _lock = threading.Lock()  # Class-level lock
 
     @classmethod
-    def get_logger(cls, excel_file_name, platform_name):
-        key = (excel_file_name, platform_name)
+    def get_logger(cls, excel_file_name, platform_name, account=None):
+        key = (excel_file_name, platform_name, account)
         with cls._lock:  # Ensure thread-safe access and creation of loggers
             if key not in cls._instances:
                 base_logger = setup_bot_logs(excel_file_name)
-                contextual_logger = ContextualLogger(base_logger, {'excel_file': excel_file_name, 'platform_name': platform_name})
+                context = {'excel_file': excel_file_name, 'platform_name': platform_name}
+                if account is not None:
+                    context['account'] = account
+                contextual_logger = ContextualLogger(base_logger, context)
                 cls._instances[key] = contextual_logger
             return cls._instances[key]
@@ -0,0 +1,140 @@
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from bot_manager.bot_core.errors import MediaError
+from bot_manager.bot_core.posts import SocialMediaPost
+from config import MEDIA_CONFIG
+from metrics import DATA_JOB_SECONDS, MEDIA_CACHE_BYTES
+
+
+@dataclass(frozen=True, slots=True)
+class MediaFile:
+    """
+    A media file read ahead of the post using it.
+
+    Attributes:
+        path (str): The path as written in the plan.
+        size (int): Size in bytes.
+        mtime (float): Modification time when it was read, to notice a replaced file.
+        sha256 (str): Hex digest of the content, e.g. to recognise a file uploaded before.
+        data (Any): The content, as bytes or, for large files, as a read-only mmap.
+    """
+    path: str
+    size: int
+    mtime: float
+    sha256: str
+    data: Any
+
+
+class MediaCache:
+    """
+    Media files of the posts, read by worker threads before the posts are due and shared by all bots.
+
+    The cache holds at most max_bytes, evicting the least recently used files first. Files above mmap_threshold
+    are memory-mapped and their pages read ahead, rather than copied into memory.
+
+    Attributes:
+        max_bytes (int): Total size of the files held.
+        mmap_threshold (int): Size from which files are memory-mapped.
+        max_file_bytes (int): Size from which files are rejected.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.max_bytes = config['cache_bytes']
+        self.mmap_threshold = config['mmap_threshold']
+        self.max_file_bytes = config['max_file_bytes']
+        self._files: 'OrderedDict[str, MediaFile]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[MediaFile]:
+        """Returns a cached file without any disk I/O, or None if it is not cached."""
+        with self._lock:
+            media_file = self._files.get(path)
+            if media_file is not None:
+                self._files.move_to_end(path)
+            return media_file
+
+    def load(self, path: str) -> MediaFile:
+        """
+        Checks a file and reads it into the cache, unless it is cached and unchanged. Blocking; call it from a
+        worker thread.
+
+        :raises MediaError: If the file is missing, unreadable, empty or larger than max_file_bytes.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise MediaError(f'{path}: {e.strerror}') from e
+        cached = self.get(path)
+        if cached is not None and (cached.size, cached.mtime) == (stat.st_size, stat.st_mtime):
+            return cached
+        if stat.st_size == 0:
+            raise MediaError(f'{path}: The file is empty')
+        if stat.st_size > self.max_file_bytes:
+            raise MediaError(f'{path}: {stat.st_size:,} bytes is more than the limit of {self.max_file_bytes:,}')
+
+        with DATA_JOB_SECONDS.time('load_media'):
+            try:
+                with open(path, 'rb') as file:
+                    if stat.st_size >= self.mmap_threshold:
+                        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                        if hasattr(mmap, 'MADV_WILLNEED'):  # Read the pages ahead, not when posting
+                            data.madvise(mmap.MADV_WILLNEED)
+                    else:
+                        data = file.read()
+            except OSError as e:
+                raise MediaError(f'{path}: {e.strerror}') from e
+            media_file = MediaFile(path, len(data), stat.st_mtime, hashlib.sha256(data).hexdigest(), data)
+
+        self._put(media_file)
+        return media_file
+
+    def load_post(self, post: SocialMediaPost, fields: Optional[Sequence[str]] = None) -> List[MediaFile]:
+        """
+        Loads every local media file of a post, see :meth:`load`.
+
+        :param fields: The media fields whose files are loaded, e.g. those the post's bot uploads. Defaults to
+        all of them.
+        :raises MediaError: Naming every broken file of the post.
+        """
+        media_files, errors = [], []
+        for path in post.media_paths(fields):
+            try:
+                media_files.append(self.load(path))
+            except MediaError as e:
+                errors.append(e.message)
+        if errors:
+            raise MediaError('; '.join(errors))
+        return media_files
+
+    def is_loaded(self, post: SocialMediaPost, fields: Optional[Sequence[str]] = None) -> bool:
+        """
+        Whether every local media file of a post, or of the given fields of it, is cached, so it can be posted
+        without disk I/O.
+        """
+        with self._lock:
+            return all(path in self._files for path in post.media_paths(fields))
+
+    def _put(self, media_file: MediaFile):
+        if media_file.size > self.max_bytes:
+            return  # Read again when the post is due
+        with self._lock:
+            previous = self._files.pop(media_file.path, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._files[media_file.path] = media_file
+            self._size += media_file.size
+            while self._size > self.max_bytes:
+                _, evicted = self._files.popitem(last=False)
+                self._size -= evicted.size
+            MEDIA_CACHE_BYTES.set(self._size)
+
+
+# The cache shared by all bots and plans
+media_cache = MediaCache(MEDIA_CONFIG)
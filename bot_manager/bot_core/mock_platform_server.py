@@ -0,0 +1,132 @@
+"""
+A local stand-in for the Graph API endpoints the bots use, to measure throughput offline.
+
+Usage:
+    python -m bot_manager.bot_core.mock_platform_server --port 8765 --latency 0.05
+
+and set HTTP_CONFIG["graph_api_url"] to "http://127.0.0.1:8765/v19.0".
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+
+from aiohttp import web
+
+
+class MockPlatformServer:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0):
+        """
+        Serves the Facebook and Instagram publishing endpoints of the Graph API with fake ids.
+
+        Requests without an 'access_token' are rejected with 401, like the Graph API does. Batch requests to
+        the root node are answered with one response per request, each of which fails at the error rate.
+
+        :param latency: Seconds every request is delayed by.
+        :param error_rate: Fraction of requests answered with a 500 error.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.request_count = 0
+        self.batch_count = 0
+        self._ids = itertools.count(1)
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.add_routes([
+            web.post('/{version}/{node}/feed', self.create_object),
+            web.post('/{version}/{node}/photos', self.create_object),
+            web.post('/{version}/{node}/media', self.create_object),
+            web.post('/{version}/{node}/media_publish', self.create_object),
+            web.post('/{version}/', self.batch),
+        ])
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Starts serving in the running event loop.
+
+        :param host: The interface to listen on.
+        :param port: The port to listen on; 0 picks a free one.
+        :return: The base URL to use as HTTP_CONFIG["graph_api_url"].
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f'http://{host}:{port}/v19.0'
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def create_object(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(await request.post())
+        if 'access_token' not in params:
+            return web.json_response(
+                {'error': {'message': 'An access token is required.', 'type': 'OAuthException', 'code': 104}},
+                status=401)
+        if self.error_rate and random.random() < self.error_rate:
+            return web.json_response(
+                {'error': {'message': 'An unexpected error has occurred.', 'type': 'OAuthException', 'code': 2}},
+                status=500)
+
+        object_id = f'{request.match_info["node"]}_{next(self._ids)}'
+        return web.json_response({'id': object_id})
+
+    async def batch(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        self.batch_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        params = await request.post()
+        if 'access_token' not in params:
+            return web.json_response(
+                {'error': {'message': 'An access token is required.', 'type': 'OAuthException', 'code': 104}},
+                status=401)
+        responses = []
+        for item in json.loads(params['batch']):
+            if self.error_rate and random.random() < self.error_rate:
+                body = {'error': {'message': 'An unexpected error has occurred.', 'type': 'OAuthException',
+                                  'code': 2}}
+                responses.append({'code': 500, 'body': json.dumps(body)})
+                continue
+            node = item['relative_url'].split('/')[0]
+            responses.append({'code': 200, 'body': json.dumps({'id': f'{node}_{next(self._ids)}'})})
+        return web.json_response(responses)
+
+
+async def serve(host: str, port: int, latency: float, error_rate: float):
+    server = MockPlatformServer(latency, error_rate)
+    base_url = await server.start(host, port)
+    print(f'Mock Graph API listening on {base_url}')
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds every request is delayed by')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with 500')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.latency, args.error_rate))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,179 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, MISSING
+from datetime import datetime
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple
 import pandas as pd
 
 
-@dataclass
+def column_values(column: pd.Series) -> list:
+    """
+    Returns the values of a column as Python objects, missing values as None.
+
+    Equal values share one object, so the posts repeating an image path, hashtags or an account do not each
+    hold a copy of it.
+    """
+    codes, uniques = pd.factorize(column)
+    values = uniques.tolist() + [None]  # Code -1 marks a missing value
+    return [values[code] for code in codes.tolist()]
+
+
+def is_local_media(value) -> bool:
+    """Whether a media field holds the path of a local file, rather than a URL or nothing."""
+    return isinstance(value, str) and bool(value) and '://' not in value
+
+
+@dataclass(frozen=True, slots=True)
 class SocialMediaPost:
     """
     Represents a post to be shared on social media platforms.
 
+    Posts are immutable and slotted, so the many posts scheduled ahead take little memory. Build them in bulk
+    from a DataFrame with from_dataframe, or one at a time with from_dataframe_row.
+
     Attributes:
         post_id (int): Unique identifier for the post, typically sourced from an Excel file.
         content (str): The text content of the social media post.
         image_path (str): File path to an image associated with the post, if any.
         hashtags (str): A string of hashtags to include in the post.
     """
+    # Column of the plan each field is read from; platform subclasses add their own fields and columns
+    COLUMNS: ClassVar[Dict[str, str]] = {
+        'post_id': 'Post ID',
+        'content': 'Content',
+        'image_path': 'Image Path',
+        'hashtags': 'Hashtags',
+    }
+    # Fields holding a media file, a local path or a URL, that is prefetched ahead of the post
+    MEDIA_FIELDS: ClassVar[Tuple[str, ...]] = ('image_path',)
+
     post_id: int  # Unique identifier for the post from Excel
     content: str
     image_path: str
     hashtags: str
 
+    @staticmethod
+    def _column_default(field):
+        """The value of a field whose column the plan does not have."""
+        return None if field.default is MISSING else field.default
+
     @classmethod
-    def from_dataframe_row(cls, row: pd.Series) -> 'SocialMediaPost':
+    def from_dataframe_row(cls, row) -> 'SocialMediaPost':
         """
         Converts a row from a DataFrame into a SocialMediaPost object.
 
-        :param row: A pandas Series object representing the data for a single post.
+        :param row: A pandas Series object representing the data for a single post, or a ScheduledPost, whose
+        post is returned if it is of this class. Missing values are None.
         :return: A SocialMediaPost object populated with the data from the row.
         """
-        return cls(
-            post_id=row['Post ID'],
-            content=row['Content'],
-            image_path=row['Image Path'],
-            hashtags=row['Hashtags']
-        )
+        if isinstance(row, ScheduledPost) and type(row.post) is cls:
+            return row.post  # Built in bulk when the post was scheduled
+        values = {}
+        for field in fields(cls):
+            column = cls.COLUMNS[field.name]
+            value = row[column] if column in row else cls._column_default(field)
+            values[field.name] = None if pd.api.types.is_scalar(value) and pd.isna(value) else value
+        return cls(**values)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> List['SocialMediaPost']:
+        """
+        Converts every row of a DataFrame into a post, a column at a time rather than a row at a time.
+
+        :param df: The posts, with the columns in COLUMNS; fields whose column is missing get their default,
+        or None. Missing values are None.
+        :return: The posts, in the order of the rows.
+        """
+        columns = []
+        for field in fields(cls):
+            column = cls.COLUMNS[field.name]
+            columns.append(column_values(df[column]) if column in df.columns else
+                           [cls._column_default(field)] * len(df))
+        return [cls(*values) for values in zip(*columns)]
+
+    def media_paths(self, fields: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Returns the local media files of the post; URLs are fetched by the platform itself.
+
+        :param fields: The media fields to look at, e.g. those a bot uploads. Defaults to MEDIA_FIELDS.
+        """
+        fields = self.MEDIA_FIELDS if fields is None else fields
+        return [value for value in (getattr(self, name) for name in fields) if is_local_media(value)]
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduledPost:
+    """
+    A post waiting for its scheduled time: the platform's post plus what the executor needs to dispatch it.
+
+    It can be read like the plan row it was built from, by column name (e.g. record['Post ID']), so code
+    written for DataFrame rows accepts it as well.
+
+    Attributes:
+        post (SocialMediaPost): The post, of the platform's post class.
+        platform (str): The platform to post to.
+        account (Optional[str]): The account to post with; None for the plan's default account.
+        scheduled_time (datetime): When the post is due.
+    """
+    post: SocialMediaPost
+    platform: str
+    account: Optional[str]
+    scheduled_time: datetime
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, post_classes: Dict[str, type]) -> List['ScheduledPost']:
+        """
+        Builds the scheduled posts of a DataFrame in bulk, every platform's posts with its own post class.
+
+        :param df: The posts, with 'Platform', 'Scheduled Time' and the post classes' columns, and optionally
+        'Account'.
+        :param post_classes: The post class by platform, as written in the 'Platform' column.
+        :return: The scheduled posts, in the order of the rows.
+        """
+        records = [None] * len(df)
+        accounts = column_values(df['Account'].astype(str).where(df['Account'].notna())) \
+            if 'Account' in df.columns else [None] * len(df)
+        scheduled_times = pd.to_datetime(df['Scheduled Time']).dt.to_pydatetime().tolist()
+        platforms = df['Platform'].to_numpy()
+        for platform in pd.unique(platforms):
+            positions = (platforms == platform).nonzero()[0]
+            posts = post_classes[platform].from_dataframe(df.iloc[positions])
+            for position, post in zip(positions.tolist(), posts):
+                records[position] = cls(post, platform, accounts[position], scheduled_times[position])
+        return records
+
+    @classmethod
+    def from_row(cls, row: pd.Series, post_class: type) -> 'ScheduledPost':
+        """Builds the scheduled post of a single row, e.g. one restored from the job store."""
+        account = row.get('Account')
+        return cls(post_class.from_dataframe_row(row), row['Platform'],
+                   None if account is None or pd.isna(account) else str(account),
+                   pd.Timestamp(row['Scheduled Time']).to_pydatetime())
+
+    def __getitem__(self, column: str):
+        if column == 'Post ID':
+            return self.post.post_id
+        if column == 'Scheduled Time':
+            return self.scheduled_time
+        if column == 'Platform':
+            return self.platform
+        if column == 'Account':
+            return self.account
+        name = next((name for name, post_column in self.post.COLUMNS.items() if post_column == column), None)
+        if name is None:
+            raise KeyError(column)
+        return getattr(self.post, name)
+
+    def __contains__(self, column: str) -> bool:
+        return column in ('Platform', 'Account', 'Scheduled Time') or column in self.post.COLUMNS.values()
+
+    def get(self, column: str, default=None):
+        try:
+            return self[column]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the post as a plan row, by column name."""
+        columns = {'Platform': self.platform, 'Account': self.account, 'Scheduled Time': self.scheduled_time}
+        for name, column in self.post.COLUMNS.items():
+            columns[column] = getattr(self.post, name)
+        return columns
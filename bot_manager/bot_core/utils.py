@@ -4,6 +4,7 @@ import logging
 from functools import wraps
 
 from logger_config import logger
+from metrics import BOT_CALL_ERRORS, BOT_CALL_SECONDS
 
 
 def auto_log(func):
@@ -14,11 +15,13 @@ def auto_log(func):
         log_method = getattr(self, f"log_{action}", self.log_action)
         # Initialize result in case it's referenced before being assigned
         result = None
+        platform = getattr(self, 'platform_name', type(self).__name__)
 
         try:
-            # Check for function's async nature and await if necessary
-            result = await func(self, *args, **kwargs) if inspect.iscoroutinefunction(func) else func(self, *args,
-                                                                                                      **kwargs)
+            # Check for function's async nature and await if necessary, timing the call itself without the logging
+            with BOT_CALL_SECONDS.time(platform, action):
+                result = await func(self, *args, **kwargs) if inspect.iscoroutinefunction(func) else func(
+                    self, *args, **kwargs)
 
             level = logging.INFO
             message = "Function executed without a message"
@@ -41,12 +44,15 @@ def auto_log(func):
                 else:
                     log_method(*args, **log_kwargs)
         except Exception as e:
+            BOT_CALL_ERRORS.inc(platform, action, type(e).__name__)
             if callable(self.log_action):
                 await self.log_action(level=logging.ERROR, message=f"Exception in '{action}': {str(e)}",
                                       data=None) if asyncio.iscoroutinefunction(self.log_action) else self.log_action(
                     level=logging.ERROR, message=f"Exception in '{action}': {str(e)}", data=None)
             else:
                 logger.error(f"Critical: log_action method not callable. Exception in '{action}': {str(e)}")
+            # Let the caller decide whether to retry, re-authenticate or give up
+            raise
         return result
 
     @wraps(func)
@@ -1,39 +1,39 @@
 import asyncio
+import json
 import logging
+import os
 import random
 import pandas as pd
-from typing import Tuple, Optional, Any, TypeAlias
+from typing import Tuple, Optional, Any, TypeAlias, ClassVar, Dict, List, Sequence
+from urllib.parse import urlencode
+
+import aiohttp
 
 from bot_manager.bot_core.logging_utils import setup_bot_logs, ContextualLogger
-from bot_manager.bot_core.posts import SocialMediaPost
+from bot_manager.bot_core.posts import SocialMediaPost, is_local_media
 from bot_manager.bot_core.bots import SocialMediaBot
 from bot_manager.bot_core.utils import auto_log
 from bot_manager.bot_core.authenticator import PlatformAuthenticator
 from bot_manager.bot_core import LogType
-from logger_config import logger, console
-from dataclasses import dataclass, asdict
+from bot_manager.bot_core.errors import TransientError
+from bot_manager.bot_core.http_client import error_for_status
+from logger_config import logger
+from metrics import BOT_CALL_ERRORS, BOT_CALL_SECONDS
+from dataclasses import dataclass
 
 import threading
 import time
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FacebookPost(SocialMediaPost):
-    video: str = None  # Facebook specific attribute
+    """
+    Adds the Facebook-specific data, taken from the optional 'Video' column.
+    """
+    COLUMNS: ClassVar[Dict[str, str]] = {**SocialMediaPost.COLUMNS, 'video': 'Video'}
+    MEDIA_FIELDS: ClassVar[Tuple[str, ...]] = (*SocialMediaPost.MEDIA_FIELDS, 'video')
 
-    @classmethod
-    def from_dataframe_row(cls, row: pd.Series) -> 'FacebookPost':
-        """
-        Overrides the factory method to include Facebook-specific data.
-        """
-        # Create an instance of the base class
-        base_post = super().from_dataframe_row(row)
-        # Convert the base class instance to a dictionary
-        base_post_dict = asdict(base_post)
-        # Now update the dictionary with subclass-specific fields
-        base_post_dict.update({'video': row.get('Video', '')})
-        # Create and return an instance of the subclass
-        return cls(**base_post_dict)
+    video: str = ''  # Facebook specific attribute
 
 
 class PlatformAuthenticatorFacebook(PlatformAuthenticator):
@@ -50,6 +50,11 @@ class PlatformAuthenticatorFacebook(PlatformAuthenticator):
 
 class FacebookBot(SocialMediaBot):
     platform_name = property(lambda self: "Facebook")
+    post_class = FacebookPost
+    # Simulated posts have no batch endpoint
+    supports_batch = property(lambda self: self.http.base_url is not None)
+    # Nor do they upload the media; the video is not posted yet
+    upload_fields = property(lambda self: ('image_path',) if self.http.base_url is not None else ())
 
     def create_auth_manager(self, api_key, api_secret):
         return PlatformAuthenticatorFacebook(api_key, api_secret)
@@ -64,6 +69,20 @@ class FacebookBot(SocialMediaBot):
         # Simulate the request operation
         print(f"Posting {post}...")
 
+        if self.http.base_url is not None:
+            path, data = self.graph_request(post)
+            data = {**data, 'access_token': self.get_access_token()}
+            if is_local_media(post.image_path):
+                # Uploaded from the cache; the executor read the file ahead of time
+                media_file = self.media.get(post.image_path) or \
+                    await asyncio.to_thread(self.media.load, post.image_path)
+                form = aiohttp.FormData(data)
+                form.add_field('source', memoryview(media_file.data), filename=os.path.basename(post.image_path))
+                response = await self.http.post(path, data=form)
+            else:
+                response = await self.http.post(path, data=data)
+            return logging.INFO, f"Posted - {response['id']}", response
+
         # Simulated delay or network operation
         await asyncio.sleep(random.uniform(0.1, 0.3))
         
@@ -79,6 +98,59 @@ class FacebookBot(SocialMediaBot):
         # The return value will be picked up by the auto_log decorator
         return logging.DEBUG, "message", True
 
+    async def post_many(self, posts: Sequence[FacebookPost]) -> List:
+        """
+        Sends the posts with one Graph API batch request, and logs the outcome of each of them.
+
+        A post failing within the batch gets the error a single request would have raised. If the batch request
+        itself fails, the error is raised for all posts. Simulated posts are posted one by one.
+        """
+        if self.http.base_url is None:
+            return await super().post_many(posts)
+
+        batch = []
+        for post in posts:
+            path, data = self.graph_request(post)
+            batch.append({'method': 'POST', 'relative_url': path, 'body': urlencode(data)})
+        try:
+            with BOT_CALL_SECONDS.time(self.platform_name, 'post_many'):
+                responses = await self.http.post('', data={'access_token': self.get_access_token(),
+                                                           'batch': json.dumps(batch)})
+        except Exception as e:
+            BOT_CALL_ERRORS.inc(self.platform_name, 'post_many', type(e).__name__)
+            self.log_action(logging.ERROR, f"Exception in 'post_many': {e}")
+            raise
+
+        results = []
+        for post, response in zip(posts, responses):
+            if response is None:
+                # The Graph API stops processing a batch that takes too long
+                error = TransientError('The batch request timed out before the post was sent')
+            elif response['code'] >= 400:
+                error = error_for_status(response['code'], response['body']) or \
+                    RuntimeError(f"{response['code']}: {response['body']}")
+            else:
+                body = json.loads(response['body'])
+                self.log_post(post, logging.INFO, f"Posted - {body['id']}")
+                results.append((logging.INFO, f"Posted - {body['id']}", body))
+                continue
+            self.log_post(post, logging.ERROR, f"Exception in 'post': {error}")
+            results.append(error)
+        return results
+
+    @staticmethod
+    def graph_request(post: FacebookPost) -> Tuple[str, Dict[str, str]]:
+        """
+        Returns the Graph API path and parameters publishing a post, without the access token and without the
+        image if it is a local file, which is uploaded as 'source'.
+        """
+        caption = f"{post.content} {post.hashtags}"
+        if is_local_media(post.image_path):
+            return 'me/photos', {'caption': caption}
+        if isinstance(post.image_path, str) and post.image_path:
+            return 'me/photos', {'url': post.image_path, 'caption': caption}
+        return 'me/feed', {'message': caption}
+
     @auto_log
     def test(self):
         return logging.DEBUG, "test", True
\ No newline at end of file
@@ -2,7 +2,7 @@ import asyncio
 import logging
 import random
 import pandas as pd
-from typing import Tuple, Optional, Any, TypeAlias
+from typing import Tuple, Optional, Any, TypeAlias, ClassVar, Dict
 
 from bot_manager.bot_core.logging_utils import setup_bot_logs, ContextualLogger
 from bot_manager.bot_core.posts import SocialMediaPost
@@ -10,30 +10,22 @@ from bot_manager.bot_core.bots import SocialMediaBot
 from bot_manager.bot_core.utils import auto_log
 from bot_manager.bot_core.authenticator import PlatformAuthenticator
 from bot_manager.bot_core import LogType
-from logger_config import logger, console
-from dataclasses import dataclass, asdict
+from logger_config import logger
+from dataclasses import dataclass
 
 import threading
 import time
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class InstagramPost(SocialMediaPost):
-    reel: str = None  # Facebook specific attribute
-
-    @classmethod
-    def from_dataframe_row(cls, row: pd.Series) -> 'InstagramPost':
-        """
-        Overrides the factory method to include Facebook-specific data.
-        """
-        # Create an instance of the base class
-        base_post = super().from_dataframe_row(row)
-        # Convert the base class instance to a dictionary
-        base_post_dict = asdict(base_post)
-        # Now update the dictionary with subclass-specific fields
-        base_post_dict.update({'reel': row.get('Reel', '')})
-        # Create and return an instance of the subclass
-        return cls(**base_post_dict)
+    """
+    Adds the Instagram-specific data, taken from the optional 'Reel' column.
+    """
+    COLUMNS: ClassVar[Dict[str, str]] = {**SocialMediaPost.COLUMNS, 'reel': 'Reel'}
+    MEDIA_FIELDS: ClassVar[Tuple[str, ...]] = (*SocialMediaPost.MEDIA_FIELDS, 'reel')
+
+    reel: str = ''  # Instagram specific attribute
 
 
 class PlatformAuthenticatorInstagram(PlatformAuthenticator):
@@ -50,6 +42,7 @@ class PlatformAuthenticatorInstagram(PlatformAuthenticator):
 
 class InstagramBot(SocialMediaBot):
     platform_name = property(lambda self: "Instagram")
+    post_class = InstagramPost
 
     def create_auth_manager(self, api_key, api_secret):
         return PlatformAuthenticatorInstagram(api_key, api_secret)
@@ -64,6 +57,14 @@ class InstagramBot(SocialMediaBot):
         # Simulate the request operation
         print(f"Posting {post}...")
 
+        if self.http.base_url is not None:
+            data = {'access_token': self.get_access_token()}
+            # Instagram publishes in two steps: create a media container, then publish it
+            container = await self.http.post('me/media', data={**data, 'image_url': post.image_path,
+                                                               'caption': f"{post.content} {post.hashtags}"})
+            response = await self.http.post('me/media_publish', data={**data, 'creation_id': container['id']})
+            return logging.INFO, f"Posted - {response['id']}", response
+
         # Simulated delay or network operation
         await asyncio.sleep(random.uniform(0.1, 0.3))
 
@@ -4,8 +4,111 @@ LOGGING_CONFIG = {
     # Set the minimum logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     "terminal_log_level": logging.DEBUG,  # recommended INFO
     "bots_log_level": logging.DEBUG,  # minimum INFO for correct functioning
+    # Bot logs are written by a background thread, flushed every N records or seconds, whichever comes first
+    "bots_log_batch_size": 500,
+    "bots_log_flush_interval": 1.0,
 
     # TODO: Marek: Setting for directories. Not working yet.
     "terminal_logs_directory": "",
     "bots_logs_directory": 'bot_manager/logs'
 }
+
+PLAN_WATCH_CONFIG = {
+    # Reload the plan and reschedule changed posts as soon as the workbook is saved
+    "enabled": True,
+    "poll_interval": 1.0,  # seconds between checks of the workbook's modification time
+}
+
+RATE_LIMIT_CONFIG = {
+    # Limits per platform, keyed by the lowercase platform name. 'max_in_flight' caps concurrent requests,
+    # 'rate' (requests per second) and 'burst' configure a token bucket. None means no limit.
+    "platforms": {
+        "default": {"max_in_flight": 10, "rate": 10.0, "burst": 10},
+        "facebook": {"max_in_flight": 10, "rate": 10.0, "burst": 20},
+        "instagram": {"max_in_flight": 5, "rate": 5.0, "burst": 10},
+    },
+    # Limits per account on a platform, keyed "<platform>:<account>"; 'default' applies to all other accounts
+    "accounts": {
+        "default": {"max_in_flight": 5, "rate": 5.0, "burst": 10},
+    },
+}
+
+RETRY_CONFIG = {
+    # Timeouts, connection and server errors: exponential backoff with full jitter
+    "transient": {"max_attempts": 5, "base_delay": 2.0, "max_delay": 300.0, "multiplier": 2.0, "jitter": 1.0},
+    # Expired or invalid credentials: re-authenticate and retry once
+    "credential": {"max_attempts": 2, "base_delay": 0.0, "reauthenticate": True},
+    # Posts failing after all attempts are stored in '<plan>_dead_letters.jsonl' in this directory
+    "dead_letter_directory": 'bot_manager/logs',
+}
+
+HTTP_CONFIG = {
+    # Graph API base URL including the version, e.g. "https://graph.facebook.com/v19.0". None simulates the
+    # requests; "http://127.0.0.1:8765/v19.0" targets the local mock server (bot_manager/bot_core/mock_platform_server.py)
+    "graph_api_url": None,
+    "max_connections": 100,  # open connections in total
+    "max_connections_per_host": 20,
+    "dns_cache_ttl": 300,  # seconds
+    "keepalive_timeout": 30,  # seconds an idle connection is kept open
+    "total_timeout": 30,  # seconds per request
+    "connect_timeout": 10,
+}
+
+
+SHARDING_CONFIG = {
+    # Worker processes the plans are spread over (main.py --workers); 1 runs everything in one process
+    "workers": 1,
+    # Restarts of a crashed worker before its plans are given up on
+    "max_restarts": 5,
+    "restart_delay": 1.0,  # seconds before a crashed worker is started again
+}
+
+SCHEDULER_CONFIG = {
+    # SQLite database persisting the scheduled posts by (plan, Post ID), so they survive a restart.
+    # None keeps them in memory only
+    "job_store": 'bot_manager/logs/state.db',
+    # Seconds a post may start late, e.g. because the event loop was busy, and still run
+    "misfire_grace_time": 300,
+    # Posts overdue by more than the grace time (e.g. the service was down) are posted late, spread out at
+    # 'catch_up_rate' posts per second, unless they are older than 'catch_up_max_age' seconds
+    "catch_up": True,
+    "catch_up_rate": 0.2,
+    "catch_up_max_age": 24 * 60 * 60,
+}
+
+BATCH_CONFIG = {
+    # Posts of one platform and account that are due within 'window' seconds are sent with one request, up to
+    # 'max_size' posts, by bots with a batch endpoint (see SocialMediaBot.post_many). Other bots post one by one.
+    # A batch still costs one RATE_LIMIT_CONFIG token per post
+    "enabled": True,
+    "window": 0.05,
+    "max_size": 50,  # the Graph API accepts up to 50 requests per batch
+}
+
+MEDIA_CONFIG = {
+    # Local media files of a post (image, video, reel) are checked, hashed and read into memory 'lead_time'
+    # seconds before it is due, so a broken file is reported early and posting does no disk I/O. URLs are left
+    # to the platform
+    "prefetch": True,
+    "lead_time": 600,
+    "cache_bytes": 512 * 1024 * 1024,  # read files are evicted, least recently used first, beyond this size
+    "mmap_threshold": 16 * 1024 * 1024,  # larger files are memory-mapped instead of read
+    "max_file_bytes": 1024 * 1024 * 1024,  # larger files are rejected as broken
+}
+
+POST_STORE_CONFIG = {
+    # SQLite database holding the posts and their statuses at runtime. The plan workbooks are imported into it
+    # when they change; the statuses are exported back to them at 23:00
+    "database": 'bot_manager/logs/state.db',
+}
+
+METRICS_CONFIG = {
+    # Local endpoint serving the metrics (metrics.py) in the Prometheus text format at /metrics and as JSON at
+    # /metrics.json. Sharded worker processes serve theirs on the following ports, one per worker
+    "enabled": True,
+    "host": '127.0.0.1',
+    "port": 9464,
+    # The metrics are also written to this JSON file every 'json_dump_interval' seconds; None disables it
+    "json_dump_path": 'bot_manager/logs/metrics.json',
+    "json_dump_interval": 60,
+}
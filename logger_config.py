@@ -1,26 +1,31 @@
 # logger_config.py
 
 import logging
-from rich.logging import RichHandler
-from rich.console import Console
 from config import LOGGING_CONFIG
 
+# The application's logger. Importing this module only creates it; the entry points call setup_logger() to
+# print its records with Rich, so importing the modules that log does not load rich
+logger = logging.getLogger("rich")
+
 
 # Setup logging using Rich
 def setup_logger():
+    from rich.logging import RichHandler
+
     logging.basicConfig(
         level=LOGGING_CONFIG["terminal_log_level"],
         format="%(message)s",
         datefmt="[%X]",
         handlers=[RichHandler(rich_tracebacks=True)]
     )
-
-    logger = logging.getLogger("rich")
     return logger
 
 
-# Initialize and export the logs
-logger = setup_logger()
+def __getattr__(name):
+    # Rich console, created on first use
+    if name == 'console':
+        from rich.console import Console
 
-# Initialize Rich console
-console = Console()
+        globals()['console'] = Console()
+        return globals()['console']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,55 +1,222 @@
+import argparse
 import asyncio
-import time
+import functools
+import signal
+from datetime import datetime
 from pathlib import Path
-from logger_config import logger, console
+from config import (LOGGING_CONFIG, METRICS_CONFIG, PLAN_WATCH_CONFIG, POST_STORE_CONFIG, SCHEDULER_CONFIG,
+                    SHARDING_CONFIG)
+from logger_config import logger, setup_logger
+from metrics import MetricsServer, registry as metrics_registry
 
-from task_management import ExcelDataManager, LogDataManager, TaskScheduler, display_dataframe_as_table
-from social_media import PostExecutor
+from task_management import ExcelDataManager, LogDataManager, JournalDataManager, display_dataframe_as_table
+from task_management.data_manager.log_data_manager import apply_post_statuses
+from task_management.data_manager.post_state_store import PostStateStore
+from task_management.scheduling.async_task_scheduler import AsyncTaskScheduler
+from task_management.scheduling.job_store import PostJobStore
+from task_management.scheduling.plan_watcher import PlanFileWatcher
+from bot_manager.bot_core.http_client import http_client
+from bot_manager.bot_core.logging_utils import shutdown_bot_logs
+from social_media import MultiPlanExecutor
+from sharding import run_sharded
 
 
-def main():
-    excel_file_path = Path("plan.xlsx")
-    log_file_path = Path(f'bot_manager/logs/{excel_file_path.stem}_posts.log')
+class Plan:
+    def __init__(self, excel_file_path: Path, post_store: PostStateStore):
+        """
+        The data managers of one plan workbook.
 
-    excel_manager = ExcelDataManager(excel_file_path)
-    log_manager = LogDataManager(log_file_path)
+        The post store is the runtime source of truth for the plan's posts and statuses; the workbook is
+        imported into it when it changes and the statuses are exported back to it in bulk.
 
-    # Update Excel with all available logs at start-up
-    excel_manager.df = log_manager.update_df_from_logs(excel_manager.df, only_today=False)
-    display_dataframe_as_table(excel_manager.load_current_date_posts(), "Today's posts")
+        :param excel_file_path: Path to the plan's Excel file.
+        :param post_store: The store shared by all plans.
+        """
+        self.excel_file_path = excel_file_path
+        self.name = excel_file_path.stem
+        self.post_store = post_store
+        self.excel_manager = ExcelDataManager(excel_file_path)
+        self.log_manager = LogDataManager(
+            Path(LOGGING_CONFIG["bots_logs_directory"]) / f'{excel_file_path.stem}_posts.log')
+        # Post outcomes as JSON lines; the text log is only scraped for plans that have no journal yet
+        self.journal_manager = JournalDataManager(
+            Path(LOGGING_CONFIG["bots_logs_directory"]) / 'journal' / excel_file_path.stem)
 
-    # Initialize the scheduler and configure tasks using the TaskScheduler class
-    excel_task_scheduler = TaskScheduler()
+    def import_workbook(self):
+        """Imports the rows of the workbook that changed since the last import into the post store."""
+        first_import = not self.post_store.has_plan(self.name)
+        self.post_store.import_dataframe(self.name, self.excel_manager.df)
+        if first_import:
+            # Outcomes from before the store was used are only in the journal or the logs
+            if self.journal_manager.has_records():
+                entries = self.journal_manager.read_journal()
+            else:
+                entries = self.log_manager.read_logs()
+            self.apply_statuses({entry['post_id']: entry['status'] for entry in entries})
 
-    # Initialize post executor and load current data
-    post_task_executor = PostExecutor(excel_file_path, excel_manager.load_current_date_posts())
-    asyncio.run(post_task_executor.start())
+    def todays_posts(self):
+        return self.post_store.posts_for_date(self.name, datetime.now().date())
 
-    @excel_task_scheduler.job('cron', hour=23, minute=0, id='update_excel')
-    def update_excel_from_logs():
-        """Updates the Excel file with today's logs and saves changes."""
-        excel_manager.df = log_manager.update_df_from_logs(excel_manager.df, only_today=True)
-        excel_manager.save_changes_to_excel()
+    def save_statuses(self):
+        """Exports the statuses that changed since the last export to the Excel file."""
+        statuses = self.post_store.dirty_statuses(self.name)
+        if not statuses:
+            return
+        entries = [{'post_id': post_id, 'status': status} for post_id, status in statuses.items()]
+        self.excel_manager.df = apply_post_statuses(self.excel_manager.df, entries)
+        if self.excel_manager.save_changes_to_excel():
+            self.post_store.mark_exported(self.name, statuses)
 
-    @excel_task_scheduler.job('cron', hour=1, minute=0, id='load_excel')
-    def load_excel():
-        """Loads today's posts from Excel and displays them."""
-        excel_manager.load_excel_data()
-        display_dataframe_as_table(excel_manager.load_current_date_posts(), "Today's posts")
+    def apply_statuses(self, statuses):
+        """Sets statuses by 'Post ID', e.g. those a crashed worker process reported before it crashed."""
+        self.post_store.set_statuses(self.name, statuses)
 
-        post_task_executor.update_executor(excel_file_path.name, excel_manager.load_current_date_posts())
-        asyncio.run(post_task_executor.start())
+    def reload(self):
+        """Reloads the Excel file and imports the rows that changed."""
+        self.excel_manager.load_excel_data()
+        self.post_store.import_dataframe(self.name, self.excel_manager.df)
 
-    excel_task_scheduler.start()
-    print(excel_task_scheduler.get_jobs())
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Posts the scheduled posts of one or more plan workbooks.')
+    parser.add_argument('plans', nargs='*', type=Path, default=[Path("plan.xlsx")],
+                        help='Plan workbooks to run (default: plan.xlsx)')
+    parser.add_argument('--workers', type=int, default=SHARDING_CONFIG["workers"],
+                        help='Number of worker processes the plans are spread over; 1 runs them in this process')
+    return parser.parse_args()
 
-if __name__ == "__main__":
-    main()
 
-    # Keep the script running to keep the scheduler active
+async def main(excel_file_paths, rate_limiter=None, on_outcome=None, known_statuses=None, metrics_port=None,
+               metrics_dump_path=None):
+    """
+    Runs the plans until SIGINT or SIGTERM.
+
+    :param excel_file_paths: Paths to the plan workbooks.
+    :param rate_limiter: An optional RateLimiterRegistry; by default one is created from RATE_LIMIT_CONFIG.
+    :param on_outcome: An optional function called with the outcome of every post, see PostExecutor.
+    :param known_statuses: Optional statuses by plan name and 'Post ID' that may be missing from the journal
+    and the logs, applied before scheduling (used by sharding.py when it restarts a worker process).
+    :param metrics_port: Port of the metrics endpoint; by default METRICS_CONFIG["port"].
+    :param metrics_dump_path: File the metrics are dumped to as JSON; by default METRICS_CONFIG["json_dump_path"].
+    """
+    # One scheduler on the running event loop hosts the daily maintenance jobs; the posts of all plans are run
+    # by the executor's dispatcher
+    task_scheduler = AsyncTaskScheduler()
+    # Serializes the jobs that read or replace the Excel data in worker threads
+    excel_lock = asyncio.Lock()
+
+    # The scheduled posts are persisted, so those pending from the last run are back before Excel is parsed
+    job_store = PostJobStore(Path(SCHEDULER_CONFIG["job_store"])) if SCHEDULER_CONFIG["job_store"] else None
+
+    # Posts and their statuses at runtime; the workbooks are only imported and exported
+    post_store = PostStateStore(Path(POST_STORE_CONFIG["database"]))
+
+    def record_outcome(plan_name, platform, post_id, status):
+        # Queued for the store's writer thread, off the event loop; the statuses reach Excel with the 23:00 export
+        post_store.set_status(plan_name, post_id, status)
+        if on_outcome is not None:
+            on_outcome(plan_name, platform, post_id, status)
+
+    # All plans share the dispatcher, the rate limits and the bots' connection pool
+    post_task_executor = MultiPlanExecutor(task_scheduler, rate_limiter, record_outcome, job_store)
+    for excel_file_path in excel_file_paths:
+        post_task_executor.restore_plan(excel_file_path)
+
+    plans = [Plan(excel_file_path, post_store) for excel_file_path in excel_file_paths]
+
+    # Import the edits of the workbooks made while the service was down
+    for plan in plans:
+        plan.import_workbook()
+        if known_statuses and known_statuses.get(plan.name):
+            plan.apply_statuses(known_statuses[plan.name])
+        display_dataframe_as_table(plan.todays_posts(), f"Today's posts - {plan.excel_file_path.name}")
+
+    # Diff today's posts against the restored ones
+    for plan in plans:
+        post_task_executor.add_plan(plan.excel_file_path, plan.todays_posts())
+    await post_task_executor.start()
+
+    @task_scheduler.job('cron', hour=23, minute=0, id='update_excel')
+    async def update_excel_from_logs():
+        """Exports the changed statuses to the Excel files."""
+        # pandas and openpyxl work is blocking, keep it off the event loop
+        async with excel_lock:
+            for plan, plan_watcher in zip(plans, plan_watchers):
+                # The export is not an edit of the plan, so the watcher must not reload it
+                with plan_watcher.own_write():
+                    await asyncio.to_thread(plan.save_statuses)
+
+    async def reload_plan(plan: Plan):
+        """Reloads a plan's Excel file and reschedules only the posts that changed."""
+        async with excel_lock:
+            await asyncio.to_thread(plan.reload)
+            post_task_executor.add_plan(plan.excel_file_path, plan.todays_posts())
+
+    @task_scheduler.job('cron', hour=1, minute=0, id='load_excel')
+    async def load_excel():
+        """Loads today's posts from Excel, displays them and schedules them."""
+        for plan in plans:
+            await reload_plan(plan)
+            display_dataframe_as_table(plan.todays_posts(), f"Today's posts - {plan.excel_file_path.name}")
+
+    # Apply edits of the plans during the day within seconds
+    plan_watchers = [PlanFileWatcher(plan.excel_file_path, functools.partial(reload_plan, plan),
+                                     PLAN_WATCH_CONFIG["poll_interval"]) for plan in plans]
+    if PLAN_WATCH_CONFIG["enabled"]:
+        for plan_watcher in plan_watchers:
+            plan_watcher.start()
+
+    # Scheduler lag, post latencies and the Excel and log jobs, for Prometheus or a look with curl
+    metrics_server = MetricsServer(metrics_registry)
+    if METRICS_CONFIG["enabled"]:
+        try:
+            await metrics_server.start(METRICS_CONFIG["host"], metrics_port or METRICS_CONFIG["port"])
+        except OSError as e:
+            logger.warning(f'Could not serve the metrics: {e}')
+
+    metrics_dump_path = metrics_dump_path or METRICS_CONFIG["json_dump_path"]
+    if metrics_dump_path:
+        @task_scheduler.job('interval', seconds=METRICS_CONFIG["json_dump_interval"], id='dump_metrics')
+        async def dump_metrics():
+            """Writes the metrics to the JSON file."""
+            await asyncio.to_thread(metrics_registry.dump_json, Path(metrics_dump_path))
+
+    print(task_scheduler.get_jobs())
+    # The dispatcher also holds the media prefetch jobs
+    num_scheduled = sum(len(executor.pending_jobs) for executor in post_task_executor.executors.values())
+    logger.info(f'{num_scheduled} posts scheduled.')
+
+    # Keep the event loop running until we are asked to stop
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Not supported on this platform (e.g. Windows); KeyboardInterrupt still cancels main()
+
+    try:
+        await stop_event.wait()
+    finally:
+        for plan_watcher in plan_watchers:
+            await plan_watcher.stop()
+        post_task_executor.shutdown()
+        await metrics_server.stop()
+        await http_client.close()
+        shutdown_bot_logs()
+        if job_store is not None:
+            job_store.close()
+        post_store.close()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logger()
     try:
-        while True:
-            time.sleep(1)
+        if args.workers > 1:
+            # Spread the plans over worker processes, each running main() on its share
+            run_sharded(args.plans, args.workers)
+        else:
+            asyncio.run(main(args.plans))
     except (KeyboardInterrupt, SystemExit):
         pass
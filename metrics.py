@@ -0,0 +1,346 @@
+# metrics.py
+
+"""
+Counters, gauges and latency histograms of the hot paths, exposed in the Prometheus text format.
+
+Recording a value takes a dictionary lookup and a lock, so the metrics can stay on in the dispatch path. Only the
+standard library is imported here; aiohttp is imported when the endpoint is started.
+
+Usage:
+    from metrics import POSTS
+    POSTS.inc(plan_name, platform, 'Posted')
+
+Scrape http://127.0.0.1:9464/metrics (see METRICS_CONFIG), or read the JSON dump.
+"""
+import asyncio
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Sequence, Tuple
+
+from logger_config import logger
+
+# Seconds, from a fast in-memory operation to a slow platform request with retries
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+                   120.0, 300.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class Metric(ABC):
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """
+        A metric with one time series per combination of label values.
+
+        :param name: The metric name, e.g. 'socialmedia_posts_total'.
+        :param documentation: The help text.
+        :param label_names: Names of the labels, whose values are passed positionally when recording.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self):
+        """Yields (suffix, label values, extra label, value) tuples of the metric's time series."""
+        pass
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for suffix, label_values, extra, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.label_names, label_values, extra)} '
+                         f'{_format_value(value)}')
+        return '\n'.join(lines)
+
+    @abstractmethod
+    def to_dict(self):
+        """Returns the metric's time series as JSON serializable values."""
+        pass
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield '', label_values, '', value
+
+    def to_dict(self):
+        with self._lock:
+            return [{'labels': dict(zip(self.label_names, label_values)), 'value': value}
+                    for label_values, value in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def dec(self, *label_values, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+
+class _HistogramSeries:
+    __slots__ = ('bucket_counts', 'sum', 'count')
+
+    def __init__(self, num_buckets: int):
+        self.bucket_counts = [0] * num_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Timer:
+    __slots__ = ('histogram', 'label_values', 'start')
+
+    def __init__(self, histogram: 'Histogram', label_values: Tuple):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+        return False
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Counts of observed values per bucket, with their sum and count.
+
+        :param buckets: Upper bounds of the buckets, ascending; the +Inf bucket is added.
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, _HistogramSeries] = {}
+
+    def observe(self, value: float, *label_values):
+        # Only the bucket the value falls into is counted; render() accumulates them
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = _HistogramSeries(len(self.buckets) + 1)
+            series.bucket_counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def time(self, *label_values) -> _Timer:
+        """Returns a context manager observing the seconds its block took."""
+        return _Timer(self, label_values)
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return 0 if series is None else series.count
+
+    def _snapshot(self):
+        with self._lock:
+            return [(label_values, list(series.bucket_counts), series.sum, series.count)
+                    for label_values, series in self._series.items()]
+
+    def samples(self):
+        for label_values, bucket_counts, total, count in self._snapshot():
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                yield '_bucket', label_values, f'le="{_format_value(upper_bound)}"', cumulative
+            yield '_sum', label_values, '', total
+            yield '_count', label_values, '', count
+
+    def to_dict(self):
+        series = []
+        for label_values, bucket_counts, total, count in self._snapshot():
+            series.append({'labels': dict(zip(self.label_names, label_values)), 'count': count, 'sum': total,
+                           'buckets': {_format_value(upper_bound): bucket_count for upper_bound, bucket_count
+                                       in zip(self.buckets + (math.inf,), bucket_counts)}})
+        return series
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """The metrics of the process, by name."""
+        self.metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_class, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f'Metric {name} is already registered as a {metric.kind}.')
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets)
+
+    def render_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format, version 0.0.4."""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: {'type': metric.kind, 'help': metric.documentation, 'series': metric.to_dict()}
+                for metric in metrics}
+
+    def dump_json(self, path: Path):
+        """Writes the metrics to a JSON file, replacing it atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_name(path.name + '.tmp')
+        temporary_path.write_text(json.dumps({'timestamp': time.time(), 'metrics': self.to_dict()}))
+        os.replace(temporary_path, path)
+
+
+def timed(histogram: Histogram, *label_values) -> Callable:
+    """Decorator observing the seconds every call of a function or coroutine function takes."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with histogram.time(*label_values):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(*label_values):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+class MetricsServer:
+    def __init__(self, registry: 'MetricsRegistry'):
+        """
+        Serves the metrics over HTTP: '/metrics' in the Prometheus text format and '/metrics.json' as JSON.
+
+        :param registry: The metrics to serve.
+        """
+        self.registry = registry
+        self._runner = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Starts serving in the running event loop.
+
+        :param host: The interface to listen on; keep it local unless the port is protected.
+        :param port: The port to listen on; 0 picks a free one.
+        :return: The URL of the Prometheus endpoint.
+        """
+        from aiohttp import web
+
+        async def prometheus(request):
+            return web.Response(body=self.registry.render_prometheus().encode(),
+                                headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+        async def as_json(request):
+            return web.json_response(self.registry.to_dict())
+
+        app = web.Application()
+        app.add_routes([web.get('/metrics', prometheus), web.get('/metrics.json', as_json)])
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        port = self._runner.addresses[0][1]
+        logger.info(f'Serving metrics on http://{host}:{port}/metrics')
+        return f'http://{host}:{port}/metrics'
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# The metrics of the process
+registry = MetricsRegistry()
+
+# Posting
+POSTS = registry.counter('socialmedia_posts_total', 'Posts by outcome.', ('plan', 'platform', 'status'))
+POST_LATENCY = registry.histogram('socialmedia_post_latency_seconds',
+                                  'Seconds from the first attempt of a post to its outcome, including retries.',
+                                  ('platform',))
+SCHEDULER_LAG = registry.histogram('socialmedia_scheduler_lag_seconds',
+                                   'Seconds a post started after its Scheduled Time.', ('platform',))
+POSTS_IN_FLIGHT = registry.gauge('socialmedia_posts_in_flight', 'Posts being executed.', ('platform',))
+POSTS_PENDING = registry.gauge('socialmedia_posts_pending', 'Posts scheduled and not executed yet.', ('plan',))
+BATCH_SIZE = registry.histogram('socialmedia_batch_size', 'Posts per coalesced batch request.', ('platform',),
+                                buckets=(1, 2, 5, 10, 20, 50, 100))
+
+# Rate limits, per platform and account; the account is '*' for the limiter of the whole platform
+RATE_LIMIT_WAITING = registry.gauge('socialmedia_rate_limit_waiting', 'Calls waiting for a rate limiter.',
+                                    ('platform', 'account'))
+RATE_LIMIT_WAIT_SECONDS = registry.histogram('socialmedia_rate_limit_wait_seconds',
+                                             'Seconds calls waited for a rate limiter.', ('platform', 'account'))
+
+# Bots
+BOT_CALL_SECONDS = registry.histogram('socialmedia_bot_call_seconds',
+                                      'Seconds per bot action, e.g. one post request.', ('platform', 'action'))
+BOT_CALL_ERRORS = registry.counter('socialmedia_bot_call_errors_total', 'Bot actions that raised.',
+                                   ('platform', 'action', 'error'))
+
+# Media of the posts
+MEDIA_CACHE_BYTES = registry.gauge('socialmedia_media_cache_bytes', 'Bytes of media files held by the cache.')
+MEDIA_ERRORS = registry.counter('socialmedia_media_errors_total', 'Posts found with a broken media file.',
+                                ('plan',))
+
+# Excel and log jobs
+DATA_JOB_SECONDS = registry.histogram('socialmedia_data_job_seconds',
+                                      'Seconds per Excel or log job, e.g. loading or saving a plan.', ('job',))
+LOG_ENTRIES_READ = registry.counter('socialmedia_log_entries_read_total', 'Post entries read from the bot logs.')
@@ -0,0 +1,217 @@
+"""
+Spreads plans over worker processes, so pandas, openpyxl and log work of one plan does not hold up the posts of
+another plan behind the GIL.
+
+Usage:
+    python main.py --workers 4 plan_a.xlsx plan_b.xlsx plan_c.xlsx
+"""
+import asyncio
+import math
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from config import METRICS_CONFIG, RATE_LIMIT_CONFIG, SHARDING_CONFIG
+from logger_config import logger, setup_logger
+
+
+def assign_plans(plan_paths: List[Path], num_workers: int) -> List[List[Path]]:
+    """
+    Partitions the plans round-robin by name, so the same plans always end up with the same worker.
+
+    :return: One list of plan paths per worker; workers without plans are left out.
+    """
+    assignments = [[] for _ in range(num_workers)]
+    for i, plan_path in enumerate(sorted(plan_paths, key=lambda path: path.name)):
+        assignments[i % num_workers].append(plan_path)
+    return [plans for plans in assignments if plans]
+
+
+def scale_rate_limits(config: Dict, num_workers: int, worker_id: int) -> Dict:
+    """
+    Returns a copy of RATE_LIMIT_CONFIG with a worker's share of every limit, so the limits of all workers add up
+    to the configured ones.
+
+    Counts are divided evenly and the remainder goes to the first workers, e.g. 10 calls in flight over 4
+    workers are 3, 3, 2 and 2. A count smaller than the number of workers cannot be divided; every worker keeps
+    one, so none is blocked for good.
+
+    :param config: The limits, see RATE_LIMIT_CONFIG in config.py.
+    :param num_workers: Number of worker processes.
+    :param worker_id: The worker whose share is returned, from 0 to num_workers - 1.
+    """
+    def share(count):
+        quotient, remainder = divmod(count, num_workers)
+        return max(1, quotient + (1 if worker_id < remainder else 0))
+
+    def scale(limits):
+        if limits is None:
+            return None
+        scaled = dict(limits)
+        if scaled.get('max_in_flight') is not None:
+            scaled['max_in_flight'] = share(scaled['max_in_flight'])
+        if scaled.get('rate') is not None:
+            scaled['rate'] = scaled['rate'] / num_workers
+            scaled['burst'] = share(scaled.get('burst') or max(1, math.floor(limits['rate'])))
+        return scaled
+
+    return {section: {key: scale(limits) for key, limits in config.get(section, {}).items()}
+            for section in ('platforms', 'accounts')}
+
+
+def run_plan_worker(worker_id: int, plan_paths: List[Path], status_queue, known_statuses: Dict, num_workers: int):
+    """
+    Runs main() on a share of the plans in a worker process, reporting each post's outcome to the coordinator.
+    """
+    # Imported here, main.py imports this module
+    from main import main
+    from social_media.rate_limiter import RateLimiterRegistry
+
+    # A spawned process starts without the parent's logging setup
+    setup_logger()
+
+    def on_outcome(plan_name, platform, post_id, status):
+        post_id = post_id.item() if hasattr(post_id, 'item') else post_id  # numpy scalars from pandas
+        status_queue.put((worker_id, plan_name, post_id, status))
+
+    rate_limiter = RateLimiterRegistry(scale_rate_limits(RATE_LIMIT_CONFIG, num_workers, worker_id))
+    # Every worker has its own metrics endpoint and dump
+    metrics_port = METRICS_CONFIG["port"] + 1 + worker_id if METRICS_CONFIG["port"] else 0
+    metrics_dump_path = None
+    if METRICS_CONFIG["json_dump_path"]:
+        dump_path = Path(METRICS_CONFIG["json_dump_path"])
+        metrics_dump_path = dump_path.with_name(f'{dump_path.stem}_worker{worker_id}{dump_path.suffix}')
+    try:
+        asyncio.run(main(plan_paths, rate_limiter=rate_limiter, on_outcome=on_outcome,
+                         known_statuses=known_statuses, metrics_port=metrics_port,
+                         metrics_dump_path=metrics_dump_path))
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardCoordinator:
+    def __init__(self, plan_paths: List[Path], num_workers: int, target: Callable = run_plan_worker,
+                 max_restarts: int = SHARDING_CONFIG["max_restarts"],
+                 restart_delay: float = SHARDING_CONFIG["restart_delay"]):
+        """
+        Starts one worker process per share of the plans and collects the outcomes of their posts.
+
+        A worker that exits with an error is started again with the same plans, and with the statuses it
+        reported so far, so posts it completed are not posted again even if its journal was not flushed.
+
+        :param plan_paths: Paths to the plan workbooks.
+        :param num_workers: Number of worker processes at most.
+        :param target: Function run in each worker, called with the worker id, its plan paths, the status
+        queue, the known statuses by plan name and 'Post ID', and the number of workers. It puts
+        (worker_id, plan_name, post_id, status) tuples on the queue.
+        :param max_restarts: Restarts of a worker before it is given up on.
+        :param restart_delay: Seconds before a crashed worker is started again.
+        """
+        self.assignments = assign_plans(plan_paths, num_workers)
+        self.target = target
+        self.max_restarts = max_restarts
+        self.restart_delay = restart_delay
+        # Workers are started from a clean interpreter, not forked from a process with running threads
+        self.context = multiprocessing.get_context('spawn')
+        self.status_queue = self.context.Queue()
+        # Latest status by plan name and 'Post ID', as reported by the workers
+        self.statuses: Dict[str, Dict] = {}
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.restarts = Counter()
+        self.finished = set()
+        self._stopping = False
+
+    def start(self):
+        for worker_id in range(len(self.assignments)):
+            self._start_worker(worker_id)
+
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """
+        Collects outcomes and restarts crashed workers until stop_event is set or every worker has finished.
+        """
+        while not (stop_event is not None and stop_event.is_set()) and len(self.finished) < len(self.assignments):
+            self.collect(timeout=0.5)
+            self.check_workers()
+        self.collect()
+
+    def collect(self, timeout: float = 0.0) -> int:
+        """
+        Records the outcomes the workers reported.
+
+        :param timeout: Seconds to wait for the first outcome.
+        :return: The number of outcomes recorded.
+        """
+        count = 0
+        while True:
+            try:
+                worker_id, plan_name, post_id, status = self.status_queue.get(timeout=timeout if count == 0 else 0)
+            except queue.Empty:
+                return count
+            self.statuses.setdefault(plan_name, {})[post_id] = status
+            logger.debug(f'Worker {worker_id}: {plan_name} post {post_id} - {status}')
+            count += 1
+
+    def check_workers(self):
+        """Restarts the workers that crashed and records those that exited normally."""
+        for worker_id, process in list(self.processes.items()):
+            if process.is_alive() or worker_id in self.finished:
+                continue
+            # Take what the worker reported before it exited, so a restart does not repeat it
+            self.collect()
+            if process.exitcode == 0 or self._stopping:
+                self.finished.add(worker_id)
+            elif self.restarts[worker_id] >= self.max_restarts:
+                logger.error(f'Worker {worker_id} crashed {self.restarts[worker_id] + 1} times, giving up on '
+                             f'{[path.name for path in self.assignments[worker_id]]}.')
+                self.finished.add(worker_id)
+            else:
+                self.restarts[worker_id] += 1
+                logger.warning(f'Worker {worker_id} exited with code {process.exitcode}, restarting it '
+                               f'({self.restarts[worker_id]}/{self.max_restarts}).')
+                time.sleep(self.restart_delay)
+                self._start_worker(worker_id)
+
+    def stop(self, timeout: float = 10.0):
+        """Asks the workers to shut down (SIGTERM), and kills those that do not exit within the timeout."""
+        self._stopping = True
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            while process.is_alive() and time.monotonic() < deadline:
+                # Keep the queue drained, a worker cannot exit while its queued outcomes are not read
+                self.collect(timeout=0.1)
+            if process.is_alive():
+                process.kill()
+            process.join()
+        self.collect()
+
+    def _start_worker(self, worker_id: int):
+        plan_paths = self.assignments[worker_id]
+        known_statuses = {path.stem: dict(self.statuses.get(path.stem, {})) for path in plan_paths}
+        process = self.context.Process(
+            target=self.target, name=f'plan-worker-{worker_id}',
+            args=(worker_id, plan_paths, self.status_queue, known_statuses, len(self.assignments)))
+        process.start()
+        self.processes[worker_id] = process
+
+
+def run_sharded(plan_paths: List[Path], num_workers: int):
+    """Runs the plans in worker processes until SIGINT or SIGTERM."""
+    coordinator = ShardCoordinator(plan_paths, num_workers)
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda signum, frame: stop_event.set())
+
+    coordinator.start()
+    logger.info(f'Running {len(plan_paths)} plans in {len(coordinator.assignments)} worker processes.')
+    try:
+        coordinator.run(stop_event)
+    finally:
+        coordinator.stop()
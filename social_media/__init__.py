@@ -1,2 +1,30 @@
-from .bot_manager import BotManager
-from .post_executor import PostExecutor
\ No newline at end of file
+# Imported on first access (PEP 562), so importing a submodule such as social_media.rate_limiter does not load
+# pandas and the bots
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bot_manager import BotManager
+    from .post_executor import PostExecutor
+    from .multi_plan_executor import MultiPlanExecutor
+
+_LAZY_ATTRIBUTES = {
+    'BotManager': '.bot_manager',
+    'PostExecutor': '.post_executor',
+    'MultiPlanExecutor': '.multi_plan_executor',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,50 +1,138 @@
-import os
 import importlib
-from typing import Dict, Type, Optional
+import threading
+from importlib.metadata import entry_points
+from typing import Dict, Type, Optional, Tuple
 from pathlib import Path
 from bot_manager.bot_core.bots import SocialMediaProtocol, SocialMediaPost  # Import the protocol and post class
-from logger_config import logger, console
+from logger_config import logger
+
+# Entry point group through which installed packages can provide bots, e.g.
+# [project.entry-points."social_media_manager.bots"] linkedin = "linkedin_bot:LinkedinBot"
+BOTS_ENTRY_POINT_GROUP = 'social_media_manager.bots'
+
+
+class PlatformRegistry:
+    def __init__(self, bots_dir: Path = Path(__file__).parent.parent / 'bot_manager' / 'bots',
+                 entry_point_group: str = BOTS_ENTRY_POINT_GROUP):
+        """
+        The bot classes by platform name, discovered once per process and imported on first use.
+
+        Platforms are discovered from the file names in the bots directory, where 'facebook.py' provides
+        'FacebookBot', and from the entry points of installed packages. Discovery does not import anything; a
+        platform's module is imported the first time its bot class is requested. Unknown platforms are
+        remembered as well, so a misspelled platform in a plan does not rescan the directory on every post;
+        call :meth:`refresh` to pick up bots added while running.
+
+        :param bots_dir: Directory holding one module per platform.
+        :param entry_point_group: Entry point group of bot classes provided by installed packages.
+        """
+        self.bots_dir = bots_dir
+        self.entry_point_group = entry_point_group
+        # Module or entry point to import by platform name, None until discovered
+        self._sources: Optional[Dict[str, Tuple[str, str]]] = None
+        self._classes: Dict[str, Type[SocialMediaProtocol]] = {}
+        self._missing = set()
+        # Executors of several plans may look up bots from worker threads
+        self._lock = threading.Lock()
+
+    def _discover(self) -> Dict[str, Tuple[str, str]]:
+        sources = {}
+        for file in self.bots_dir.iterdir():
+            if file.is_file() and file.suffix == '.py' and file.name != '__init__.py':
+                module_name = file.stem  # Extracts the file name without '.py'
+                class_name = module_name.capitalize() + 'Bot'  # Construct the class name based on file name
+                sources[module_name.lower()] = (f'bot_manager.bots.{module_name}', class_name)
+        for entry_point in entry_points(group=self.entry_point_group):
+            module_name, _, class_name = entry_point.value.partition(':')
+            sources.setdefault(entry_point.name.lower(), (module_name, class_name))
+        return sources
+
+    def platforms(self):
+        """Returns the names of the discovered platforms, without importing their modules."""
+        with self._lock:
+            if self._sources is None:
+                self._sources = self._discover()
+            return sorted(self._sources)
+
+    def get(self, platform_name: str) -> Optional[Type[SocialMediaProtocol]]:
+        """
+        Returns the bot class of a platform, importing its module on first use.
+
+        :param platform_name: The platform, case insensitive.
+        :return: The bot class, or None if there is no bot for the platform.
+        """
+        platform_name = platform_name.lower()
+        bot_class = self._classes.get(platform_name)
+        if bot_class is not None or platform_name in self._missing:
+            return bot_class
+
+        with self._lock:
+            if self._sources is None:
+                self._sources = self._discover()
+            if platform_name in self._classes or platform_name in self._missing:
+                return self._classes.get(platform_name)
+
+            source = self._sources.get(platform_name)
+            if source is not None:
+                module_name, class_name = source
+                try:
+                    module = importlib.import_module(module_name)
+                    bot_class = getattr(module, class_name, None)
+                except Exception as e:
+                    logger.error(f"Error importing the bot for platform {platform_name}: {e}")
+            if bot_class and issubclass(bot_class, SocialMediaProtocol):
+                self._classes[platform_name] = bot_class
+            else:
+                bot_class = None
+                self._missing.add(platform_name)
+            return bot_class
+
+    def refresh(self):
+        """Discovers the platforms again and forgets the unknown ones; imported bot classes are kept."""
+        with self._lock:
+            self._sources = self._discover()
+            self._missing.clear()
+
+
+# Shared by the bot managers of all plans in the process
+platform_registry = PlatformRegistry()
 
 
 class BotManager:
-    def __init__(self, excel_file_name: str):
+    def __init__(self, excel_file_name: str, registry: PlatformRegistry = platform_registry):
         self.excel_file_name = excel_file_name
-        self.bot_instances: Dict[str, SocialMediaProtocol] = {}
-        self.platform_classes = self.load_platform_post_classes()
+        self.bot_instances: Dict[Tuple[str, Optional[str]], SocialMediaProtocol] = {}
+        self.registry = registry
 
     def load_platform_post_classes(self) -> Dict[str, Type[SocialMediaProtocol]]:
+        """Returns the bot classes of all discovered platforms, importing every platform module."""
         platform_classes = {}
-        # Assuming your bots.py file is in the correct location relative to this file
-        bots_dir = Path(__file__).parent.parent / 'bot_manager' / 'bots'
-        for file in bots_dir.iterdir():
-            if file.is_file() and file.suffix == '.py' and file.name != '__init__.py':
-                module_name = file.stem  # Extracts the file name without '.py'
-                module = importlib.import_module(f'bot_manager.bots.{module_name}')
-                class_name = module_name.capitalize() + 'Bot'  # Construct the class name based on file name
-                bot_class = getattr(module, class_name, None)
-                if bot_class and issubclass(bot_class, SocialMediaProtocol):
-                    platform_classes[module_name.lower()] = bot_class
+        for platform_name in self.registry.platforms():
+            bot_class = self.registry.get(platform_name)
+            if bot_class:
+                platform_classes[platform_name] = bot_class
         return platform_classes
 
     def refresh_platform_classes(self):
-        """Reloads the bot classes from the bots directory."""
-        new_classes = self.load_platform_post_classes()
-        self.platform_classes.update(new_classes)  # Update existing dictionary with any new entries
+        """Discovers bots added to the bots directory or installed since the registry was built."""
+        self.registry.refresh()
 
-    def load_bot(self, platform_name: str) -> Optional[SocialMediaProtocol]:
-        platform_name = platform_name.lower()  # Normalize to lowercase
-        if platform_name not in self.bot_instances:
-            bot_class = self.platform_classes.get(platform_name)
+    def load_bot(self, platform_name: str, account: Optional[str] = None) -> Optional[SocialMediaProtocol]:
+        """
+        Returns the bot posting to a platform with an account of this plan, creating it on first use.
 
-            if not bot_class:
-                # Attempt to reload the platform classes if bot not found
-                self.refresh_platform_classes()
-                bot_class = self.platform_classes.get(platform_name)
+        :param platform_name: The platform, case insensitive.
+        :param account: The account to post with; None for the plan's default account.
+        """
+        platform_name = platform_name.lower()  # Normalize to lowercase
+        key = (platform_name, account)
+        if key not in self.bot_instances:
+            bot_class = self.registry.get(platform_name)
 
             if bot_class:
                 try:
-                    bot_instance = bot_class(self.excel_file_name)  # Instantiate the bot class
-                    self.bot_instances[platform_name] = bot_instance
+                    bot_instance = bot_class(self.excel_file_name, account)  # Instantiate the bot class
+                    self.bot_instances[key] = bot_instance
                     logger.info(f"Created new instance of {bot_class.__name__}.")
                     return bot_instance
                 except Exception as e:
@@ -52,4 +140,4 @@ class BotManager:
             else:
                 logger.error(f"No bot class found for platform: {platform_name}")
 
-        return self.bot_instances.get(platform_name)
+        return self.bot_instances.get(key)
@@ -0,0 +1,68 @@
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+class DeadLetterQueue:
+    def __init__(self, file_path: Path):
+        """
+        A persisted queue of posts that failed after all retries, stored as one JSON record per line.
+
+        Posts may be added from worker threads.
+
+        :param file_path: Path to the JSON lines file.
+        """
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def add(self, plan: str, platform: str, post_id, error: BaseException, attempts: int, row: Dict):
+        """
+        Appends a failed post to the queue.
+
+        :param plan: The name of the plan the post belongs to.
+        :param platform: The platform the post failed on.
+        :param post_id: The 'Post ID' of the post.
+        :param error: The error of the last attempt.
+        :param attempts: The number of attempts made.
+        :param row: The post's data, as JSON serializable values, so it can be replayed.
+        """
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'plan': plan,
+            'platform': platform,
+            'post_id': post_id.item() if hasattr(post_id, 'item') else post_id,  # numpy scalars from pandas
+            'error_class': type(error).__name__,
+            'error': str(error),
+            'attempts': attempts,
+            'row': row,
+        }
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.file_path, 'a') as queue_file:
+                queue_file.write(line)
+
+    def entries(self) -> List[Dict]:
+        """Returns all posts in the queue, oldest first."""
+        try:
+            with open(self.file_path, 'r') as queue_file:
+                return [json.loads(line) for line in queue_file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def remove(self, post_ids: Iterable):
+        """Removes the posts with the given 'Post ID' values from the queue."""
+        post_ids = set(post_ids)
+        with self._lock:
+            remaining = [entry for entry in self.entries() if entry['post_id'] not in post_ids]
+            temp_file_path = self.file_path.with_name(self.file_path.name + '.tmp')
+            with open(temp_file_path, 'w') as queue_file:
+                for entry in remaining:
+                    queue_file.write(json.dumps(entry, default=str) + '\n')
+            os.replace(temp_file_path, self.file_path)
+
+    def __len__(self):
+        return len(self.entries())
@@ -0,0 +1,102 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from social_media.post_executor import PostExecutor
+from social_media.rate_limiter import RateLimiterRegistry
+from task_management.scheduling.job_store import PostJobStore
+from task_management.scheduling.async_task_scheduler import AsyncTaskScheduler
+from task_management.scheduling.post_dispatcher import PostDispatcher
+from config import RATE_LIMIT_CONFIG
+
+
+class MultiPlanExecutor:
+    def __init__(self, task_scheduler: Optional[AsyncTaskScheduler] = None,
+                 rate_limiter: Optional[RateLimiterRegistry] = None,
+                 on_outcome: Optional[Callable[[str, str, Any, str], None]] = None,
+                 job_store: Optional[PostJobStore] = None, dispatcher: Optional[PostDispatcher] = None):
+        """
+        Runs the posts of several plan workbooks in one process.
+
+        Every plan gets its own PostExecutor, and with it its own bots, credentials, logs and dead-letter queue
+        per platform and account. All plans share one event loop, one dispatcher running their posts, one rate
+        limiter and the bots' pooled HTTP client, so limits hold across plans.
+
+        :param task_scheduler: An optional scheduler of the recurring jobs, e.g. the daily reload, started and
+        stopped together with the posts. When omitted, one is created.
+        :param rate_limiter: An optional registry of per-platform and per-account limits. When omitted, one is
+        created from RATE_LIMIT_CONFIG.
+        :param on_outcome: An optional function called with the outcome of every post, see PostExecutor.
+        :param job_store: An optional durable store of the scheduled posts of all plans, see PostExecutor.
+        :param dispatcher: An optional dispatcher of the posts of all plans. When omitted, one is created.
+        """
+        self.task_scheduler = task_scheduler or AsyncTaskScheduler()
+        self.dispatcher = dispatcher if dispatcher is not None else PostDispatcher()
+        self.rate_limiter = rate_limiter or RateLimiterRegistry(RATE_LIMIT_CONFIG)
+        self.on_outcome = on_outcome
+        self.job_store = job_store
+        # Executors by plan name, i.e. the workbook's file name without its extension
+        self.executors: Dict[str, PostExecutor] = {}
+
+    def add_plan(self, file_path: Path, dataframe: pd.DataFrame) -> PostExecutor:
+        """
+        Adds a plan, or updates it if it was added before, and schedules its posts.
+
+        :param file_path: Path to the plan's Excel file.
+        :param dataframe: The DataFrame containing the plan's posts to schedule.
+        :return: The executor of the plan.
+        """
+        executor = self.executors.get(file_path.stem)
+        if executor is None:
+            executor = self._create_executor(file_path, dataframe)
+            executor.schedule_posts_from_dataframe()
+        else:
+            executor.update_executor(file_path.name, dataframe)
+        return executor
+
+    def restore_plan(self, file_path: Path) -> PostExecutor:
+        """
+        Schedules the posts of a plan that the job store still has pending, before its workbook is parsed.
+
+        :param file_path: Path to the plan's Excel file.
+        :return: The executor of the plan; pass it the plan's DataFrame later with :meth:`add_plan`.
+        """
+        executor = self.executors.get(file_path.stem) or self._create_executor(file_path, None)
+        executor.restore()
+        return executor
+
+    def _create_executor(self, file_path: Path, dataframe: Optional[pd.DataFrame]) -> PostExecutor:
+        executor = PostExecutor(file_path, dataframe, self.dispatcher, self.rate_limiter, self.on_outcome,
+                                self.job_store)
+        self.executors[file_path.stem] = executor
+        return executor
+
+    def remove_plan(self, plan_name: str):
+        """Removes a plan and the posts of it that have not been executed yet."""
+        executor = self.executors.pop(plan_name, None)
+        if executor is not None:
+            executor.close()
+
+    async def start(self):
+        """Starts the shared dispatcher and scheduler; the posts of every added plan are already on the dispatcher."""
+        if not self.dispatcher.running:
+            self.dispatcher.start()
+        if not self.task_scheduler.running:
+            self.task_scheduler.start()
+
+    async def wait_until_done(self):
+        """Waits until the scheduled posts of all plans have been executed, have failed or were missed."""
+        await asyncio.gather(*(executor.wait_until_done() for executor in self.executors.values()))
+
+    async def replay_dead_letters(self):
+        """Posts the dead-lettered posts of all plans again."""
+        await asyncio.gather(*(executor.replay_dead_letters() for executor in self.executors.values()))
+
+    def shutdown(self):
+        """Stops the shared dispatcher and task scheduler without waiting for the running jobs."""
+        if self.dispatcher.running:
+            self.dispatcher.shutdown()
+        if self.task_scheduler.running:
+            self.task_scheduler.shutdown(wait=False)
@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class PostCoalescer:
+    def __init__(self, send: Callable[[Hashable, List[Any]], Awaitable[List[Any]]], window: float = 0.05,
+                 max_size: int = 50):
+        """
+        Groups the posts submitted within a short window by key, e.g. (platform, account), and sends every
+        group with one call.
+
+        A group is sent `window` seconds after its first post was submitted, or as soon as it has `max_size`
+        posts. Every submitter gets the outcome of its own post, so failed posts can be retried one by one.
+
+        :param send: Coroutine function called with a key and the posts of its group. It returns one result per
+        post, in order, or the exception a post failed with; if it raises, every post of the group fails with
+        the error.
+        :param window: Seconds posts are collected for before their group is sent.
+        :param max_size: Posts per group at most, e.g. the size limit of the platform's batch endpoint.
+        """
+        self.send = send
+        self.window = window
+        self.max_size = max_size
+        self._groups: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        # Groups being sent, referenced until they are done
+        self._sending = set()
+
+    async def submit(self, key: Hashable, post: Any) -> Any:
+        """
+        Adds a post to the group of its key and waits until the group was sent.
+
+        :return: The result of the post.
+        :raises: The error the post failed with.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = self._groups.setdefault(key, [])
+        group.append((post, future))
+        if len(group) >= self.max_size:
+            self._flush(key)
+        elif len(group) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await future
+
+    def pending(self, key: Optional[Hashable] = None) -> int:
+        """Returns the number of posts waiting for their group to be sent, of one key or in total."""
+        if key is not None:
+            return len(self._groups.get(key, ()))
+        return sum(len(group) for group in self._groups.values())
+
+    def _flush(self, key: Hashable):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._groups.pop(key, None)
+        if not group:
+            return
+        # A fresh context, so no submitter's context variables (e.g. its Post ID) leak into the group's logs
+        task = asyncio.get_running_loop().create_task(self._send(key, group), context=contextvars.Context())
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, key: Hashable, group: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.send(key, [post for post, _ in group])
+            if len(results) != len(group):
+                raise RuntimeError(f'Sending {len(group)} posts returned {len(results)} results.')
+        except Exception as e:
+            results = [e] * len(group)
+        for (_, future), result in zip(group, results):
+            if future.done():
+                continue  # The submitter was cancelled
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
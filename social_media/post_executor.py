@@ -1,24 +1,77 @@
 import asyncio
+import json
+import logging
+import math
+import time
 import pandas as pd
+from datetime import datetime, timedelta
 from pathlib import Path
-from task_management.scheduling.async_task_scheduler import AsyncTaskScheduler
+from typing import Any, Callable, List, Optional, Tuple
+from task_management.scheduling.post_dispatcher import JOB_MISSED, PostDispatcher
+from task_management.scheduling.job_store import PostJobStore
+from bot_manager.bot_core.errors import MediaError
+from bot_manager.bot_core.logging_utils import current_post_id
+from bot_manager.bot_core.media import media_cache
+from bot_manager.bot_core.posts import ScheduledPost, SocialMediaPost
 from social_media.bot_manager import BotManager
-from logger_config import logger, console
-from bot_manager.bot_core.errors import CredentialError
+from social_media.dead_letter_queue import DeadLetterQueue
+from social_media.post_coalescer import PostCoalescer
+from social_media.rate_limiter import RateLimiterRegistry
+from social_media.retry import RetryEngine
+from config import BATCH_CONFIG, MEDIA_CONFIG, RATE_LIMIT_CONFIG, RETRY_CONFIG, SCHEDULER_CONFIG
+from logger_config import logger
+from metrics import BATCH_SIZE, MEDIA_ERRORS, POSTS, POST_LATENCY, POSTS_IN_FLIGHT, POSTS_PENDING, SCHEDULER_LAG
 
 
 class PostExecutor:
-    def __init__(self, file_path: Path, dataframe: pd.DataFrame):
+    def __init__(self, file_path: Path, dataframe: pd.DataFrame, dispatcher: Optional[PostDispatcher] = None,
+                 rate_limiter: Optional[RateLimiterRegistry] = None,
+                 on_outcome: Optional[Callable[[str, str, Any, str], None]] = None,
+                 job_store: Optional[PostJobStore] = None):
         """
         Initializes the PostExecutor with necessary attributes.
 
         :param file_path: The name of the Excel file to use for bot management.
+        :param dataframe: The DataFrame containing the posts data.
+        :param dispatcher: An optional dispatcher running the posts, shared with other executors. When omitted,
+        the executor creates and owns its own PostDispatcher.
+        :param rate_limiter: An optional registry of per-platform and per-account limits shared with other
+        executors. When omitted, one is created from RATE_LIMIT_CONFIG.
+        :param on_outcome: An optional function called with the plan name, platform, 'Post ID' and resulting
+        status ('Posted', 'Error' or 'Missed') of every executed post, e.g. to report it to another process.
+        :param job_store: An optional durable store the scheduled posts are recorded in, so they survive a
+        restart (see :meth:`restore`). When omitted, the posts are only scheduled in memory.
         """
+        self.plan_name = file_path.stem
         self.bot_manager = BotManager(file_path.name)
-        self.task_scheduler = AsyncTaskScheduler()
+        self.dispatcher = dispatcher if dispatcher is not None else PostDispatcher()
+        self.dispatcher.add_listener(self._on_post_job_event)
+        self.rate_limiter = rate_limiter or RateLimiterRegistry(RATE_LIMIT_CONFIG)
+        self.retry_engine = RetryEngine.from_config(RETRY_CONFIG)
+        # Groups the attempts due at the same time per platform and account, for bots with a batch endpoint
+        self.coalescer = PostCoalescer(self._post_batch, BATCH_CONFIG['window'], BATCH_CONFIG['max_size']) \
+            if BATCH_CONFIG['enabled'] else None
+        self.on_outcome = on_outcome
+        self.job_store = job_store
+        # Local media files of the posts, read ahead of time by prefetch jobs
+        self.media = media_cache
+        # Job ids of pending posts whose media was found broken, mapped to the problem
+        self.broken_media = {}
+        # Posts that failed after all retries, kept for a replay
+        self.dead_letters = self.create_dead_letter_queue(self.plan_name)
         self.df = dataframe
         # Track running tasks
         self.running_tasks = {}
+        # Job ids of posts that are scheduled but have not finished yet, mapped to a hash of their row, their
+        # scheduled time and their 'Post ID'
+        self.pending_jobs = {}
+        # Job ids of posts that already fired, so a reload does not schedule them again
+        self.dispatched_jobs = set()
+        # Set whenever there are no pending post jobs left
+        self.posts_done = asyncio.Event()
+        self.posts_done.set()
+        # Run time of the next post that is caught up after its scheduled time passed
+        self._next_catch_up = None
 
         # Derive the credentials file path from the Excel file name
         # This assumes both files are in the same directory and credentials file has a .json extension
@@ -29,84 +82,407 @@ class PostExecutor:
 
     def update_executor(self, new_excel_file_name: str, new_dataframe: pd.DataFrame):
         """
-        Updates the PostExecutor with new attributes and re-initializes the AsyncTaskScheduler.
+        Updates the PostExecutor with new posts data and reschedules only the posts that changed.
+
+        The dispatcher, the bots and the running tasks are kept; see :meth:`schedule_posts_from_dataframe`
+        for how the new data is applied to the scheduled jobs.
 
         :param new_excel_file_name: The new name of the Excel file to use for bot management.
         :param new_dataframe: The new DataFrame containing the posts data.
         """
-        self.bot_manager = BotManager(new_excel_file_name)
+        if Path(new_excel_file_name).stem != self.plan_name:
+            self.cancel_pending_posts()
+            self.dispatched_jobs.clear()
+            self.plan_name = Path(new_excel_file_name).stem
+            self.bot_manager = BotManager(new_excel_file_name)
+            self.dead_letters = self.create_dead_letter_queue(self.plan_name)
         self.df = new_dataframe
-        self.task_scheduler = AsyncTaskScheduler()
-        self.running_tasks = {}
+        self.schedule_posts_from_dataframe()
 
     async def start(self):
         """
-        Start the event loop and continuously check the number of scheduled tasks.
-        If there are no more tasks, stop the loop.
+        Schedules the posts of the current DataFrame on the running event loop and returns immediately.
+
+        Completion is reported through the ``posts_done`` event; use :meth:`wait_until_done` to wait for it.
         """
-        try:
-            self.schedule_posts_from_dataframe()
-
-            while True:
-                await asyncio.sleep(5)
-                # Check if there are no more scheduled jobs and all running tasks are completed
-                if not self.task_scheduler.get_jobs() and all(not status for status in self.running_tasks.values()):
-                    break
-        except KeyboardInterrupt:
-            # Handle keyboard interrupt if needed
-            pass
-        finally:
-            # Stop the task scheduler
-            self.task_scheduler.shutdown()
+        self.schedule_posts_from_dataframe()
+
+    def restore(self):
+        """
+        Schedules the posts the job store still has pending for this plan, e.g. after a restart.
+
+        This does not need the plan's DataFrame, so posting resumes before the workbook is parsed. A later
+        DataFrame is diffed against the restored jobs like against any other scheduled jobs. Posts whose time
+        passed while the service was down are caught up, see :meth:`schedule_posts_from_dataframe`.
+        """
+        if self.job_store is None:
+            return
+        for job in self.job_store.pending_jobs(self.plan_name):
+            job_id = self.job_id(job['post_id'])
+            if job_id in self.pending_jobs or job_id in self.dispatched_jobs:
+                continue
+            record = ScheduledPost.from_row(job['row'], self.post_class(job['platform']))
+            if self._add_post_job(job_id, job['platform'], record, job['scheduled_time']):
+                self.pending_jobs[job_id] = (job['row_hash'], job['scheduled_time'], job['post_id'])
+                self.posts_done.clear()
+        POSTS_PENDING.set(len(self.pending_jobs), self.plan_name)
+        if not self.dispatcher.running:
+            self.dispatcher.start()
+
+    async def wait_until_done(self):
+        """Waits until every scheduled post has been executed, has failed or was missed."""
+        await self.posts_done.wait()
+
+    async def replay_dead_letters(self):
+        """
+        Posts the dead-lettered posts of this plan again, right away and concurrently.
+
+        The posts are taken off the dead-letter queue first; those that fail again are put back by execute_post.
+        """
+        entries = [entry for entry in self.dead_letters.entries() if entry['plan'] == self.plan_name]
+        if not entries:
+            return
+        self.dead_letters.remove(entry['post_id'] for entry in entries)
+        await asyncio.gather(*(self.execute_post(entry['platform'], pd.Series(entry['row'])) for entry in entries))
+
+    def close(self):
+        """Cancels the pending posts and detaches from the dispatcher, which is left running for others."""
+        self.cancel_pending_posts()
+        self.dispatcher.remove_listener(self._on_post_job_event)
+
+    def shutdown(self):
+        """Stops the dispatcher without waiting for the running posts."""
+        if self.dispatcher.running:
+            self.dispatcher.shutdown()
 
     def schedule_posts_from_dataframe(self):
         """
         Schedules posts from a pandas DataFrame.
 
-        Iterates through the DataFrame rows and schedules each post based on its scheduled time, platform, and content.
-        Only posts with a 'Scheduled' status are queued for posting.
+        Only posts with a 'Scheduled' status are queued for posting. The DataFrame is diffed against the jobs
+        that are already scheduled, by 'Post ID':
+
+        - new posts are added,
+        - posts that are gone or no longer 'Scheduled' are removed,
+        - posts whose scheduled time, platform or content changed are rescheduled or updated,
+        - unchanged posts and posts that already fired are left alone.
+
+        Posts from earlier days that are still pending (restored from the job store) are left alone as well,
+        as the DataFrame only holds today's posts.
+
+        A post whose time passed less than SCHEDULER_CONFIG["misfire_grace_time"] ago runs right away. One
+        that is overdue by more, e.g. because the service was down, is caught up at a rate of
+        SCHEDULER_CONFIG["catch_up_rate"] posts per second if it is not older than "catch_up_max_age";
+        otherwise it is marked as 'Missed'.
+
+        Every change is recorded in the job store, if there is one.
         """
-        # Iterate through the DataFrame rows
-        for index, row in self.df.iterrows():
+        if self.df is None:
+            return
+        scheduled_df = self.df[self.df['Status'] == 'Scheduled']
+        # One hash per row, stable for NaN values, to detect changed posts without comparing every column
+        row_hashes = pd.util.hash_pandas_object(scheduled_df, index=False).to_numpy()
+        # Compact, immutable records built a column at a time, rather than a pandas Series per post
+        post_classes = {platform: self.post_class(platform) for platform in scheduled_df['Platform'].unique()}
+        records = ScheduledPost.from_dataframe(scheduled_df, post_classes)
+
+        desired_jobs = {}
+        for record, row_hash in zip(records, row_hashes.tolist()):
+            desired_jobs[self.job_id(record.post.post_id)] = (record, row_hash)
 
+        # Drop the posts that were removed from the plan or are not 'Scheduled' anymore
+        today = pd.Timestamp.now().normalize()
+        removed_post_ids = []
+        for job_id in [job_id for job_id in self.pending_jobs if job_id not in desired_jobs]:
+            row_hash, scheduled_time, post_id = self.pending_jobs[job_id]
+            if scheduled_time < today:
+                continue  # Caught up from an earlier day
+            self._remove_job(job_id)
+            self._finish_job(job_id)
+            removed_post_ids.append(post_id)
+
+        stored_jobs = []
+        for job_id, (record, row_hash) in desired_jobs.items():
             # Schedule each post based on the DataFrame's information
-            scheduled_time = row['Scheduled Time']  # Updated to correct column name
-            platform = row['Platform']  # Updated to correct column name
+            scheduled_time = record.scheduled_time
+            platform = record.platform
+
+            if job_id in self.pending_jobs:
+                previous_hash, previous_time, post_id = self.pending_jobs[job_id]
+                if previous_hash == row_hash:
+                    continue  # Unchanged
+                if self.dispatcher.get_job(job_id) is None:
+                    continue  # Fired in the meantime; the listener will mark it as finished
+                if previous_time != scheduled_time:
+                    run_date = self._run_date(scheduled_time)
+                    if run_date is None:
+                        # Moved too far into the past
+                        self._remove_job(job_id)
+                        self._finish_job(job_id)
+                        self._mark_missed(platform, record)
+                        self.dispatched_jobs.add(job_id)
+                        continue
+                    self.dispatcher.reschedule_job(job_id, run_date)
+                self.dispatcher.modify_job(job_id, [platform, record])
+                self._schedule_prefetch(job_id, self.dispatcher.get_job(job_id).run_date, platform, record)
+            elif job_id in self.dispatched_jobs:
+                continue  # Already posted today
+            elif not self._add_post_job(job_id, platform, record, scheduled_time):
+                continue  # Too late to catch up
+            post_id = record.post.post_id
+            self.pending_jobs[job_id] = (row_hash, scheduled_time, post_id)
+            stored_jobs.append((post_id, platform, scheduled_time, row_hash, self.row_to_dict(record)))
+            self.posts_done.clear()
+
+        if self.job_store is not None:
+            self.job_store.remove_jobs(self.plan_name, removed_post_ids)
+            self.job_store.upsert_jobs(self.plan_name, stored_jobs)
+
+        # Forget fired posts that are not part of the data anymore, e.g. after the daily reload
+        self.dispatched_jobs.intersection_update(desired_jobs)
+        POSTS_PENDING.set(len(self.pending_jobs), self.plan_name)
+
+        if not self.dispatcher.running:
+            self.dispatcher.start()
+
+    def cancel_pending_posts(self):
+        """Removes all post jobs of this executor that have not been executed yet."""
+        post_ids = []
+        for job_id in list(self.pending_jobs):
+            post_ids.append(self.pending_jobs[job_id][2])
+            self._remove_job(job_id)
+            self._finish_job(job_id)
+        if self.job_store is not None:
+            self.job_store.remove_jobs(self.plan_name, post_ids)
 
-            # Only schedule if Status is 'Scheduled'
-            if row['Status'] == 'Scheduled':
-                # Schedule the post
-                self.task_scheduler.add_job(
-                    self.execute_post, 'date', run_date=scheduled_time, args=[platform, row]
-                )
+    @staticmethod
+    def create_dead_letter_queue(plan_name: str) -> DeadLetterQueue:
+        return DeadLetterQueue(Path(RETRY_CONFIG['dead_letter_directory']) / f'{plan_name}_dead_letters.jsonl')
 
-        self.task_scheduler.start()
+    @staticmethod
+    def row_to_dict(row) -> dict:
+        """Converts a post's row or ScheduledPost to JSON serializable values."""
+        if isinstance(row, ScheduledPost):
+            return {column: value.isoformat() if isinstance(value, datetime) else
+                    None if isinstance(value, float) and math.isnan(value) else value
+                    for column, value in row.to_dict().items()}
+        return json.loads(row.to_json(date_format='iso', default_handler=str))
+
+    def post_class(self, platform: str) -> type:
+        """Returns the post class of a platform's bot, without creating the bot."""
+        bot_class = self.bot_manager.registry.get(platform)
+        return getattr(bot_class, 'post_class', SocialMediaPost)
+
+    @staticmethod
+    def get_account(row: pd.Series) -> Optional[str]:
+        """Returns the account a post is published with, taken from the optional 'Account' column."""
+        account = row.get('Account')
+        return None if pd.isna(account) else str(account)
+
+    def job_id(self, post_id) -> str:
+        """Returns the dispatcher job id of a post, unique across plans sharing one dispatcher."""
+        return f'{self.plan_name}:{post_id}'
+
+    @staticmethod
+    def prefetch_job_id(job_id: str) -> str:
+        """Returns the dispatcher job id of the media prefetch of a post."""
+        return f'{job_id}:media'
+
+    def _run_date(self, scheduled_time):
+        """
+        Returns when a post should run: its scheduled time, a catch-up slot if it is overdue, or None if it is
+        too late to post it.
+        """
+        now = datetime.now()
+        scheduled_time = pd.Timestamp(scheduled_time).to_pydatetime()
+        overdue = (now - scheduled_time).total_seconds()
+        if overdue <= SCHEDULER_CONFIG['misfire_grace_time']:
+            return scheduled_time
+        if not SCHEDULER_CONFIG['catch_up'] or overdue > SCHEDULER_CONFIG['catch_up_max_age']:
+            return None
+        # Spread the overdue posts out instead of sending them all at once
+        run_date = max(now, self._next_catch_up or now)
+        self._next_catch_up = run_date + timedelta(seconds=1 / SCHEDULER_CONFIG['catch_up_rate'])
+        return run_date
+
+    def _add_post_job(self, job_id: str, platform: str, row: pd.Series, scheduled_time) -> bool:
+        """
+        Adds the job of a post, or marks the post as 'Missed' if it is too late to post it.
+
+        :return: Whether the job was added.
+        """
+        run_date = self._run_date(scheduled_time)
+        if run_date is None:
+            self._mark_missed(platform, row)
+            self.dispatched_jobs.add(job_id)
+            return False
+        if run_date != pd.Timestamp(scheduled_time).to_pydatetime():
+            logger.info(f'Catching up post {job_id}, scheduled for {scheduled_time}, at {run_date:%H:%M:%S}.')
+        self.dispatcher.add_job(job_id, run_date, self.execute_post, [platform, row])
+        self._schedule_prefetch(job_id, run_date, platform, row)
+        return True
+
+    def _schedule_prefetch(self, job_id: str, run_date: datetime, platform: str, row):
+        """Schedules the reading of a post's local media files MEDIA_CONFIG["lead_time"] seconds before it runs."""
+        post = row.post if isinstance(row, ScheduledPost) else self.post_class(platform).from_dataframe_row(row)
+        if not MEDIA_CONFIG['prefetch'] or not post.media_paths():
+            self._cancel_prefetch(job_id)
+            return
+        prefetch_date = max(datetime.now(), run_date - timedelta(seconds=MEDIA_CONFIG['lead_time']))
+        self.dispatcher.add_job(self.prefetch_job_id(job_id), prefetch_date, self.prefetch_media,
+                                [job_id, platform, self.get_account(row), post])
+
+    def _cancel_prefetch(self, job_id: str):
+        self.broken_media.pop(job_id, None)
+        try:
+            self.dispatcher.remove_job(self.prefetch_job_id(job_id))
+        except KeyError:
+            pass  # Done already, or the post has no local media
+
+    async def prefetch_media(self, job_id: str, platform: str, account: Optional[str], post: SocialMediaPost):
+        """
+        Checks, hashes and caches the local media files of a post in a worker thread, and reports broken ones
+        while there is still time to fix them. Only the files the post's bot uploads are read.
+        """
+        bot = self.bot_manager.load_bot(platform, account)
+        upload_fields = getattr(bot, 'upload_fields', ())
+        if not post.media_paths(upload_fields):
+            return
+        try:
+            await asyncio.to_thread(self.media.load_post, post, upload_fields)
+        except MediaError as e:
+            if job_id not in self.broken_media:
+                MEDIA_ERRORS.inc(self.plan_name)
+            self.broken_media[job_id] = e.message
+            logger.warning(f'Post {job_id} to {platform} fails unless its media is fixed before it is due: {e}')
+        else:
+            self.broken_media.pop(job_id, None)
+
+    def _mark_missed(self, platform: str, row: pd.Series):
+        """Records a post that was not posted because its time passed too long ago."""
+        logger.warning(f'Post {self.job_id(row["Post ID"])} scheduled for {row["Scheduled Time"]} is too late '
+                       f'to catch up; marking it as missed.')
+        account = self.get_account(row)
+        bot = self.bot_manager.load_bot(platform, account)
+        if bot is None:
+            # E.g. an unknown platform; the other posts of the plan are scheduled all the same
+            logger.error(f'Post {self.job_id(row["Post ID"])} has no bot for {platform}; marking it as failed.')
+            status = 'Error'
+        else:
+            bot.journal_post(bot.create_post_from_dataframe_row(row), 'Missed', 0.0, attempts=0)
+            status = 'Missed'
+        POSTS.inc(self.plan_name, platform, status)
+        if self.job_store is not None:
+            self.job_store.mark_finished(self.plan_name, row['Post ID'], status.lower())
+        if self.on_outcome is not None:
+            self.on_outcome(self.plan_name, platform, row['Post ID'], status)
+
+    def _on_post_job_event(self, event):
+        """Dispatcher listener that marks post jobs as finished once they ran, failed or were missed."""
+        if event.job_id not in self.pending_jobs:
+            return
+        if event.code == JOB_MISSED:
+            logger.warning(f'Post job {event.job_id} missed its scheduled time.')
+            if self.job_store is not None:
+                self.job_store.mark_finished(self.plan_name, self.pending_jobs[event.job_id][2], 'missed')
+        self.dispatched_jobs.add(event.job_id)
+        self._finish_job(event.job_id)
+
+    def _remove_job(self, job_id: str):
+        try:
+            self.dispatcher.remove_job(job_id)
+        except KeyError:
+            # The job has already fired and may still be running
+            self.dispatched_jobs.add(job_id)
+
+    def _finish_job(self, job_id: str):
+        self._cancel_prefetch(job_id)
+        if self.pending_jobs.pop(job_id, None) is not None:
+            POSTS_PENDING.dec(self.plan_name)
+        if not self.pending_jobs:
+            self.posts_done.set()
+
+    async def _post_batch(self, key: Tuple[str, Optional[str]], posts: List[Tuple[Any, SocialMediaPost]]) -> List:
+        """
+        Sends a group of coalesced attempts with one batch request. It takes one slot of the rate limiter, but
+        one token per post, as the platform counts every request of a batch against its rate limits.
+        """
+        platform, account = key
+        bot = posts[0][0]  # One bot per platform and account
+        BATCH_SIZE.observe(len(posts), platform)
+        async with self.rate_limiter.acquire(platform, account, tokens=len(posts)):
+            return await bot.post_many([post for _, post in posts])
 
     async def execute_post(self, platform: str, row: pd.Series):
         """
         Executes a post using the appropriate bot based on the platform.
 
-        This method is used as a callback for the AsyncTaskScheduler
-        to post content on the specified social media platform.
+        This method is used as a callback for the PostDispatcher
+        to post content on the specified social media platform. The post's local media files are usually
+        cached by then; otherwise they are read in a worker thread. If the bot supports batches, every attempt
+        joins the attempts of the same platform and account due within BATCH_CONFIG["window"] seconds, and they
+        are sent together; the outcome is still retried, journaled and reported per post.
 
         :param platform: The platform on which to post.
         :param row:
         """
         # Before starting the actual execution, mark this task as running
         self.running_tasks[row['Post ID']] = True
+        # How late the dispatcher fired, including the time spent catching up after a restart
+        SCHEDULER_LAG.observe(time.time() - pd.Timestamp(row['Scheduled Time']).to_pydatetime().timestamp(), platform)
+        POSTS_IN_FLIGHT.inc(platform)
+        # Every bot log line of this task carries the post's ID, including those of auto_log
+        post_id_token = current_post_id.set(row['Post ID'])
         try:
             logger.debug(f'Data to post:\nPosting to {platform}\nPost: \n{row}')
 
-            # Load the bot for the specified platform
-            bot = self.bot_manager.load_bot(platform)
+            # Load the bot for the specified platform and account
+            account = self.get_account(row)
+            bot = self.bot_manager.load_bot(platform, account)
             post = bot.create_post_from_dataframe_row(row)
-            # await bot.post(post)
+            # Only the files the bot uploads are read
+            upload_fields = getattr(bot, 'upload_fields', ()) if isinstance(post, SocialMediaPost) else ()
+            upload_paths = post.media_paths(upload_fields) if upload_fields else []
+            job_id = self.job_id(row['Post ID'])
+            attempts = 0
+
+            async def attempt_post():
+                nonlocal attempts
+                attempts += 1
+                # Read unless prefetched, e.g. for a replayed post, and again if the prefetch found a broken file,
+                # which may have been fixed since. A file still broken fails the post without retries
+                if upload_paths and (job_id in self.broken_media or not self.media.is_loaded(post, upload_fields)):
+                    await asyncio.to_thread(self.media.load_post, post, upload_fields)
+                    self.broken_media.pop(job_id, None)
+                # Uploads are sent one by one
+                if self.coalescer is not None and getattr(bot, 'supports_batch', False) and not upload_paths:
+                    return await self.coalescer.submit((platform, account), (bot, post))
+                # Every attempt waits for the platform's and the account's concurrency and rate budget
+                async with self.rate_limiter.acquire(platform, account):
+                    return await bot.post(post)
 
-            # # TODO: Create except with code, which update credentials data.
+            start_time = time.perf_counter()
             try:
-                result = await bot.post(post)
-            except CredentialError:
-                pass
+                result = await self.retry_engine.run(attempt_post, reauthenticate=bot.auth_manager.refresh_token,
+                                                     description=f'post {row["Post ID"]} to {platform}')
+            except Exception as e:
+                # Out of attempts; keep the post for a later replay, appending it off the event loop
+                await asyncio.to_thread(self.dead_letters.add, self.plan_name, platform, row['Post ID'], e, attempts,
+                                        self.row_to_dict(row))
+                bot.log_post(post, logging.ERROR, f'Error - {type(e).__name__}: {e}')
+                bot.journal_post(post, 'Error', time.perf_counter() - start_time, attempts, e)
+                status = 'Error'
+            else:
+                bot.journal_post(post, 'Posted', time.perf_counter() - start_time, attempts)
+                status = 'Posted'
+            POST_LATENCY.observe(time.perf_counter() - start_time, platform)
+            POSTS.inc(self.plan_name, platform, status)
+            if self.job_store is not None:
+                self.job_store.mark_finished(self.plan_name, row['Post ID'], status.lower())
+            if self.on_outcome is not None:
+                self.on_outcome(self.plan_name, platform, row['Post ID'], status)
         finally:
             # Once execution is complete, mark it as not running
             self.running_tasks[row['Post ID']] = False
+            POSTS_IN_FLIGHT.dec(platform)
+            current_post_id.reset(post_id_token)
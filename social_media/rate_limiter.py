@@ -0,0 +1,206 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+from metrics import RATE_LIMIT_WAIT_SECONDS, RATE_LIMIT_WAITING
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        """
+        A token bucket refilled continuously at a fixed rate.
+
+        A call may cost several tokens, e.g. a batch request counted per request it contains. A cost above the
+        capacity is taken from a full bucket and leaves it in debt, so the rate is kept on average.
+
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens, i.e. the allowed burst.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def try_consume(self, tokens: float = 1) -> bool:
+        """Takes the given number of tokens if they are available."""
+        self._refill()
+        if self.tokens >= min(tokens, self.capacity):
+            self.tokens -= tokens
+            return True
+        return False
+
+    def time_until_available(self, tokens: float = 1) -> float:
+        """Returns the seconds until the given number of tokens is available."""
+        self._refill()
+        return max(0.0, (min(tokens, self.capacity) - self.tokens) / self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class LimiterStats:
+    """Queue wait time statistics of a RateLimiter."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float):
+        self.count += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.count if self.count else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {'count': self.count, 'mean_wait': self.mean_wait, 'max_wait': self.max_wait,
+                'total_wait': self.total_wait}
+
+
+class RateLimiter:
+    def __init__(self, max_in_flight: Optional[int] = None, rate: Optional[float] = None,
+                 burst: Optional[float] = None, metric_labels: Optional[Tuple[str, str]] = None):
+        """
+        Limits the number of concurrent calls and their rate. Waiting callers are served first come, first served.
+
+        :param max_in_flight: Maximum number of calls running at once; None for no limit.
+        :param rate: Maximum number of calls started per second; None for no limit.
+        :param burst: Number of calls that may start at once after an idle period. Defaults to max(1, rate).
+        :param metric_labels: The (platform, account) the waiting callers and wait times are reported under in
+        the metrics; None to not report them.
+        """
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(rate, burst or max(1.0, rate)) if rate else None
+        self.in_flight = 0
+        self.stats = LimiterStats()
+        self.metric_labels = metric_labels
+        self._waiters = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for their turn."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def acquire(self, tokens: float = 1):
+        """
+        Waits for a free slot and tokens, and holds the slot for the duration of the block.
+
+        :param tokens: The cost of the call against the rate, e.g. the number of requests in a batch.
+        """
+        enqueued = time.monotonic()
+        await self._acquire(tokens)
+        wait = time.monotonic() - enqueued
+        self.stats.record_wait(wait)
+        if self.metric_labels is not None:
+            RATE_LIMIT_WAIT_SECONDS.observe(wait, *self.metric_labels)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, tokens: float):
+        if not self._waiters and self._has_free_slot() and self._try_take_tokens(tokens):
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((waiter, tokens))
+        if self.metric_labels is not None:
+            RATE_LIMIT_WAITING.inc(*self.metric_labels)
+        self._wake_waiters()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # The slot was granted just before the cancellation
+            else:
+                self._waiters.remove((waiter, tokens))
+            raise
+        finally:
+            if self.metric_labels is not None:
+                RATE_LIMIT_WAITING.dec(*self.metric_labels)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        """Hands slots to the waiters in queue order while slots and tokens are available."""
+        while self._waiters and self._has_free_slot():
+            tokens = self._waiters[0][1]
+            if not self._try_take_tokens(tokens):
+                if self._timer is None:
+                    delay = self.bucket.time_until_available(tokens)
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+                return
+            waiter, _ = self._waiters.popleft()
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _on_timer(self):
+        self._timer = None
+        self._wake_waiters()
+
+    def _has_free_slot(self) -> bool:
+        return self.max_in_flight is None or self.in_flight < self.max_in_flight
+
+    def _try_take_tokens(self, tokens: float) -> bool:
+        return self.bucket is None or self.bucket.try_consume(tokens)
+
+
+class RateLimiterRegistry:
+    def __init__(self, config: Dict[str, Dict]):
+        """
+        Creates and holds the rate limiters of each platform and of each account on a platform.
+
+        :param config: A dictionary with the 'platforms' and 'accounts' limits, see RATE_LIMIT_CONFIG in config.py.
+        """
+        self.platform_limits = config.get('platforms', {})
+        self.account_limits = config.get('accounts', {})
+        self.limiters: Dict[Tuple[str, Optional[str]], RateLimiter] = {}
+
+    @asynccontextmanager
+    async def acquire(self, platform: str, account: Optional[str] = None, tokens: float = 1):
+        """
+        Waits until a call to the platform on behalf of the account is allowed.
+
+        The account limit is taken before the platform limit, so a busy account never holds a platform slot
+        while it waits for itself.
+
+        :param platform: The platform to call.
+        :param account: The account the call is made for, if any.
+        :param tokens: The cost of the call against the rates, e.g. the number of requests in a batch.
+        """
+        platform = platform.lower()
+        account = account or 'default'
+        async with self.limiter(platform, account).acquire(tokens):
+            async with self.limiter(platform).acquire(tokens):
+                yield
+
+    def limiter(self, platform: str, account: Optional[str] = None) -> RateLimiter:
+        """Returns the limiter of a platform, or of an account on a platform."""
+        key = (platform, account)
+        if key not in self.limiters:
+            if account is None:
+                limits = self.platform_limits.get(platform, self.platform_limits.get('default', {}))
+            else:
+                limits = self.account_limits.get(f'{platform}:{account}', self.account_limits.get('default', {}))
+            self.limiters[key] = RateLimiter(**limits, metric_labels=(platform, account or '*'))
+        return self.limiters[key]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns the queue wait statistics and queue depth per limiter, keyed 'platform' or 'platform:account'."""
+        return {
+            platform if account is None else f'{platform}:{account}': {
+                **limiter.stats.as_dict(), 'queue_depth': limiter.queue_depth, 'in_flight': limiter.in_flight}
+            for (platform, account), limiter in self.limiters.items()
+        }
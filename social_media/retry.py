@@ -0,0 +1,96 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Type
+
+from bot_manager.bot_core.errors import CredentialError, TransientError
+from logger_config import logger
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How a failed post is retried.
+
+    Attributes:
+        max_attempts (int): Total number of attempts, including the first one.
+        base_delay (float): Seconds to wait before the first retry.
+        max_delay (float): Upper bound of the wait between two attempts.
+        multiplier (float): Factor the wait grows by after each failed attempt.
+        jitter (float): Fraction of the wait that is randomized (0 for none, 1 for full jitter).
+        reauthenticate (bool): Whether to refresh the bot's credentials before retrying.
+    """
+    max_attempts: int = 1
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    multiplier: float = 2.0
+    jitter: float = 1.0
+    reauthenticate: bool = False
+
+    def delay(self, failed_attempts: int) -> float:
+        """Returns the seconds to wait after the given number of failed attempts."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (failed_attempts - 1))
+        return delay - random.uniform(0, delay * self.jitter)
+
+
+# Errors of the standard library that are worth retrying as well
+TRANSIENT_ERRORS = (TransientError, ConnectionError, TimeoutError)
+
+
+class RetryEngine:
+    def __init__(self, policies: Dict[Type[BaseException], RetryPolicy], default_policy: RetryPolicy = RetryPolicy()):
+        """
+        Runs an operation and retries it according to the policy of the error class it failed with.
+
+        :param policies: Retry policies per error class. The most specific class of a raised error is used.
+        :param default_policy: Policy for errors of any other class. By default they are not retried.
+        """
+        self.policies = policies
+        self.default_policy = default_policy
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Dict]) -> 'RetryEngine':
+        """
+        Creates the engine from the 'transient' and 'credential' policies of RETRY_CONFIG in config.py.
+        """
+        transient_policy = RetryPolicy(**config.get('transient', {}))
+        policies = {error_class: transient_policy for error_class in TRANSIENT_ERRORS}
+        policies[CredentialError] = RetryPolicy(**config.get('credential', {}))
+        return cls(policies)
+
+    def policy_for(self, error: BaseException) -> RetryPolicy:
+        for error_class in type(error).__mro__:
+            if error_class in self.policies:
+                return self.policies[error_class]
+        return self.default_policy
+
+    async def run(self, operation: Callable[[], Awaitable], reauthenticate: Optional[Callable[[], None]] = None,
+                  description: str = 'operation'):
+        """
+        Runs the operation until it succeeds or its error's policy allows no more attempts.
+
+        The waits between attempts are plain sleeps of this coroutine, so other coroutines keep running; the
+        operation itself should acquire any rate limit it is subject to, so every attempt is counted.
+
+        :param operation: Coroutine function performing one attempt.
+        :param reauthenticate: Function refreshing the credentials, called before retrying errors whose policy
+        asks for it.
+        :param description: What is attempted, for the log messages.
+        :return: The result of the successful attempt.
+        :raises: The error of the last failed attempt.
+        """
+        attempt = 1
+        while True:
+            try:
+                return await operation()
+            except Exception as e:
+                policy = self.policy_for(e)
+                if attempt >= policy.max_attempts:
+                    raise
+                delay = policy.delay(attempt)
+                logger.warning(f"Attempt {attempt} of {description} failed with {type(e).__name__}: {e}. "
+                               f"Retrying in {delay:.1f} s.")
+                if policy.reauthenticate and reauthenticate is not None:
+                    reauthenticate()
+                await asyncio.sleep(delay)
+                attempt += 1
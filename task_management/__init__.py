@@ -1,7 +1,36 @@
 # task_management/__init__.py
 
-# Import classes from submodules for easy access
-from .data_manager.excel_data_manager import ExcelDataManager
-from .data_manager.log_data_manager import LogDataManager
-from .scheduling.task_scheduler import TaskScheduler
-from .utilities.display_utils import display_dataframe_as_table
+# Classes from submodules for easy access. They are imported on first access (PEP 562), so importing the
+# package does not load pandas, openpyxl, APScheduler or rich
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .data_manager.excel_data_manager import ExcelDataManager
+    from .data_manager.log_data_manager import LogDataManager
+    from .data_manager.journal_data_manager import JournalDataManager
+    from .scheduling.task_scheduler import TaskScheduler
+    from .utilities.display_utils import display_dataframe_as_table
+
+_LAZY_ATTRIBUTES = {
+    'ExcelDataManager': '.data_manager.excel_data_manager',
+    'LogDataManager': '.data_manager.log_data_manager',
+    'JournalDataManager': '.data_manager.journal_data_manager',
+    'TaskScheduler': '.scheduling.task_scheduler',
+    'display_dataframe_as_table': '.utilities.display_utils',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
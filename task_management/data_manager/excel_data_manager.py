@@ -1,8 +1,12 @@
+import os
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
-from openpyxl import load_workbook
+
+from task_management.data_manager.plan_cache import PlanCache
+from task_management.data_manager.post_index import ScheduledPostIndex
+from metrics import DATA_JOB_SECONDS, timed
 
 
 # Ensure the class documentation is descriptive
@@ -12,7 +16,8 @@ class ExcelDataManager:
                  sheet_name: str = 'Sheet1',
                  id_column: str = 'Post ID',
                  status_column: str = 'Status',
-                 date_column: str = 'Scheduled Time'):
+                 date_column: str = 'Scheduled Time',
+                 use_cache: bool = True):
         """
         Initializes the ExcelDataManager with the specified Excel file path and configuration.
 
@@ -21,23 +26,73 @@ class ExcelDataManager:
         :param id_column: Column header for unique identifiers.
         :param status_column: Column header for status entries.
         :param date_column: Column header for the scheduled date and time of posts.
+        :param use_cache: Whether to load the sheet from a binary sidecar cache when it matches the Excel file.
         """
         self.excel_file_path = excel_file_path
         self.sheet_name = sheet_name
         self.id_column = id_column
         self.status_column = status_column
         self.date_column = date_column
-        self.df = None
+        self._df = None
+        # Sorted index over the date column, built on first use after the DataFrame is loaded or replaced
+        self._post_index = None
+        # Statuses as they are in the Excel file, used to find the ones changed since the last save
+        self._saved_statuses = None
+        # Post ID -> sheet row number, valid while the file stat matches the one recorded with it
+        self._sheet_row_index = None
+        self._sheet_row_index_stat = None
+        self._plan_cache = PlanCache(excel_file_path, sheet_name) if use_cache else None
         self.load_excel_data()  # Load the Excel data upon initialization.
 
+    @timed(DATA_JOB_SECONDS, 'excel_load')
     def load_excel_data(self):
-        """Loads the entire Excel sheet into a pandas DataFrame."""
+        """
+        Loads the entire Excel sheet into a pandas DataFrame.
+
+        The sheet is taken from the sidecar cache when the cache is fresh; otherwise it is parsed from the
+        Excel file and the cache is rebuilt.
+        """
         try:
-            self.df = pd.read_excel(self.excel_file_path, sheet_name=self.sheet_name)
+            df = self._plan_cache.load() if self._plan_cache is not None else None
+            if df is None:
+                # Taken before parsing, so an edit saved meanwhile does not get stamped onto stale data
+                file_state = self._plan_cache.file_state() if self._plan_cache is not None else None
+                df = pd.read_excel(self.excel_file_path, sheet_name=self.sheet_name)
+                if self._plan_cache is not None:
+                    self._store_cache(df, file_state=file_state)
+            self.df = df
+            self._saved_statuses = self._status_snapshot()
         except Exception as e:
             # Consider logging the error instead of printing to handle it properly.
             print(f"Error loading Excel data: {e}")
 
+    @property
+    def df(self):
+        return self._df
+
+    @df.setter
+    def df(self, dataframe):
+        self._df = dataframe
+        self.invalidate_post_index()
+
+    @property
+    def post_index(self):
+        """
+        The ScheduledPostIndex over the date column of the DataFrame.
+
+        It is built once per loaded or assigned DataFrame and rebuilt when rows were added or removed in place.
+        Call invalidate_post_index after changing scheduled times in place.
+        """
+        if self._post_index is None or self._post_index.df is not self._df \
+                or self._post_index.row_count != len(self._df):
+            self._post_index = ScheduledPostIndex(self._df, self.date_column)
+        return self._post_index
+
+    def invalidate_post_index(self):
+        """Drops the index over the date column, so it is rebuilt on next use."""
+        self._post_index = None
+
+    @timed(DATA_JOB_SECONDS, 'excel_current_date_posts')
     def load_current_date_posts(self):
         """
         Loads posts from the Excel data that are scheduled for the current date into a DataFrame.
@@ -47,7 +102,7 @@ class ExcelDataManager:
         try:
             if self.df is not None:
                 current_date = datetime.now().date()
-                return self.df[self.df[self.date_column].dt.date == current_date]
+                return self.post_index.posts_for_date(current_date)
             else:
                 return pd.DataFrame()
         except Exception as e:
@@ -55,6 +110,30 @@ class ExcelDataManager:
             print(f"Error loading current date posts: {e}")
             return pd.DataFrame()
 
+    def load_posts_in_window(self, start, end):
+        """
+        Loads posts scheduled in the window [start, end) into a DataFrame.
+
+        :param start: The start of the window, inclusive.
+        :param end: The end of the window, exclusive.
+        :return: A DataFrame containing the posts scheduled in the window.
+        """
+        if self.df is None:
+            return pd.DataFrame()
+        return self.post_index.posts_in_window(start, end)
+
+    def load_next_due_posts(self, count, now=None):
+        """
+        Loads the next posts due at or after a point in time, ordered by scheduled time.
+
+        :param count: The maximum number of posts to return.
+        :param now: The point in time to look from. Defaults to the current time.
+        :return: A DataFrame containing up to 'count' posts.
+        """
+        if self.df is None:
+            return pd.DataFrame()
+        return self.post_index.next_due(count, now)
+
     def update_main_dataframe(self, updated_subset_df):
         """
         Updates the main DataFrame with the changes from a subset DataFrame.
@@ -73,28 +152,110 @@ class ExcelDataManager:
 
         # Reset the index to revert to the original structure
         self.df.reset_index(drop=True, inplace=True)
+        # Scheduled times may have been updated
+        self.invalidate_post_index()
+
+    def get_dirty_statuses(self):
+        """
+        Finds the statuses that changed in the DataFrame since the data was loaded or last saved.
+
+        :return: A dictionary mapping 'Post ID' to the new status.
+        """
+        if self.df is None:
+            return {}
+
+        current = self._status_snapshot()
+        if self._saved_statuses is None:
+            return current.to_dict()
 
-    def save_changes_to_excel(self):
+        saved = self._saved_statuses.reindex(current.index)
+        changed = (current != saved) & ~(current.isna() & saved.isna())
+        return current[changed].to_dict()
+
+    @timed(DATA_JOB_SECONDS, 'excel_save')
+    def save_changes_to_excel(self, only_changed: bool = True):
         """
         Saves the changes from the DataFrame's 'Status' column back to the Excel file based on 'Post ID'.
-        It updates the 'Status' column in the Excel sheet for each matching 'Post ID'.
+
+        Rows are located through a 'Post ID' -> row index that is built once and reused while the file is
+        not modified by anyone else.
+
+        :param only_changed: Whether to write only the statuses changed since the last load or save. When False,
+        every status of the DataFrame is written.
+        :return: True if the file is up to date with the DataFrame's statuses, False if saving failed.
         """
         try:
+            updates = self.get_dirty_statuses() if only_changed else self._status_snapshot().to_dict()
+            if not updates:
+                return True
+
+            # The cache can be patched instead of rebuilt only if it matched the file before this save
+            refresh_cache = self._plan_cache is not None and self._plan_cache.is_fresh()
+
+            from openpyxl import load_workbook  # Only needed to save, reading goes through pandas
+
             workbook = load_workbook(self.excel_file_path)
             sheet = workbook[self.sheet_name]
-            header_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True))
-            id_col_idx = header_row.index(self.id_column) + 1
-            status_col_idx = header_row.index(self.status_column) + 1
+            status_col_idx, row_index = self._get_sheet_row_index(sheet)
 
-            # Update the cells in the Status column for matching Post ID
-            for row in sheet.iter_rows(min_row=2, max_col=id_col_idx, max_row=sheet.max_row):
-                post_id_cell = row[0]
-                cell_value = self.df.loc[self.df[self.id_column] == post_id_cell.value, self.status_column].values
-                if cell_value.size > 0:
-                    sheet.cell(row=post_id_cell.row, column=status_col_idx, value=cell_value[0])
+            # Update only the Status cells of the changed posts
+            for post_id, status in updates.items():
+                row = row_index.get(post_id)
+                if row is not None:
+                    sheet.cell(row=row, column=status_col_idx, value=None if pd.isna(status) else status)
 
             workbook.save(self.excel_file_path)
             workbook.close()
+
+            self._saved_statuses = self._status_snapshot()
+            self._sheet_row_index_stat = self._file_stat()
+
+            if refresh_cache:
+                self._store_cache(updates=updates)
+            return True
         except Exception as e:
             # Consider logging the error instead of printing to handle it properly.
             print(f"Error saving changes to Excel: {e}")
+            return False
+
+    def _get_sheet_row_index(self, sheet):
+        """
+        Returns the Status column number and the 'Post ID' -> row number index of the sheet.
+
+        The index is rebuilt only if the Excel file was changed since it was built.
+        """
+        if self._sheet_row_index is None or self._sheet_row_index_stat != self._file_stat():
+            header_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True))
+            id_col_idx = header_row.index(self.id_column) + 1
+            status_col_idx = header_row.index(self.status_column) + 1
+
+            row_index = {}
+            id_cells = sheet.iter_rows(min_row=2, min_col=id_col_idx, max_col=id_col_idx, values_only=True)
+            for row_number, (post_id,) in enumerate(id_cells, start=2):
+                if post_id is not None:
+                    row_index[post_id] = row_number
+
+            self._sheet_row_index = (status_col_idx, row_index)
+            self._sheet_row_index_stat = self._file_stat()
+        return self._sheet_row_index
+
+    def _store_cache(self, df=None, updates=None, file_state=None):
+        """Stores a freshly parsed DataFrame in the cache, or patches the cached statuses after a save."""
+        try:
+            if df is not None:
+                if not self._plan_cache.store(df, file_state):
+                    print(f"Not caching {self.excel_file_path}: it changed while it was read")
+            else:
+                self._plan_cache.apply_status_updates(updates, self.id_column, self.status_column)
+        except Exception as e:
+            # The cache only speeds up loading, failing to write it is not fatal
+            print(f"Error writing Excel cache: {e}")
+
+    def _status_snapshot(self):
+        """Returns the statuses of the DataFrame as a Series indexed by 'Post ID'."""
+        statuses = self.df.drop_duplicates(self.id_column, keep='last')
+        return statuses.set_index(self.id_column)[self.status_column].copy()
+
+    def _file_stat(self):
+        stat = os.stat(self.excel_file_path)
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,113 @@
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from task_management.data_manager.log_data_manager import apply_post_statuses
+from metrics import DATA_JOB_SECONDS, timed
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    # The standard library decoder is slower, but reads the same records
+    loads = json.loads
+
+
+class JournalDataManager:
+    def __init__(self, journal_dir: Path):
+        """
+        Initializes the JournalDataManager with the directory of a plan's post outcome journal.
+
+        The journal is written by the bots (see SocialMediaBot.journal_post) as one JSON lines file per day,
+        named 'YYYY-MM-DD.jsonl', so a day is read by opening its file rather than by scanning the whole history.
+
+        :param journal_dir: Path to the journal directory, e.g. 'bot_manager/logs/journal/plan'.
+        """
+        self.journal_dir = journal_dir
+
+    def days(self):
+        """
+        Returns the days the journal has records for.
+
+        :return: A sorted list of dates.
+        """
+        days = []
+        for journal_file_path in self.journal_dir.glob('*.jsonl'):
+            try:
+                days.append(date.fromisoformat(journal_file_path.stem))
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def read_day(self, day: date):
+        """
+        Reads the records of one day.
+
+        :param day: The day to read.
+        :return: A list of dictionaries with the 'ts', 'plan', 'platform', 'post_id', 'status', 'latency',
+        'attempts' and 'error_class' of each post outcome, in the order they were written.
+        """
+        try:
+            with open(self.journal_dir / f'{day.isoformat()}.jsonl', 'rb') as journal_file:
+                data = journal_file.read()
+        except FileNotFoundError:
+            return []
+
+        records = []
+        for line in data.splitlines():
+            if not line:
+                continue
+            try:
+                records.append(loads(line))
+            except ValueError:
+                continue  # A partially written last line
+        return records
+
+    def read_range(self, start: date = None, end: date = None):
+        """
+        Reads the records of the days from start to end, both included.
+
+        :param start: The first day to read. Defaults to the first day of the journal.
+        :param end: The last day to read. Defaults to the last day of the journal.
+        :return: A list of dictionaries, see :meth:`read_day`, oldest first.
+        """
+        records = []
+        for day in self.days():
+            if (start is None or day >= start) and (end is None or day <= end):
+                records.extend(self.read_day(day))
+        return records
+
+    def read_journal(self, only_today=False):
+        """
+        Reads the journal records, optionally only those from today.
+
+        :param only_today: Whether to return only today's records.
+        :return: A list of dictionaries, see :meth:`read_day`, oldest first.
+        """
+        if only_today:
+            return self.read_day(datetime.now().date())
+        return self.read_range()
+
+    def has_records(self):
+        """Returns whether the journal has been written to at all."""
+        return bool(self.days())
+
+    @timed(DATA_JOB_SECONDS, 'journal_reconcile')
+    def update_df_from_journal(self, df, only_today=False, days=None):
+        """
+        Updates a DataFrame based on the journal records.
+
+        :param df: The DataFrame to update.
+        :param only_today: Whether to update the DataFrame based on only today's records.
+        :param days: The number of most recent days to read, today included. Takes precedence over only_today.
+        :return: The updated DataFrame.
+        """
+        if df is None or df.empty:
+            return df  # Return the original DataFrame if it's None or empty
+
+        if days is not None:
+            today = datetime.now().date()
+            records = self.read_range(start=today - timedelta(days=days - 1), end=today)
+        else:
+            records = self.read_journal(only_today=only_today)
+        return apply_post_statuses(df, records)
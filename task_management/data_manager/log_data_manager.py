@@ -1,17 +1,49 @@
+import json
+import os
 import re
 from datetime import datetime
 from pathlib import Path
 
+from metrics import DATA_JOB_SECONDS, LOG_ENTRIES_READ, timed
+
+POST_STATUS_PATTERN = re.compile(r'Post ID: (\d+) - (\w+)(?=\s-)')
+
+
+def apply_post_statuses(df, entries):
+    """
+    Sets the 'Status' of the posts in a DataFrame to the last status found for their 'Post ID'.
+
+    :param df: The DataFrame to update, with 'Post ID' and 'Status' columns.
+    :param entries: Dictionaries with a 'post_id' and a 'status', oldest first.
+    :return: The updated DataFrame.
+    """
+    # Later entries override earlier ones, so only the last status per post matters
+    latest_statuses = {entry['post_id']: entry['status'] for entry in entries}
+    if not latest_statuses:
+        return df
+
+    matched = df['Post ID'].isin(list(latest_statuses))
+    if matched.any():
+        df.loc[matched, 'Status'] = df.loc[matched, 'Post ID'].map(latest_statuses)
+
+    return df
+
 
 class LogDataManager:
-    def __init__(self, log_file_path: Path):
+    def __init__(self, log_file_path: Path, checkpoint_file_path: Path = None):
         """
         Initializes the LogDataManager with the path to the log file.
 
         :param log_file_path: Path to the log file.
+        :param checkpoint_file_path: Path to the file storing how far the log has been read by
+        :meth:`read_new_logs`. Defaults to the log file path with an extra '.offset' suffix.
         """
         self.log_file_path = log_file_path
+        self.checkpoint_file_path = checkpoint_file_path or log_file_path.with_name(log_file_path.name + '.offset')
+        # Checkpoint reached by the last read_new_logs call, persisted by commit_checkpoint
+        self._pending_checkpoint = None
 
+    @timed(DATA_JOB_SECONDS, 'log_read')
     def read_logs(self, only_today=False):
         """
         Reads the log entries, optionally filtering for entries from today.
@@ -19,36 +51,125 @@ class LogDataManager:
         :param only_today: Whether to return only today's log entries.
         :return: A list of dictionaries, each containing data from a log entry.
         """
-        log_entries = []
-        today = datetime.now().date()
+        today = datetime.now().date().isoformat()
         with open(self.log_file_path, 'r') as log_file:
-            for line in log_file:
-                if only_today:
-                    log_date = datetime.strptime(line.split()[0], '%Y-%m-%d').date()
-                    if log_date != today:
-                        continue
-                match = re.search(r'Post ID: (\d+) - (\w+)(?=\s-)', line)
-                if match:
-                    post_id, status = match.groups()
-                    log_entries.append({'post_id': int(post_id), 'status': status})
+            if only_today:
+                # Log lines start with the ISO date, so a prefix comparison is enough to filter them
+                return self._parse_lines(line for line in log_file if line.startswith(today))
+            return self._parse_lines(log_file)
+
+    @timed(DATA_JOB_SECONDS, 'log_read_new')
+    def read_new_logs(self):
+        """
+        Reads only the log entries appended since the last committed checkpoint.
+
+        The checkpoint stores the inode and byte offset of the log file. When the log has been rotated
+        (the inode changed), the rest of the old file is read from its rotated copy (e.g. 'plan_posts.log.1')
+        before the new file is read from its start. When the log has been truncated, it is read from its start.
+        Only complete lines are consumed; a partially written last line is left for the next call.
+
+        The new position is not persisted until :meth:`commit_checkpoint` is called, so the entries can be
+        applied and saved before they are marked as read.
+
+        :return: A list of dictionaries, each containing data from a log entry.
+        """
+        checkpoint = self.load_checkpoint()
+        log_entries = []
+
+        try:
+            stat = os.stat(self.log_file_path)
+        except FileNotFoundError:
+            return log_entries
+
+        offset = 0
+        if checkpoint is not None:
+            if checkpoint['inode'] == stat.st_ino:
+                # Same file; start over if it was truncated below the saved offset
+                offset = checkpoint['offset'] if checkpoint['offset'] <= stat.st_size else 0
+            else:
+                rotated_file_path = self._find_rotated_file(checkpoint['inode'])
+                if rotated_file_path is not None:
+                    log_entries.extend(self._read_from(rotated_file_path, checkpoint['offset'])[0])
+
+        entries, offset = self._read_from(self.log_file_path, offset)
+        log_entries.extend(entries)
+        self._pending_checkpoint = {'inode': stat.st_ino, 'offset': offset}
         return log_entries
 
-    def update_df_from_logs(self, df, only_today=False):
+    def load_checkpoint(self):
+        """
+        Loads the persisted read checkpoint.
+
+        :return: A dictionary with the 'inode' and 'offset' of the log file, or None if there is no checkpoint.
+        """
+        try:
+            with open(self.checkpoint_file_path, 'r') as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            return {'inode': int(checkpoint['inode']), 'offset': int(checkpoint['offset'])}
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return None
+
+    def commit_checkpoint(self):
+        """Persists the position reached by the last :meth:`read_new_logs` call."""
+        if self._pending_checkpoint is None:
+            return
+        temp_file_path = self.checkpoint_file_path.with_name(self.checkpoint_file_path.name + '.tmp')
+        with open(temp_file_path, 'w') as checkpoint_file:
+            json.dump(self._pending_checkpoint, checkpoint_file)
+        # Atomic replace, so a crash never leaves a half written checkpoint behind
+        os.replace(temp_file_path, self.checkpoint_file_path)
+        self._pending_checkpoint = None
+
+    @timed(DATA_JOB_SECONDS, 'log_reconcile')
+    def update_df_from_logs(self, df, only_today=False, incremental=False):
         """
         Updates a DataFrame based on the log entries.
 
         :param df: The DataFrame to update.
         :param only_today: Whether to update the DataFrame based on only today's log entries.
+        :param incremental: Whether to use only the entries appended since the last committed checkpoint
+        (see :meth:`read_new_logs`). Takes precedence over only_today.
         :return: The updated DataFrame.
         """
         if df is None or df.empty:
             return df  # Return the original DataFrame if it's None or empty
 
-        log_entries = self.read_logs(only_today=only_today)
-        for entry in log_entries:
-            # Assuming the DataFrame has columns 'Post ID' and 'Status'
-            # And the log entries dictionary has keys 'post_id' and 'status'
-            if entry['post_id'] in df['Post ID'].values:
-                df.loc[df['Post ID'] == entry['post_id'], 'Status'] = entry['status']
+        log_entries = self.read_new_logs() if incremental else self.read_logs(only_today=only_today)
+        return apply_post_statuses(df, log_entries)
 
-        return df
+    def _read_from(self, file_path: Path, offset: int):
+        """
+        Parses the complete lines of a file starting at a byte offset.
+
+        :return: A tuple of the parsed log entries and the offset just after the last complete line.
+        """
+        with open(file_path, 'rb') as log_file:
+            log_file.seek(offset)
+            data = log_file.read()
+
+        end = data.rfind(b'\n') + 1
+        lines = data[:end].decode('utf-8', errors='replace').splitlines()
+        return self._parse_lines(lines), offset + end
+
+    def _find_rotated_file(self, inode: int):
+        """Finds the rotated copy ('<log>.1', '<log>.2', ...) of the log file with the given inode."""
+        for rotated_file_path in sorted(self.log_file_path.parent.glob(self.log_file_path.name + '.*')):
+            if not rotated_file_path.suffix[1:].isdigit():
+                continue
+            try:
+                if os.stat(rotated_file_path).st_ino == inode:
+                    return rotated_file_path
+            except FileNotFoundError:
+                continue
+        return None
+
+    @staticmethod
+    def _parse_lines(lines):
+        log_entries = []
+        for line in lines:
+            match = POST_STATUS_PATTERN.search(line)
+            if match:
+                post_id, status = match.groups()
+                log_entries.append({'post_id': int(post_id), 'status': status})
+        LOG_ENTRIES_READ.inc(amount=len(log_entries))
+        return log_entries
@@ -0,0 +1,149 @@
+import hashlib
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# Feather needs pyarrow; without it the cache falls back to pickle
+FEATHER_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+
+class PlanCache:
+    def __init__(self, excel_file_path: Path, sheet_name: str = 'Sheet1', cache_dir: Path = None):
+        """
+        Sidecar cache of a parsed plan workbook in a binary columnar format.
+
+        The cache is keyed on the workbook's modification time, size and content hash. A matching
+        modification time and size is trusted without hashing; otherwise the content hash decides, so
+        touching the workbook without changing it does not invalidate the cache.
+
+        :param excel_file_path: Path to the Excel file.
+        :param sheet_name: Name of the cached sheet.
+        :param cache_dir: Directory for the cache files. Defaults to the workbook's directory.
+        """
+        self.excel_file_path = excel_file_path
+        self.sheet_name = sheet_name
+        cache_dir = cache_dir or excel_file_path.parent
+        base_name = f'.{excel_file_path.name}.{sheet_name}.cache'
+        self.meta_file_path = cache_dir / f'{base_name}.json'
+        self._data_file_paths = {'feather': cache_dir / f'{base_name}.feather',
+                                 'pickle': cache_dir / f'{base_name}.pkl'}
+
+    def load(self):
+        """
+        Loads the cached DataFrame if the cache is fresh.
+
+        :return: The cached DataFrame, or None if there is no fresh cache.
+        """
+        meta = self._load_meta()
+        if meta is None or not self._is_fresh(meta):
+            return None
+        try:
+            return self._read(meta)
+        except Exception:
+            return None  # A damaged cache is rebuilt by the caller
+
+    def file_state(self) -> dict:
+        """
+        Returns the workbook's modification time, size and content hash. Take it before parsing the workbook and
+        pass it to :meth:`store`, so an edit saved during the parse is noticed.
+        """
+        stat = os.stat(self.excel_file_path)
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': self._hash_file()}
+
+    def store(self, df: pd.DataFrame, file_state: dict = None) -> bool:
+        """
+        Stores a DataFrame parsed from the workbook in the cache.
+
+        :param df: The DataFrame as read from the workbook.
+        :param file_state: The workbook's :meth:`file_state` from before it was parsed. Defaults to its current
+        state.
+        :return: True if the DataFrame was stored, False if the workbook changed since file_state was taken, so
+        the DataFrame may be stale.
+        """
+        if file_state is None:
+            file_state = self.file_state()
+        stat = os.stat(self.excel_file_path)
+        if (stat.st_mtime_ns, stat.st_size) != (file_state['mtime_ns'], file_state['size']):
+            return False
+
+        data_format = 'pickle'
+        if FEATHER_AVAILABLE:
+            try:
+                df.to_feather(self._data_file_paths['feather'])
+                data_format = 'feather'
+            except Exception:
+                pass  # e.g. object columns of mixed types that Arrow cannot represent
+        if data_format == 'pickle':
+            df.to_pickle(self._data_file_paths['pickle'])
+
+        self._save_meta({**file_state, 'format': data_format})
+        return True
+
+    def is_fresh(self) -> bool:
+        """Checks whether the cache matches the current workbook."""
+        meta = self._load_meta()
+        return meta is not None and self._is_fresh(meta)
+
+    def apply_status_updates(self, updates: dict, id_column: str, status_column: str):
+        """
+        Brings the cache up to date after statuses were written to the workbook.
+
+        Must only be used if the cache was fresh before the workbook was written and nothing but the given
+        statuses changed in it, so the cache does not have to be rebuilt from the workbook.
+
+        :param updates: A dictionary mapping 'Post ID' to the written status.
+        :param id_column: Column header for unique identifiers.
+        :param status_column: Column header for status entries.
+        """
+        meta = self._load_meta()
+        if meta is None:
+            return
+        df = self._read(meta)
+        matched = df[id_column].isin(list(updates))
+        df.loc[matched, status_column] = df.loc[matched, id_column].map(updates)
+        self.store(df)
+
+    def _is_fresh(self, meta: dict) -> bool:
+        try:
+            stat = os.stat(self.excel_file_path)
+        except FileNotFoundError:
+            return False
+        if not self._data_file_paths[meta['format']].exists():
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == (meta['mtime_ns'], meta['size']):
+            return True
+        if stat.st_size != meta['size'] or self._hash_file() != meta['sha256']:
+            return False
+        # Same content with a new modification time; remember it to skip hashing next time
+        meta['mtime_ns'] = stat.st_mtime_ns
+        self._save_meta(meta)
+        return True
+
+    def _read(self, meta: dict) -> pd.DataFrame:
+        if meta['format'] == 'feather':
+            return pd.read_feather(self._data_file_paths['feather'])
+        return pd.read_pickle(self._data_file_paths['pickle'])
+
+    def _load_meta(self):
+        try:
+            with open(self.meta_file_path, 'r') as meta_file:
+                meta = json.load(meta_file)
+            return meta if meta.get('format') in self._data_file_paths else None
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_meta(self, meta: dict):
+        temp_file_path = self.meta_file_path.with_name(self.meta_file_path.name + '.tmp')
+        with open(temp_file_path, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temp_file_path, self.meta_file_path)
+
+    def _hash_file(self) -> str:
+        sha256 = hashlib.sha256()
+        with open(self.excel_file_path, 'rb') as excel_file:
+            for chunk in iter(lambda: excel_file.read(1 << 20), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
@@ -0,0 +1,72 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+class ScheduledPostIndex:
+    def __init__(self, df: pd.DataFrame, date_column: str = 'Scheduled Time'):
+        """
+        Builds a sorted index over the scheduled time of posts.
+
+        The index keeps the row positions of the DataFrame sorted by scheduled time, so date and time range
+        queries are answered with a binary search and only the matching rows are copied out of the DataFrame.
+        Rows without a valid scheduled time are left out of the index.
+
+        :param df: The DataFrame containing the posts.
+        :param date_column: Column header for the scheduled date and time of posts.
+        """
+        self.df = df
+        self.date_column = date_column
+        self.row_count = len(df)
+
+        times = pd.to_datetime(df[date_column], errors='coerce')
+        if times.dt.tz is not None:
+            times = times.dt.tz_localize(None)
+        values = times.to_numpy()
+
+        valid_positions = np.flatnonzero(~np.isnat(values))
+        order = np.argsort(values[valid_positions], kind='stable')
+        self._positions = valid_positions[order]
+        self._times = values[self._positions]
+
+    def __len__(self):
+        return len(self._positions)
+
+    def posts_for_date(self, day: date) -> pd.DataFrame:
+        """
+        Returns the posts scheduled on the given date, in DataFrame order.
+
+        :param day: The date to return posts for.
+        """
+        start = datetime.combine(day, time.min)
+        return self.posts_in_window(start, start + timedelta(days=1))
+
+    def posts_in_window(self, start, end) -> pd.DataFrame:
+        """
+        Returns the posts scheduled in the window [start, end), in DataFrame order.
+
+        :param start: The start of the window, inclusive.
+        :param end: The end of the window, exclusive.
+        """
+        low, high = self._search(start), self._search(end)
+        # Keep the original row order, like a boolean filter on the DataFrame would
+        return self.df.iloc[np.sort(self._positions[low:high])]
+
+    def next_due(self, count: int, now=None) -> pd.DataFrame:
+        """
+        Returns the next posts scheduled at or after a point in time, ordered by scheduled time.
+
+        :param count: The maximum number of posts to return.
+        :param now: The point in time to look from. Defaults to the current time.
+        """
+        low = self._search(now if now is not None else datetime.now())
+        return self.df.iloc[self._positions[low:low + count]]
+
+    def _search(self, moment) -> int:
+        """Returns the position of the first indexed time that is not earlier than the given moment."""
+        timestamp = pd.Timestamp(moment)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_localize(None)
+        key = np.datetime64(timestamp.to_datetime64()).astype(self._times.dtype)
+        return int(np.searchsorted(self._times, key, side='left'))
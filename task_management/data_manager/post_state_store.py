@@ -0,0 +1,256 @@
+import json
+import queue
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+from logger_config import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    plan TEXT NOT NULL,
+    post_id NOT NULL,
+    platform TEXT,
+    scheduled_time TEXT,
+    status TEXT,
+    exported_status TEXT,
+    row_hash TEXT NOT NULL,
+    row_json TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (plan, post_id)
+);
+CREATE INDEX IF NOT EXISTS posts_scheduled_time ON posts (plan, scheduled_time);
+CREATE INDEX IF NOT EXISTS posts_status ON posts (plan, status);
+CREATE INDEX IF NOT EXISTS posts_platform ON posts (plan, platform);
+"""
+
+
+def _value(value):
+    """Converts numpy scalars and missing values from pandas to values sqlite3 can bind."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _timestamp(value):
+    """Formats a scheduled time so that the text order of the column is the time order."""
+    value = _value(value)
+    return None if value is None else pd.Timestamp(value).isoformat()
+
+
+class PostStateStore:
+    def __init__(self, database_path: Path, id_column: str = 'Post ID', status_column: str = 'Status',
+                 date_column: str = 'Scheduled Time', platform_column: str = 'Platform'):
+        """
+        The posts of the plans and their statuses in a local SQLite database, the runtime source of truth.
+
+        The workbooks are imported incrementally (see :meth:`import_dataframe`), status changes are single
+        indexed writes, queued for a background thread (see :meth:`set_status`), and the statuses are exported
+        back to the workbooks in bulk on demand (see :meth:`dirty_statuses` and :meth:`mark_exported`).
+
+        The posts are indexed by plan and 'Post ID', scheduled time, status and platform.
+
+        :param database_path: Path to the SQLite database file, created if missing.
+        :param id_column: Column header for unique identifiers.
+        :param status_column: Column header for status entries.
+        :param date_column: Column header for the scheduled date and time of posts.
+        :param platform_column: Column header for the platform of posts.
+        """
+        self.database_path = database_path
+        self.id_column = id_column
+        self.status_column = status_column
+        self.date_column = date_column
+        self.platform_column = platform_column
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(database_path, timeout=30, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        # Imports and exports run in worker threads while the event loop records statuses
+        self._lock = threading.Lock()
+        # (status, time, plan, post_id) updates of set_status, events to set once everything queued before them
+        # is committed, and None to stop
+        self._status_writes = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_statuses, name='post-state-store-writer', daemon=True)
+        self._writer.start()
+
+    def has_plan(self, plan: str) -> bool:
+        """Returns whether a plan has been imported before."""
+        with self._lock:
+            return self.connection.execute("SELECT 1 FROM posts WHERE plan = ? LIMIT 1", (plan,)).fetchone() is not None
+
+    def import_dataframe(self, plan: str, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Imports the rows of a plan's workbook that changed since the last import.
+
+        Rows are compared by a hash of all their columns but the status, so only new and edited rows are
+        written. A status is taken from the workbook only if it differs from the status last exported to or
+        imported from it, i.e. if it was edited in the workbook; otherwise the store's status is kept. Posts
+        that are no longer in the workbook are deleted.
+
+        :param plan: The name of the plan.
+        :param df: The plan's DataFrame as read from the workbook.
+        :return: The number of 'inserted', 'updated' and 'deleted' posts and of 'statuses' taken from the
+        workbook.
+        """
+        df = df.dropna(subset=[self.id_column]).drop_duplicates(self.id_column, keep='last')
+        row_hashes = pd.util.hash_pandas_object(df.drop(columns=[self.status_column]), index=False).astype(str)
+        post_ids = [_value(post_id) for post_id in df[self.id_column]]
+        statuses = [_value(status) for status in df[self.status_column]]
+
+        with self._lock:
+            stored = {post_id: (row_hash, exported_status) for post_id, row_hash, exported_status in
+                      self.connection.execute("SELECT post_id, row_hash, exported_status FROM posts WHERE plan = ?",
+                                              (plan,))}
+
+        # Serialized without the lock, so the statuses recorded meanwhile do not wait for it
+        changed_rows, status_updates = [], []
+        for position, (post_id, row_hash, status) in enumerate(zip(post_ids, row_hashes, statuses)):
+            previous = stored.get(post_id)
+            if previous is None or previous[0] != row_hash:
+                changed_rows.append(position)
+            elif previous[1] != status:
+                status_updates.append((status, status, plan, post_id))
+
+        # Only the new and edited rows are serialized
+        changed_df = df.iloc[changed_rows]
+        row_dicts = json.loads(changed_df.to_json(orient='records', date_format='iso', default_handler=str))
+        now = datetime.now().isoformat()
+        records = []
+        for position, row_dict in zip(changed_rows, row_dicts):
+            row = df.iloc[position]
+            post_id = post_ids[position]
+            # An edited row keeps the store's status unless its status was edited as well
+            status_from_workbook = post_id not in stored or stored[post_id][1] != statuses[position]
+            records.append((plan, post_id, _value(row.get(self.platform_column)), _timestamp(row[self.date_column]),
+                            statuses[position], statuses[position], row_hashes.iloc[position],
+                            json.dumps(row_dict), now, int(status_from_workbook)))
+
+        deleted = [(plan, post_id) for post_id in set(stored) - set(post_ids)]
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO posts (plan, post_id, platform, scheduled_time, status, exported_status, row_hash, "
+                "row_json, updated_at) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9) "
+                "ON CONFLICT (plan, post_id) DO UPDATE SET platform = excluded.platform, "
+                "scheduled_time = excluded.scheduled_time, row_hash = excluded.row_hash, "
+                "row_json = excluded.row_json, updated_at = excluded.updated_at, "
+                "status = CASE WHEN ?10 THEN excluded.status ELSE status END, "
+                "exported_status = excluded.exported_status",
+                records)
+            self.connection.executemany(
+                "UPDATE posts SET status = ?, exported_status = ? WHERE plan = ? AND post_id = ?", status_updates)
+            self.connection.executemany("DELETE FROM posts WHERE plan = ? AND post_id = ?", deleted)
+
+        return {'inserted': sum(1 for position in changed_rows if post_ids[position] not in stored),
+                'updated': sum(1 for position in changed_rows if post_ids[position] in stored),
+                'deleted': len(deleted),
+                'statuses': len(status_updates)}
+
+    def set_status(self, plan: str, post_id, status: str):
+        """
+        Sets the status of one post. The write is only queued, so it can be called from the event loop; the
+        statuses queued meanwhile are committed together by a background thread, and the reads wait for them.
+        """
+        self._status_writes.put((status, datetime.now().isoformat(), plan, _value(post_id)))
+
+    def flush(self):
+        """Waits until the statuses queued by set_status are committed."""
+        if not self._writer.is_alive():
+            return
+        committed = threading.Event()
+        self._status_writes.put(committed)
+        committed.wait()
+
+    def set_statuses(self, plan: str, statuses: Dict):
+        """Sets the statuses of several posts, given by 'Post ID'."""
+        self.flush()  # Applied after the statuses queued before
+        now = datetime.now().isoformat()
+        with self._lock, self.connection:
+            self.connection.executemany("UPDATE posts SET status = ?, updated_at = ? WHERE plan = ? AND post_id = ?",
+                                        [(status, now, plan, _value(post_id)) for post_id, status in statuses.items()])
+
+    def dirty_statuses(self, plan: str) -> Dict:
+        """Returns the statuses that differ from the workbook's, by 'Post ID'."""
+        self.flush()
+        with self._lock:
+            return dict(self.connection.execute(
+                "SELECT post_id, status FROM posts WHERE plan = ? AND status IS NOT exported_status", (plan,)))
+
+    def mark_exported(self, plan: str, statuses: Dict):
+        """Records that the given statuses were written to the workbook."""
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "UPDATE posts SET exported_status = ?1 WHERE plan = ?2 AND post_id = ?3 AND status IS ?1",
+                [(status, plan, _value(post_id)) for post_id, status in statuses.items()])
+
+    def load_posts(self, plan: str, start=None, end=None, status: str = None) -> pd.DataFrame:
+        """
+        Loads the posts of a plan into a DataFrame with the workbook's columns, ordered by scheduled time.
+
+        :param plan: The name of the plan.
+        :param start: Only posts scheduled at or after this time.
+        :param end: Only posts scheduled before this time.
+        :param status: Only posts with this status.
+        """
+        query = "SELECT row_json, status FROM posts WHERE plan = ?"
+        parameters = [plan]
+        if start is not None:
+            query += " AND scheduled_time >= ?"
+            parameters.append(_timestamp(start))
+        if end is not None:
+            query += " AND scheduled_time < ?"
+            parameters.append(_timestamp(end))
+        if status is not None:
+            query += " AND status = ?"
+            parameters.append(status)
+        self.flush()
+        with self._lock:
+            rows = self.connection.execute(query + " ORDER BY scheduled_time, rowid", parameters).fetchall()
+
+        if not rows:
+            return pd.DataFrame(columns=[self.id_column, self.platform_column, self.date_column, self.status_column])
+        df = pd.DataFrame.from_records([json.loads(row_json) for row_json, _ in rows])
+        df[self.status_column] = [status for _, status in rows]
+        df[self.date_column] = pd.to_datetime(df[self.date_column])
+        return df
+
+    def posts_for_date(self, plan: str, day: date) -> pd.DataFrame:
+        """Loads the posts of a plan scheduled on a given date."""
+        start = datetime.combine(day, datetime.min.time())
+        return self.load_posts(plan, start, start + timedelta(days=1))
+
+    def close(self):
+        """Commits the queued statuses and closes the database."""
+        if self._writer.is_alive():
+            self._status_writes.put(None)
+            self._writer.join()
+        with self._lock:
+            self.connection.close()
+
+    def _write_statuses(self):
+        while True:
+            # Everything queued while the last batch was committed goes into the next transaction
+            writes = [self._status_writes.get()]
+            while True:
+                try:
+                    writes.append(self._status_writes.get_nowait())
+                except queue.Empty:
+                    break
+            updates = [write for write in writes if isinstance(write, tuple)]
+            if updates:
+                with self._lock:
+                    try:
+                        with self.connection:
+                            self.connection.executemany(
+                                "UPDATE posts SET status = ?, updated_at = ? WHERE plan = ? AND post_id = ?", updates)
+                    except sqlite3.Error as e:
+                        logger.error(f'Error writing {len(updates)} statuses to {self.database_path}: {e}')
+            for write in writes:
+                if isinstance(write, threading.Event):
+                    write.set()
+            if None in writes:
+                return
@@ -4,10 +4,13 @@ from apscheduler.triggers.cron import CronTrigger
 from functools import wraps
 import asyncio
 
+from config import SCHEDULER_CONFIG
+
 
 class AsyncTaskScheduler(AsyncIOScheduler):
     def __init__(self):
-        super().__init__()
+        # Jobs that start late by less than the grace time still run; several missed runs are run only once
+        super().__init__(job_defaults={'misfire_grace_time': SCHEDULER_CONFIG["misfire_grace_time"], 'coalesce': True})
         self.add_listener(self._my_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
         self.jobs = {}
 
@@ -1,10 +1,7 @@
-from rich.console import Console
-
-console = Console()
-
-
 def my_listener(event):
     """Handles scheduler events, displaying them in the console."""
+    from logger_config import console
+
     if event.exception:
         console.print(f'Job {event.job_id} failed', style="red")
     else:
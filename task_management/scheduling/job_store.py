@@ -0,0 +1,173 @@
+import functools
+import json
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+from logger_config import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS post_jobs (
+    plan TEXT NOT NULL,
+    post_id NOT NULL,
+    platform TEXT,
+    scheduled_time TEXT NOT NULL,
+    row_hash TEXT,
+    row_json TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (plan, post_id)
+);
+CREATE INDEX IF NOT EXISTS post_jobs_pending ON post_jobs (plan, state, scheduled_time);
+"""
+
+
+def _key(post_id):
+    """Converts numpy scalars from pandas, which sqlite3 cannot bind, to Python values."""
+    return post_id.item() if hasattr(post_id, 'item') else post_id
+
+
+class PostJobStore:
+    def __init__(self, database_path: Path):
+        """
+        A durable store of the scheduled post jobs, keyed by (plan, 'Post ID'), in a local SQLite database.
+
+        The executors record every job they schedule, reschedule or remove, and the final state of every post
+        ('posted', 'error' or 'missed'). After a restart, the jobs still 'pending' can be scheduled again right
+        away, without parsing the plan workbooks first, and the posts whose time passed in the meantime can be
+        caught up.
+
+        Several processes can share the database; each should only write the jobs of its own plans.
+
+        The writes are called from the event loop, so they are only queued; a background thread commits them,
+        everything queued in the meantime with one transaction. Reads wait for the queued writes first.
+
+        :param database_path: Path to the SQLite database file, created if missing.
+        """
+        self.database_path = database_path
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(database_path, timeout=30, check_same_thread=False)
+        # Readers do not block the writer, and commits do not wait for a full sync to disk
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        # Functions writing to the connection, events to set once everything queued before them is committed,
+        # and None to stop
+        self._writes = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_queued, name='post-job-store-writer', daemon=True)
+        self._writer.start()
+
+    def upsert_jobs(self, plan: str, jobs: Iterable[Tuple]):
+        """
+        Records scheduled jobs as pending, replacing earlier versions of them.
+
+        :param plan: The name of the plan.
+        :param jobs: Tuples of 'Post ID', platform, scheduled time, row hash and the row as JSON serializable values.
+        """
+        jobs = list(jobs)
+        if jobs:
+            # The rows are serialized by the writer thread as well
+            self._writes.put(functools.partial(self._upsert_jobs, plan, jobs))
+
+    def _upsert_jobs(self, plan: str, jobs: List[Tuple]):
+        now = datetime.now().isoformat()
+        records = [(plan, _key(post_id), platform, pd.Timestamp(scheduled_time).isoformat(), str(row_hash),
+                    json.dumps(row, default=str), now)
+                   for post_id, platform, scheduled_time, row_hash, row in jobs]
+        self.connection.executemany(
+            "INSERT INTO post_jobs (plan, post_id, platform, scheduled_time, row_hash, row_json, state, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, 'pending', ?) "
+            "ON CONFLICT (plan, post_id) DO UPDATE SET platform = excluded.platform, "
+            "scheduled_time = excluded.scheduled_time, row_hash = excluded.row_hash, "
+            "row_json = excluded.row_json, state = 'pending', updated_at = excluded.updated_at",
+            records)
+
+    def remove_jobs(self, plan: str, post_ids: Iterable):
+        """Deletes the jobs of posts that were unscheduled."""
+        records = [(plan, _key(post_id)) for post_id in post_ids]
+        if records:
+            self._writes.put(functools.partial(
+                self.connection.executemany, "DELETE FROM post_jobs WHERE plan = ? AND post_id = ?", records))
+
+    def mark_finished(self, plan: str, post_id, state: str):
+        """
+        Records the final state of a post, so it is not scheduled again after a restart.
+
+        :param plan: The name of the plan.
+        :param post_id: The 'Post ID' of the post.
+        :param state: 'posted', 'error' or 'missed'.
+        """
+        self._writes.put(functools.partial(
+            self.connection.execute, "UPDATE post_jobs SET state = ?, updated_at = ? WHERE plan = ? AND post_id = ?",
+            (state, datetime.now().isoformat(), plan, _key(post_id))))
+
+    def flush(self):
+        """Waits until the queued writes are committed."""
+        if not self._writer.is_alive():
+            return
+        committed = threading.Event()
+        self._writes.put(committed)
+        committed.wait()
+
+    def pending_jobs(self, plan: str) -> List[Dict]:
+        """
+        Returns the jobs of a plan that have not finished yet, earliest first.
+
+        :return: Dictionaries with the 'post_id', 'platform', 'scheduled_time' (a pandas Timestamp), 'row_hash'
+        and 'row' (a pandas Series) of each job.
+        """
+        self.flush()
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT post_id, platform, scheduled_time, row_hash, row_json FROM post_jobs "
+                "WHERE plan = ? AND state = 'pending' ORDER BY scheduled_time", (plan,)).fetchall()
+        jobs = []
+        for post_id, platform, scheduled_time, row_hash, row_json in rows:
+            row = pd.Series(json.loads(row_json))
+            row['Scheduled Time'] = pd.Timestamp(scheduled_time)
+            jobs.append({'post_id': post_id, 'platform': platform, 'scheduled_time': pd.Timestamp(scheduled_time),
+                         'row_hash': int(row_hash), 'row': row})
+        return jobs
+
+    def job_states(self, plan: str) -> Dict:
+        """Returns the state of every recorded job of a plan by 'Post ID'."""
+        self.flush()
+        with self._lock:
+            return dict(self.connection.execute("SELECT post_id, state FROM post_jobs WHERE plan = ?", (plan,)))
+
+    def close(self):
+        """Commits the queued writes and closes the database."""
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join()
+        with self._lock:
+            self.connection.close()
+
+    def _write_queued(self):
+        while True:
+            # Everything queued while the last batch was committed goes into the next transaction
+            writes = [self._writes.get()]
+            while True:
+                try:
+                    writes.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                try:
+                    with self.connection:
+                        for write in writes:
+                            if callable(write):
+                                write()
+                except sqlite3.Error as e:
+                    logger.error(f'Error writing {len(writes)} changes to the job store {self.database_path}: {e}')
+            for write in writes:
+                if isinstance(write, threading.Event):
+                    write.set()
+            if None in writes:
+                return
@@ -0,0 +1,92 @@
+import asyncio
+import contextlib
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from logger_config import logger
+
+
+class PlanFileWatcher:
+    def __init__(self, file_path: Path, on_change: Callable[[], Awaitable[None]], poll_interval: float = 1.0):
+        """
+        Watches a plan workbook and calls back once it was changed.
+
+        The file's modification time and size are polled on the running event loop. A change is reported only
+        after the file stopped changing for one poll interval, because Excel writes a workbook in several steps.
+        Writes of the service itself, made within :meth:`own_write`, are not reported.
+
+        :param file_path: Path to the watched file.
+        :param on_change: Coroutine function called after the file changed.
+        :param poll_interval: Seconds between two checks of the file.
+        """
+        self.file_path = file_path
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._last_stat = None
+        # Number of writes of the service itself in progress
+        self._own_writes = 0
+
+    def start(self):
+        """Starts watching the file on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self):
+        """Stops watching the file."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @contextlib.contextmanager
+    def own_write(self):
+        """
+        Context of a write of the service itself to the file, e.g. the export of the statuses. The state of the
+        file afterwards is taken as known, so the write is not reported as a change; neither is an outside edit
+        made at the same time.
+        """
+        self._own_writes += 1
+        try:
+            yield
+        finally:
+            self._own_writes -= 1
+            self._last_stat = self._stat()
+
+    async def _watch(self):
+        self._last_stat = self._stat()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            stat = self._stat()
+            if self._own_writes or stat == self._last_stat:
+                continue
+
+            # Wait until the file stopped changing
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                settled_stat = self._stat()
+                if settled_stat == stat:
+                    break
+                stat = settled_stat
+
+            if self._own_writes or stat == self._last_stat:
+                continue  # Written by the service itself in the meantime
+            self._last_stat = stat
+            if stat is None:
+                continue  # Removed; wait for it to come back
+
+            try:
+                await self.on_change()
+            except Exception as e:
+                logger.error(f"Error reloading {self.file_path}: {e}")
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.file_path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
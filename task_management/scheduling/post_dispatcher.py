@@ -0,0 +1,220 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime
+from typing import Callable, Coroutine, Dict, List, NamedTuple, Optional, Sequence
+
+from config import SCHEDULER_CONFIG
+from logger_config import logger
+
+# Codes of the events passed to the listeners
+JOB_EXECUTED = 'executed'
+JOB_ERROR = 'error'
+JOB_MISSED = 'missed'
+
+# Seconds the dispatcher sleeps at most, so a change of the system clock is noticed
+MAX_SLEEP = 60.0
+
+
+class DispatchEvent(NamedTuple):
+    """What happened to a job: JOB_EXECUTED, JOB_ERROR with the exception it raised, or JOB_MISSED."""
+    code: str
+    job_id: str
+    exception: Optional[BaseException] = None
+
+
+class DispatchJob:
+    __slots__ = ('id', 'func', 'args', 'run_date', '_entry')
+
+    def __init__(self, job_id: str, func: Callable[..., Coroutine], args: Sequence, run_date: datetime):
+        """
+        A coroutine function call due at a point in time.
+
+        :param job_id: Unique id of the job within its dispatcher.
+        :param func: The coroutine function to run.
+        :param args: The arguments to call it with.
+        :param run_date: When to run it, as a naive local time.
+        """
+        self.id = job_id
+        self.func = func
+        self.args = list(args)
+        self.run_date = run_date
+        # The job's heap entry; marked stale instead of being removed from the heap
+        self._entry = None
+
+    def __repr__(self):
+        return f'DispatchJob(id={self.id!r}, run_date={self.run_date})'
+
+
+class PostDispatcher:
+    def __init__(self, misfire_grace_time: float = SCHEDULER_CONFIG['misfire_grace_time']):
+        """
+        Runs one-off jobs at their run date, e.g. the posts of the plans, on the running event loop.
+
+        The jobs are kept in a min-heap by run date, and a single timer sleeps until the earliest one is due.
+        Adding, rescheduling and removing a job takes O(log n) or less, however many jobs there are. A job that
+        is rescheduled or removed leaves a stale entry behind, which is skipped when it comes up and dropped
+        when the stale entries outnumber the live ones.
+
+        Recurring jobs, such as the daily maintenance, belong on the AsyncTaskScheduler.
+
+        :param misfire_grace_time: Seconds a job may start late, e.g. because the event loop was busy, and
+        still run. Jobs due longer ago are reported as missed.
+        """
+        self.misfire_grace_time = misfire_grace_time
+        self._jobs: Dict[str, DispatchJob] = {}
+        # Entries [timestamp, sequence, job]; the job is None once the entry is stale
+        self._heap: List[list] = []
+        self._stale = 0
+        self._sequence = itertools.count()
+        self._listeners: List[Callable[[DispatchEvent], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_due: Optional[float] = None
+        # Jobs being run, referenced until they are done
+        self._running_tasks = set()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def start(self):
+        """Starts running the due jobs on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._arm()
+
+    def shutdown(self):
+        """Stops running jobs, without waiting for the running ones. The pending jobs are kept."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._timer_due = None
+        self._loop = None
+
+    def add_listener(self, callback: Callable[[DispatchEvent], None]):
+        """Adds a function called with a DispatchEvent whenever a job ran, failed or was missed."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[DispatchEvent], None]):
+        self._listeners.remove(callback)
+
+    def add_job(self, job_id: str, run_date: datetime, func: Callable[..., Coroutine],
+                args: Sequence = ()) -> DispatchJob:
+        """
+        Adds a job, replacing a pending job with the same id.
+
+        :param job_id: Unique id of the job.
+        :param run_date: When to run the job, as a naive local time.
+        :param func: The coroutine function to run.
+        :param args: The arguments to call it with.
+        :return: The job.
+        """
+        if job_id in self._jobs:
+            self._invalidate(self._jobs[job_id])
+        job = self._jobs[job_id] = DispatchJob(job_id, func, args, run_date)
+        self._push(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[DispatchJob]:
+        """Returns a pending job, or None if there is none with that id, e.g. because it ran already."""
+        return self._jobs.get(job_id)
+
+    def get_jobs(self) -> List[DispatchJob]:
+        """Returns the pending jobs, the earliest first."""
+        return sorted(self._jobs.values(), key=lambda job: job.run_date)
+
+    def reschedule_job(self, job_id: str, run_date: datetime):
+        """
+        Moves a pending job to another run date.
+
+        :raises KeyError: If there is no pending job with that id.
+        """
+        job = self._jobs[job_id]
+        self._invalidate(job)
+        job.run_date = run_date
+        self._push(job)
+
+    def modify_job(self, job_id: str, args: Sequence):
+        """
+        Replaces the arguments of a pending job.
+
+        :raises KeyError: If there is no pending job with that id.
+        """
+        self._jobs[job_id].args = list(args)
+
+    def remove_job(self, job_id: str):
+        """
+        Removes a pending job.
+
+        :raises KeyError: If there is no pending job with that id.
+        """
+        self._invalidate(self._jobs.pop(job_id))
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def _push(self, job: DispatchJob):
+        timestamp = job.run_date.timestamp()
+        job._entry = [timestamp, next(self._sequence), job]
+        heapq.heappush(self._heap, job._entry)
+        if self._timer_due is None or timestamp < self._timer_due:
+            self._arm()
+
+    def _invalidate(self, job: DispatchJob):
+        job._entry[2] = None
+        job._entry = None
+        self._stale += 1
+        if self._stale > 1000 and self._stale > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if entry[2] is not None]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _arm(self):
+        """Sets the timer to the run date of the earliest job."""
+        if self._loop is None:
+            return
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_due = None
+        if not self._heap:
+            return
+        self._timer_due = self._heap[0][0]
+        self._timer = self._loop.call_later(min(max(self._timer_due - time.time(), 0), MAX_SLEEP), self._on_timer)
+
+    def _on_timer(self):
+        self._timer = self._timer_due = None
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            timestamp, _, job = heapq.heappop(self._heap)
+            if job is None:
+                self._stale -= 1
+                continue
+            del self._jobs[job.id]
+            job._entry = None
+            if now - timestamp > self.misfire_grace_time:
+                logger.warning(f'Job {job.id} was due at {job.run_date} and missed its grace time.')
+                self._notify(DispatchEvent(JOB_MISSED, job.id))
+                continue
+            task = self._loop.create_task(self._run(job))
+            self._running_tasks.add(task)
+            task.add_done_callback(self._running_tasks.discard)
+        self._arm()
+
+    async def _run(self, job: DispatchJob):
+        try:
+            await job.func(*job.args)
+        except Exception as e:
+            logger.exception(f'Job {job.id} raised {type(e).__name__}: {e}')
+            self._notify(DispatchEvent(JOB_ERROR, job.id, e))
+        else:
+            self._notify(DispatchEvent(JOB_EXECUTED, job.id))
+
+    def _notify(self, event: DispatchEvent):
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception(f'Listener {listener!r} failed on the event of job {event.job_id}.')
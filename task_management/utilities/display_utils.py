@@ -1,9 +1,8 @@
-from rich.console import Console
-from rich.table import Table
-
-
 def display_dataframe_as_table(dataframe, title: str):
     """Displays a pandas DataFrame as a rich table."""
+    from rich.console import Console
+    from rich.table import Table
+
     console = Console()
     table = Table(title=title)
     for column in dataframe.columns:
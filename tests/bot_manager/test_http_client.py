@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from bot_manager.bot_core.errors import CredentialError, TransientError
+from bot_manager.bot_core.http_client import SharedHttpClient
+from bot_manager.bot_core.mock_platform_server import MockPlatformServer
+from config import HTTP_CONFIG
+
+
+def run_against_mock_server(test, **server_options):
+    """Runs a test coroutine with a client pointed at a freshly started mock server."""
+    async def run():
+        server = MockPlatformServer(**server_options)
+        client = SharedHttpClient({**HTTP_CONFIG, 'graph_api_url': await server.start()})
+        try:
+            return await test(client, server)
+        finally:
+            await client.close()
+            await server.stop()
+
+    return asyncio.run(run())
+
+
+def test_requests_share_one_pooled_session():
+    """Test that concurrent requests reuse the session of the event loop."""
+    async def test(client, server):
+        session = client.session()
+        responses = await asyncio.gather(*(client.post('me/feed', data={'access_token': 'token', 'message': i})
+                                           for i in range(20)))
+        assert client.session() is session
+        return responses, server.request_count
+
+    responses, request_count = run_against_mock_server(test)
+    assert request_count == 20
+    assert len({response['id'] for response in responses}) == 20
+
+
+def test_error_responses_map_to_bot_errors():
+    """Test that authentication and server errors raise the errors the retry engine handles."""
+    async def test(client, server):
+        with pytest.raises(CredentialError):
+            await client.post('me/feed', data={'message': 'no token'})
+        server.error_rate = 1.0
+        with pytest.raises(TransientError):
+            await client.post('me/feed', data={'access_token': 'token'})
+
+    run_against_mock_server(test)
+
+
+def test_connection_failure_is_transient():
+    """Test that a refused connection raises a TransientError."""
+    async def run():
+        client = SharedHttpClient({**HTTP_CONFIG, 'graph_api_url': 'http://127.0.0.1:9/v19.0'})
+        try:
+            with pytest.raises(TransientError):
+                await client.post('me/feed', data={'access_token': 'token'})
+        finally:
+            await client.close()
+
+    asyncio.run(run())
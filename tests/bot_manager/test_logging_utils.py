@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from bot_manager.bot_core.bots import SocialMediaBot
+from bot_manager.bot_core.logging_utils import (BatchingLogWriter, BatchedFileHandler, ContextualLogger,
+                                                DailyJournalHandler, current_post_id)
+
+
+def make_logger(name, writer, log_file):
+    """Creates a logger whose records are written to log_file by the writer thread."""
+    handler = BatchedFileHandler(log_file)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logs = logging.getLogger(name)
+    logs.setLevel(logging.DEBUG)
+    logs.propagate = False
+    logs.handlers.clear()
+    writer.add_handlers(name, [handler])
+    logs.addHandler(writer.create_queue_handler())
+    return logs
+
+
+def test_no_record_is_lost_on_stop(tmp_path):
+    """Test that every record logged from several threads is in the file after a clean stop."""
+    writer = BatchingLogWriter(batch_size=64, flush_interval=10.0)
+    log_file = tmp_path / 'plan_posts.log'
+    logs = make_logger('test_no_record_is_lost', writer, log_file)
+
+    def log_many(thread_number):
+        for i in range(2000):
+            logs.info(f'{thread_number} {i}')
+
+    threads = [threading.Thread(target=log_many, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.stop()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 8000
+    assert set(lines) == {f'{n} {i}' for n in range(4) for i in range(2000)}
+
+    # Records logged after the stop are written synchronously
+    logs.info('late record')
+    assert log_file.read_text().splitlines()[-1] == 'late record'
+
+
+def test_records_are_flushed_on_timer(tmp_path):
+    """Test that a single record is flushed after the flush interval without a stop."""
+    writer = BatchingLogWriter(batch_size=1000, flush_interval=0.05)
+    log_file = tmp_path / 'plan_posts.log'
+    logs = make_logger('test_records_are_flushed_on_timer', writer, log_file)
+
+    logs.info('Post ID: 1 - Posted - message')
+    deadline = time.monotonic() + 2
+    while not log_file.read_text() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert log_file.read_text() == 'Post ID: 1 - Posted - message\n'
+    writer.stop()
+
+
+def test_journal_records_are_written_per_day(tmp_path):
+    """Test that journal records end up as JSON lines in the file of the day they were created."""
+    writer = BatchingLogWriter(batch_size=10, flush_interval=10.0)
+    journal_dir = tmp_path / 'journal' / 'plan'
+    journal = logging.getLogger('test_journal_records_are_written_per_day')
+    journal.setLevel(logging.INFO)
+    journal.propagate = False
+    journal.handlers.clear()
+    writer.add_handlers(journal.name, [DailyJournalHandler(str(journal_dir))])
+    journal.addHandler(writer.create_queue_handler())
+
+    journal.info('Posted', extra={'outcome': {'post_id': 1, 'status': 'Posted', 'latency': 0.1}})
+    journal.info('Error', extra={'outcome': {'post_id': 2, 'status': 'Error', 'latency': 0.2}})
+    writer.stop()
+
+    day_files = list(journal_dir.glob('*.jsonl'))
+    assert [path.name for path in day_files] == [f'{datetime.now().date().isoformat()}.jsonl']
+    records = [json.loads(line) for line in day_files[0].read_text().splitlines()]
+    assert [(record['post_id'], record['status']) for record in records] == [(1, 'Posted'), (2, 'Error')]
+    assert all('ts' in record for record in records)
+
+
+class ListHandler(logging.Handler):
+    """Collects the formatted messages of the records it handles."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_concurrent_posts_log_their_own_post_id():
+    """Test that every line logged by hundreds of posts executed concurrently by PostExecutor through one bot
+    logger carries its own Post ID."""
+    import pandas as pd
+
+    from social_media.post_executor import PostExecutor
+    from social_media.rate_limiter import RateLimiterRegistry
+
+    base_logger = logging.getLogger('test_concurrent_posts_log_their_own_post_id')
+    base_logger.setLevel(logging.DEBUG)
+    base_logger.propagate = False
+    handler = ListHandler()
+    base_logger.handlers = [handler]
+    logs = ContextualLogger(base_logger, {'excel_file': 'plan.xlsx', 'platform_name': 'Facebook'})
+
+    class Bot:
+        """One bot shared by every post, logging while the posts interleave."""
+        auth_manager = SimpleNamespace(refresh_token=lambda: None)
+
+        def __init__(self):
+            self.logs = logs
+
+        def create_post_from_dataframe_row(self, row):
+            return SimpleNamespace(post_id=row['Post ID'])
+
+        async def post(self, post):
+            for step in range(5):
+                logs.debug(f'step {step} of {post.post_id}')
+                await asyncio.sleep(random.uniform(0, 0.002))
+            SocialMediaBot.log_post(self, post, logging.INFO, f'Posted - {post.post_id}')
+
+        def journal_post(self, post, status, latency, attempts=1, error=None):
+            pass
+
+    bot = Bot()
+    now = datetime.now()
+
+    async def run():
+        post_executor = PostExecutor(Path('logging_utils_test.xlsx'), None, rate_limiter=RateLimiterRegistry({}))
+        post_executor.bot_manager.load_bot = lambda platform, account=None: bot
+        rows = [pd.Series({'Post ID': post_id, 'Platform': 'Facebook', 'Scheduled Time': now})
+                for post_id in range(1, 501)]
+        await asyncio.gather(*(post_executor.execute_post('Facebook', row) for row in rows))
+        return current_post_id.get()
+
+    assert asyncio.run(run()) is None
+
+    assert len(handler.messages) == 500 * 6
+    for message in handler.messages:
+        post_id, text = re.match(r'plan\.xlsx - Facebook - Post ID: (\d+) - (.*)', message).groups()
+        assert text.endswith(f' {post_id}'), message
+    # Nothing is left behind in the shared context
+    assert 'post_id' not in logs.extra
+
+
+def test_no_record_is_lost_while_stopping(tmp_path):
+    """Test that records logged while the writer is being stopped are written, not left in the queue."""
+    writer = BatchingLogWriter(batch_size=64, flush_interval=10.0)
+    log_file = tmp_path / 'plan_posts.log'
+    logs = make_logger('test_no_record_is_lost_while_stopping', writer, log_file)
+    logs.info('first record')
+    stop_requested = threading.Event()
+
+    def log_many(thread_number):
+        stop_requested.wait()
+        for i in range(2000):
+            logs.info(f'{thread_number} {i}')
+
+    threads = [threading.Thread(target=log_many, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    stop_requested.set()
+    writer.stop()
+    for thread in threads:
+        thread.join()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 8001
+    assert writer.queue.empty()
@@ -0,0 +1,47 @@
+import hashlib
+
+import pytest
+
+from bot_manager.bot_core.errors import MediaError
+from bot_manager.bot_core.media import MediaCache
+from bot_manager.bots.facebook import FacebookPost
+
+
+def make_cache(**config):
+    return MediaCache({'cache_bytes': 100, 'mmap_threshold': 50, 'max_file_bytes': 80, **config})
+
+
+def test_files_are_hashed_cached_and_evicted(tmp_path):
+    """Test that read files are kept up to the size limit, least recently used first, large ones mapped."""
+    cache = make_cache()
+    paths = {}
+    for name, size in (('a', 40), ('b', 40), ('c', 60)):
+        paths[name] = str(tmp_path / name)
+        (tmp_path / name).write_bytes(name.encode() * size)
+
+    a = cache.load(paths['a'])
+    assert a.sha256 == hashlib.sha256(b'a' * 40).hexdigest() and a.data == b'a' * 40
+    cache.load(paths['b'])
+    assert cache.load(paths['a']) is a  # Unchanged, not read again
+    c = cache.load(paths['c'])
+    assert not isinstance(c.data, bytes) and c.data[:] == b'c' * 60  # Memory-mapped
+    # 'b' was the least recently used
+    assert cache.get(paths['b']) is None
+    assert cache.get(paths['a']) is a and cache.get(paths['c']) is c
+
+
+def test_broken_media_of_a_post_is_reported(tmp_path):
+    """Test that missing, empty and oversized files of a post are all named; URLs are not checked."""
+    cache = make_cache()
+    (tmp_path / 'empty.jpg').write_bytes(b'')
+    (tmp_path / 'huge.mp4').write_bytes(b'x' * 81)
+    post = FacebookPost(1, 'content', str(tmp_path / 'empty.jpg'), '#tag', video=str(tmp_path / 'huge.mp4'))
+
+    with pytest.raises(MediaError) as error:
+        cache.load_post(post)
+    assert 'empty' in error.value.message and 'limit' in error.value.message
+    with pytest.raises(MediaError):
+        cache.load(str(tmp_path / 'missing.jpg'))
+
+    post = FacebookPost(2, 'content', 'https://example.com/image.jpg', '#tag')
+    assert post.media_paths() == [] and cache.load_post(post) == [] and cache.is_loaded(post)
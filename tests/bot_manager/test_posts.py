@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pandas as pd
+
+from bot_manager.bot_core.posts import ScheduledPost
+from bot_manager.bots.facebook import FacebookPost
+from bot_manager.bots.instagram import InstagramPost
+
+
+def test_bulk_build_matches_rows():
+    """Test that posts built in bulk equal the ones built row by row, with each platform's post class."""
+    df = pd.DataFrame({
+        'Post ID': [1, 2, 3],
+        'Platform': ['Facebook', 'Instagram', 'Facebook'],
+        'Account': ['brand', None, 'brand'],
+        'Content': ['one', 'two', 'three'],
+        'Image Path': ['img1', 'img1', None],
+        'Hashtags': ['#a', '#b', '#a'],
+        'Scheduled Time': pd.to_datetime(['2024-01-01 10:00', '2024-01-01 11:00', '2024-01-01 12:00']),
+    })
+    post_classes = {'Facebook': FacebookPost, 'Instagram': InstagramPost}
+
+    records = ScheduledPost.from_dataframe(df, post_classes)
+
+    assert records == [ScheduledPost.from_row(row, post_classes[row['Platform']]) for _, row in df.iterrows()]
+    assert [type(record.post) for record in records] == [FacebookPost, InstagramPost, FacebookPost]
+    assert records[0].post.video == '' and records[1].post.reel == ''  # Columns the plan does not have
+    assert records[1].account is None and records[2].post.image_path is None
+    assert records[0].post.hashtags is records[2].post.hashtags  # Equal values share one object
+    assert records[2]['Content'] == 'three' and records[2]['Scheduled Time'] == datetime(2024, 1, 1, 12)
+    assert FacebookPost.from_dataframe_row(records[0]) is records[0].post
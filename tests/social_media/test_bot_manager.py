@@ -23,3 +23,33 @@ def test_bot_loading():
     # Check if the bot_instance is not None and is an instance of the correct protocol
     assert bot_instance is not None, "Bot instance should not be None"
     assert isinstance(bot_instance, SocialMediaProtocol), "Bot instance should implement SocialMediaProtocol"
+
+
+def test_platform_registry_imports_lazily_and_caches_misses(monkeypatch):
+    """
+    Test that the registry scans the bots directory once, imports a platform's module only when it is first
+    used, and does not rescan for an unknown platform.
+    """
+    import sys
+    from social_media.bot_manager import PlatformRegistry
+
+    registry = PlatformRegistry()
+    scans = []
+    discover = registry._discover
+    monkeypatch.setattr(registry, '_discover', lambda: scans.append(1) or discover())
+    monkeypatch.delitem(sys.modules, 'bot_manager.bots.instagram', raising=False)
+
+    assert 'instagram' in registry.platforms()
+    assert 'bot_manager.bots.instagram' not in sys.modules
+
+    for _ in range(100):
+        assert registry.get('LinkedIn') is None
+    assert registry.get('instagram').__name__ == 'InstagramBot'
+    assert 'bot_manager.bots.instagram' in sys.modules
+    assert len(scans) == 1
+
+    # Two plans share the registry
+    assert BotManager("a.xlsx", registry).registry is BotManager("b.xlsx", registry).registry
+    registry.refresh()
+    assert registry.get('linkedin') is None
+    assert len(scans) == 2
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from social_media.multi_plan_executor import MultiPlanExecutor
+from social_media.rate_limiter import RateLimiterRegistry
+
+
+def make_posts(post_ids, accounts):
+    return pd.DataFrame({
+        'Post ID': post_ids,
+        'Platform': ['Facebook'] * len(post_ids),
+        'Account': accounts,
+        'Content': [f'post {post_id}' for post_id in post_ids],
+        'Image Path': [''] * len(post_ids),
+        'Hashtags': ['#multi'] * len(post_ids),
+        'Scheduled Time': [datetime.now()] * len(post_ids),
+        'Status': ['Scheduled'] * len(post_ids),
+    })
+
+
+def test_plans_share_the_dispatcher_but_not_their_bots():
+    """Test that two plans post from one dispatcher with a bot per plan and account."""
+    async def run():
+        executor = MultiPlanExecutor(rate_limiter=RateLimiterRegistry({}))
+        # The same post ids in both plans must not clash
+        first = executor.add_plan(Path('multi_plan_test_a.xlsx'), make_posts([1, 2], ['acme', 'acme']))
+        second = executor.add_plan(Path('multi_plan_test_b.xlsx'), make_posts([1, 2], ['acme', None]))
+        await executor.start()
+        await asyncio.wait_for(executor.wait_until_done(), timeout=30)
+        executor.shutdown()
+        return executor, first, second
+
+    executor, first, second = asyncio.run(run())
+    assert first.dispatcher is second.dispatcher
+    assert first.rate_limiter is second.rate_limiter
+    assert set(first.running_tasks) == set(second.running_tasks) == {1, 2}
+
+    first_bot = first.bot_manager.load_bot('facebook', 'acme')
+    second_bot = second.bot_manager.load_bot('facebook', 'acme')
+    assert first_bot is not second_bot
+    assert first_bot.excel_file_name == 'multi_plan_test_a.xlsx'
+    assert second_bot.excel_file_name == 'multi_plan_test_b.xlsx'
+    assert first_bot.auth_manager is not second_bot.auth_manager
+    assert first_bot.logs.extra['account'] == 'acme'
+    assert second.bot_manager.load_bot('facebook') is not second_bot
+    assert set(second.bot_manager.bot_instances) == {('facebook', 'acme'), ('facebook', None)}
+
+
+def test_remove_plan_cancels_its_posts():
+    """Test that removing a plan cancels its pending posts only."""
+    async def run():
+        executor = MultiPlanExecutor(rate_limiter=RateLimiterRegistry({}))
+        later = make_posts([1], [None]).assign(**{'Scheduled Time': [pd.Timestamp.now() + pd.Timedelta(hours=1)]})
+        executor.add_plan(Path('multi_plan_test_a.xlsx'), later)
+        executor.add_plan(Path('multi_plan_test_b.xlsx'), later)
+        executor.remove_plan('multi_plan_test_a')
+        job_ids = [job.id for job in executor.dispatcher.get_jobs()]
+        executor.shutdown()
+        return executor, job_ids
+
+    executor, job_ids = asyncio.run(run())
+    assert list(executor.executors) == ['multi_plan_test_b']
+    assert job_ids == ['multi_plan_test_b:1']
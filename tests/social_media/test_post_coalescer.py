@@ -0,0 +1,39 @@
+import asyncio
+
+from social_media.post_coalescer import PostCoalescer
+
+
+def test_posts_are_grouped_by_key_and_window():
+    """Test that posts submitted within the window are sent together per key, split at max_size."""
+    groups = []
+
+    async def send(key, posts):
+        groups.append((key, posts))
+        return [f'{key}:{post}' for post in posts]
+
+    async def run():
+        coalescer = PostCoalescer(send, window=0.01, max_size=3)
+        results = await asyncio.gather(*(coalescer.submit(i % 2, i) for i in range(8)))
+        assert coalescer.pending() == 0
+        return results
+
+    results = asyncio.run(run())
+    assert results == [f'{i % 2}:{i}' for i in range(8)]
+    assert sorted(groups) == [(0, [0, 2, 4]), (0, [6]), (1, [1, 3, 5]), (1, [7])]
+
+
+def test_outcomes_are_per_post():
+    """Test that a post failing within its group fails alone, and a failing send fails the whole group."""
+    async def send(key, posts):
+        if key == 'down':
+            raise ConnectionError('unreachable')
+        return [ValueError(post) if post == 'bad' else post for post in posts]
+
+    async def run():
+        coalescer = PostCoalescer(send, window=0.01)
+        return await asyncio.gather(coalescer.submit('up', 'good'), coalescer.submit('up', 'bad'),
+                                    coalescer.submit('down', 'lost'), return_exceptions=True)
+
+    good, bad, lost = asyncio.run(run())
+    assert good == 'good'
+    assert isinstance(bad, ValueError) and isinstance(lost, ConnectionError)
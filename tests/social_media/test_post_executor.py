@@ -3,8 +3,17 @@
 import pytest
 import pandas as pd
 from datetime import datetime, timedelta
+from pathlib import Path
 import asyncio
 from social_media.post_executor import PostExecutor
+from social_media.rate_limiter import RateLimiterRegistry
+from config import SCHEDULER_CONFIG
+from metrics import POSTS, POSTS_IN_FLIGHT
+
+
+def post_jobs(post_executor):
+    """Returns the dispatcher's post jobs by id, without the media prefetch jobs."""
+    return {job.id: job for job in post_executor.dispatcher.get_jobs() if not job.id.endswith(':media')}
 
 
 # Parameterize the test function to accept different numbers of posts
@@ -26,10 +35,317 @@ def test_post_executor_start(num_posts):
         'Remarks': [''] * num_posts,
     })
 
-    post_executor = PostExecutor('post_executor_test.xlsx', posts_df)
-    asyncio.run(post_executor.start())
+    async def run():
+        # No rate limits, this test is about dispatching every post
+        post_executor = PostExecutor(Path('post_executor_test.xlsx'), posts_df, rate_limiter=RateLimiterRegistry({}))
+        await post_executor.start()
+        # start() only schedules the posts; completion is signalled by an event
+        await asyncio.wait_for(post_executor.wait_until_done(), timeout=30)
+        post_executor.shutdown()
+        return post_executor
+
+    def outcomes(status):
+        return sum(POSTS.value('post_executor_test', platform, status) for platform in ('Facebook', 'Instagram'))
+
+    posted_before, errors_before = outcomes('Posted'), outcomes('Error')
+    post_executor = asyncio.run(run())
+    assert not post_executor.pending_jobs
+    assert set(post_executor.running_tasks) == set(posts_df['Post ID'])
+    assert not any(post_executor.running_tasks.values())
+    # Every post is posted and counted once, and none is left in flight; the simulated bots never read 'img1'
+    assert outcomes('Posted') - posted_before == num_posts
+    assert outcomes('Error') == errors_before
+    assert POSTS_IN_FLIGHT.value('Facebook') == POSTS_IN_FLIGHT.value('Instagram') == 0
 
     # Here you should add assertions that validate the behavior of your PostExecutor.
     # For example, you could check if the Status of all 'Scheduled' posts in DataFrame have changed to 'Posted'
     # However, for that, your PostExecutor's methods need to update the DataFrame accordingly
     # This part is left as an exercise for you as it depends on the implementation details of your PostExecutor
+
+
+def test_update_executor_reschedules_only_changed_posts():
+    """Test that reloaded data is diffed against the scheduled jobs by Post ID."""
+    base_time = datetime.now() + timedelta(hours=1)
+    posts_df = pd.DataFrame({
+        'Post ID': [1, 2, 3, 4],
+        'Platform': ['Instagram', 'Facebook', 'Instagram', 'Facebook'],
+        'Content': ['one', 'two', 'three', 'four'],
+        'Image Path': ['img1'] * 4,
+        'Hashtags': ['#new'] * 4,
+        'Scheduled Time': [base_time] * 4,
+        'Status': ['Scheduled'] * 4,
+        'Remarks': [float('nan')] * 4,
+    })
+
+    async def run():
+        post_executor = PostExecutor(Path('post_executor_test.xlsx'), posts_df)
+        await post_executor.start()
+        unchanged_row = post_executor.dispatcher.get_job(post_executor.job_id(1)).args[1]
+
+        new_df = posts_df.copy()
+        new_df.loc[new_df['Post ID'] == 2, 'Scheduled Time'] = base_time + timedelta(minutes=30)
+        new_df.loc[new_df['Post ID'] == 3, 'Content'] = 'three, edited'
+        new_df.loc[new_df['Post ID'] == 4, 'Status'] = 'Cancelled'
+        new_df = pd.concat([new_df, posts_df[posts_df['Post ID'] == 1].assign(**{'Post ID': 5})])
+        post_executor.update_executor('post_executor_test.xlsx', new_df)
+
+        jobs = post_jobs(post_executor)
+        post_executor.shutdown()
+        return post_executor, unchanged_row, jobs
+
+    post_executor, unchanged_row, jobs = asyncio.run(run())
+    job_id = post_executor.job_id
+    assert set(jobs) == {job_id(1), job_id(2), job_id(3), job_id(5)}
+    assert set(post_executor.pending_jobs) == set(jobs)
+    # The unchanged post keeps the job arguments it was scheduled with
+    assert jobs[job_id(1)].args[1] is unchanged_row
+    assert jobs[job_id(2)].run_date == base_time + timedelta(minutes=30)
+    assert jobs[job_id(3)].args[1]['Content'] == 'three, edited'
+
+
+class FlakyBot:
+    """A stand-in bot failing with a given error until it is told to recover."""
+
+    class AuthManager:
+        def refresh_token(self):
+            pass
+
+    def __init__(self, error):
+        self.error = error
+        self.auth_manager = self.AuthManager()
+        self.posted = []
+        self.logged = []
+        self.journaled = []
+
+    def create_post_from_dataframe_row(self, row):
+        return row['Post ID']
+
+    async def post(self, post):
+        if self.error:
+            raise self.error
+        self.posted.append(post)
+
+    def log_post(self, post, level, message, data=None):
+        self.logged.append((post, message))
+
+    def journal_post(self, post, status, latency, attempts=1, error=None):
+        self.journaled.append((post, status, attempts, type(error).__name__ if error else None))
+
+
+def test_failed_post_is_dead_lettered_and_replayed(tmp_path):
+    """Test that a post failing after its retries goes to the dead-letter queue and can be replayed."""
+    from social_media.dead_letter_queue import DeadLetterQueue
+
+    posts_df = pd.DataFrame({
+        'Post ID': [7],
+        'Platform': ['Facebook'],
+        'Content': ['seven'],
+        'Scheduled Time': [datetime.now() + timedelta(hours=1)],
+        'Status': ['Scheduled'],
+    })
+    bot = FlakyBot(ValueError('rejected'))
+
+    async def run():
+        post_executor = PostExecutor(Path('post_executor_test.xlsx'), posts_df, rate_limiter=RateLimiterRegistry({}))
+        post_executor.bot_manager.load_bot = lambda platform, account=None: bot
+        post_executor.dead_letters = DeadLetterQueue(tmp_path / 'dead_letters.jsonl')
+
+        await post_executor.execute_post('Facebook', posts_df.iloc[0])
+        dead_letters = post_executor.dead_letters.entries()
+
+        bot.error = None
+        await post_executor.replay_dead_letters()
+        return post_executor, dead_letters
+
+    post_executor, dead_letters = asyncio.run(run())
+    assert [(entry['post_id'], entry['error_class'], entry['attempts']) for entry in dead_letters] == \
+           [(7, 'ValueError', 1)]
+    assert bot.logged == [(7, 'Error - ValueError: rejected')]
+    assert bot.posted == [7]
+    assert bot.journaled == [(7, 'Error', 1, 'ValueError'), (7, 'Posted', 1, None)]
+    assert post_executor.dead_letters.entries() == []
+
+
+def test_restart_restores_pending_posts_and_catches_up(tmp_path):
+    """Test that pending posts come back from the job store after a restart, overdue ones spread out."""
+    from task_management.scheduling.job_store import PostJobStore
+
+    now = datetime.now()
+    # Two posts are due later, two are overdue by hours, as if the service had been down
+    posts_df = pd.DataFrame({
+        'Post ID': [1, 2, 3, 4],
+        'Platform': ['Facebook', 'Instagram', 'Facebook', 'Instagram'],
+        'Content': ['one', 'two', 'three', 'four'],
+        'Image Path': ['img1'] * 4,
+        'Hashtags': ['#new'] * 4,
+        'Scheduled Time': [now + timedelta(hours=1), now + timedelta(hours=2),
+                           now - timedelta(hours=2), now - timedelta(hours=1)],
+        'Status': ['Scheduled'] * 4,
+    })
+    job_store = PostJobStore(tmp_path / 'state.db')
+    # Also left over from before the restart: a post overdue by days and a post that was posted
+    job_store.upsert_jobs('post_executor_test', [
+        (5, 'Facebook', now - timedelta(days=3), 5, {'Post ID': 5, 'Platform': 'Facebook', 'Content': 'five'}),
+        (6, 'Facebook', now - timedelta(hours=1), 6, {'Post ID': 6, 'Platform': 'Facebook', 'Content': 'six'}),
+    ])
+    job_store.mark_finished('post_executor_test', 6, 'posted')
+    bot = FlakyBot(None)
+
+    async def run():
+        # Before the restart
+        before = PostExecutor(Path('post_executor_test.xlsx'), posts_df, job_store=job_store)
+        await before.start()
+        before.shutdown()
+
+        after = PostExecutor(Path('post_executor_test.xlsx'), None, job_store=job_store)
+        after.bot_manager.load_bot = lambda platform, account=None: bot
+        after.restore()
+        restored = post_jobs(after)
+        restored_row = restored[after.job_id(1)].args[1]
+        # The workbook is parsed afterwards; the unchanged posts are left as restored
+        after.update_executor('post_executor_test.xlsx', posts_df)
+        jobs = post_jobs(after)
+        after.shutdown()
+        return after, restored, restored_row, jobs
+
+    after, restored, restored_row, jobs = asyncio.run(run())
+    job_id = after.job_id
+    assert set(restored) == set(jobs) == {job_id(1), job_id(2), job_id(3), job_id(4)}
+    assert jobs[job_id(1)].args[1] is restored_row
+    assert jobs[job_id(2)].run_date == now + timedelta(hours=2)
+    # Overdue posts are caught up from now on, one every 1 / catch_up_rate seconds, oldest first
+    catch_up_times = [jobs[job_id(post_id)].run_date for post_id in (3, 4)]
+    assert now <= catch_up_times[0] < now + timedelta(seconds=5)
+    assert (catch_up_times[1] - catch_up_times[0]).total_seconds() == pytest.approx(
+        1 / SCHEDULER_CONFIG['catch_up_rate'])
+    # Too old to catch up
+    assert bot.journaled == [(5, 'Missed', 0, None)]
+    assert job_store.job_states('post_executor_test') == {1: 'pending', 2: 'pending', 3: 'pending', 4: 'pending',
+                                                           5: 'missed', 6: 'posted'}
+
+
+def test_missed_post_of_unknown_platform_is_marked_failed():
+    """Test that a missed post without a bot is marked as failed, and the rest of the plan still scheduled."""
+    now = datetime.now()
+    posts_df = pd.DataFrame({
+        'Post ID': [1, 2],
+        'Platform': ['Myspace', 'Facebook'],
+        'Content': ['one', 'two'],
+        'Image Path': ['img1'] * 2,
+        'Hashtags': ['#new'] * 2,
+        'Scheduled Time': [now - timedelta(days=3), now + timedelta(hours=1)],
+        'Status': ['Scheduled'] * 2,
+    })
+    outcomes = []
+
+    async def run():
+        post_executor = PostExecutor(Path('post_executor_test.xlsx'), posts_df,
+                                     on_outcome=lambda *outcome: outcomes.append(outcome))
+        await post_executor.start()
+        jobs = post_jobs(post_executor)
+        post_executor.shutdown()
+        return post_executor, jobs
+
+    post_executor, jobs = asyncio.run(run())
+    assert set(jobs) == {post_executor.job_id(2)}
+    assert outcomes == [('post_executor_test', 'Myspace', 1, 'Error')]
+
+
+def test_posts_due_together_are_sent_in_one_batch():
+    """Test that posts of one platform and account due at the same time go out with one batch request, which
+    costs one rate limit token per post."""
+    from bot_manager.bot_core.http_client import http_client
+    from bot_manager.bot_core.mock_platform_server import MockPlatformServer
+
+    posts_df = pd.DataFrame({
+        'Post ID': range(1, 7),
+        'Platform': ['Facebook'] * 6,
+        'Content': [f'post {i}' for i in range(1, 7)],
+        'Scheduled Time': [datetime.now()] * 6,
+        'Status': ['Scheduled'] * 6,
+    })
+
+    # A bucket refilled too slowly to matter during the test
+    rate_limiter = RateLimiterRegistry({'platforms': {'facebook': {'rate': 0.001, 'burst': 100}}})
+
+    async def run():
+        server = MockPlatformServer()
+        http_client.base_url = await server.start()
+        try:
+            post_executor = PostExecutor(Path('post_executor_batch_test.xlsx'), posts_df,
+                                         rate_limiter=rate_limiter)
+            await asyncio.gather(*(post_executor.execute_post('Facebook', row) for _, row in posts_df.iterrows()))
+            return server.request_count, server.batch_count
+        finally:
+            await http_client.close()
+            await server.stop()
+            http_client.base_url = None
+
+    posted_before = POSTS.value('post_executor_batch_test', 'Facebook', 'Posted')
+    request_count, batch_count = asyncio.run(run())
+    assert request_count == batch_count == 1
+    assert rate_limiter.limiter('facebook').bucket.tokens == pytest.approx(94, abs=0.01)
+    # Every post still has its own outcome
+    assert POSTS.value('post_executor_batch_test', 'Facebook', 'Posted') - posted_before == 6
+
+
+def test_media_is_prefetched_and_broken_media_reported_early(tmp_path, monkeypatch):
+    """Test that the local media a bot uploads is read once, before the post is due, and a missing file fails
+    its post without retries, unless it is fixed before the post is due. Files the bot does not upload are never
+    read."""
+    from bot_manager.bot_core.http_client import http_client
+    from bot_manager.bot_core.media import MediaCache
+    from bot_manager.bot_core.mock_platform_server import MockPlatformServer
+    from social_media.dead_letter_queue import DeadLetterQueue
+
+    photo = tmp_path / 'photo.jpg'
+    photo.write_bytes(b'jpeg' * 100)
+    posts_df = pd.DataFrame({
+        'Post ID': [1, 2, 3, 4],
+        'Platform': ['Facebook'] * 4,
+        'Content': ['with photo', 'with missing photo', 'with photo and missing video', 'with photo added late'],
+        'Image Path': [str(photo), str(tmp_path / 'missing.jpg'), str(photo), str(tmp_path / 'late.jpg')],
+        # The Facebook bot does not upload videos
+        'Video': ['', '', str(tmp_path / 'missing.mp4'), ''],
+        'Scheduled Time': [datetime.now() + timedelta(seconds=1)] * 4,
+        'Status': ['Scheduled'] * 4,
+    })
+    reads = []
+    load = MediaCache.load
+
+    def counting_load(self, path):
+        reads.append(path)
+        return load(self, path)
+
+    monkeypatch.setattr(MediaCache, 'load', counting_load)
+
+    async def run():
+        server = MockPlatformServer()
+        http_client.base_url = await server.start()
+        try:
+            post_executor = PostExecutor(Path('post_executor_media_test.xlsx'), posts_df,
+                                         rate_limiter=RateLimiterRegistry({}))
+            post_executor.dead_letters = DeadLetterQueue(tmp_path / 'dead_letters.jsonl')
+            await post_executor.start()
+            await asyncio.sleep(0.5)
+            prefetched = post_executor.media.get(str(photo)), dict(post_executor.broken_media)
+            # Fixed after the warning, before the post is due
+            (tmp_path / 'late.jpg').write_bytes(b'jpeg' * 10)
+            await asyncio.wait_for(post_executor.wait_until_done(), timeout=10)
+            post_executor.shutdown()
+            return post_executor, prefetched, server.request_count
+        finally:
+            await http_client.close()
+            await server.stop()
+            http_client.base_url = None
+
+    post_executor, (media_file, broken_media), request_count = asyncio.run(run())
+    assert media_file.data == b'jpeg' * 100
+    assert sorted(broken_media) == [post_executor.job_id(2), post_executor.job_id(4)]
+    # The broken files are checked again when their posts are due
+    assert sorted(reads) == sorted([str(photo), str(photo)] + [str(tmp_path / 'missing.jpg')] * 2 +
+                                   [str(tmp_path / 'late.jpg')] * 2)
+    # Only the posts with a readable photo were uploaded
+    assert request_count == 3
+    assert [(entry['post_id'], entry['error_class'], entry['attempts'])
+            for entry in post_executor.dead_letters.entries()] == [(2, 'MediaError', 1)]
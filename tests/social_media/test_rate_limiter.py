@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import pytest
+
+from social_media.rate_limiter import RateLimiter, RateLimiterRegistry
+
+
+def test_max_in_flight_and_fifo_order():
+    """Test that no more than max_in_flight calls run at once and waiters are served in order."""
+    limiter = RateLimiter(max_in_flight=2)
+    started = []
+    peak = 0
+
+    async def call(i):
+        nonlocal peak
+        async with limiter.acquire():
+            started.append(i)
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(call(i) for i in range(10)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert started == list(range(10))
+    assert limiter.stats.count == 10
+    assert limiter.stats.max_wait > 0
+
+
+def test_token_bucket_rate():
+    """Test that calls beyond the burst are spread out at the configured rate."""
+    limiter = RateLimiter(rate=50.0, burst=2)
+
+    async def call():
+        async with limiter.acquire():
+            pass
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(call() for _ in range(7)))
+        return time.monotonic() - start
+
+    # 2 calls start at once, the other 5 wait 1/50 s each
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_registry_applies_platform_and_account_limits():
+    """Test that a call is limited by both its account's and its platform's limiter."""
+    registry = RateLimiterRegistry({
+        'platforms': {'facebook': {'max_in_flight': 3}},
+        'accounts': {'facebook:user1': {'max_in_flight': 1}, 'default': {}},
+    })
+    peaks = {'user1': 0, 'platform': 0}
+
+    async def call(account):
+        async with registry.acquire('Facebook', account):
+            if account == 'user1':
+                peaks['user1'] = max(peaks['user1'], registry.limiter('facebook', 'user1').in_flight)
+            peaks['platform'] = max(peaks['platform'], registry.limiter('facebook').in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(call(account) for account in ['user1', 'user2', None] * 4))
+
+    asyncio.run(run())
+    assert peaks == {'user1': 1, 'platform': 3}
+    assert set(registry.stats()) == {'facebook', 'facebook:user1', 'facebook:user2', 'facebook:default'}
+
+
+def test_waiting_calls_and_wait_times_reach_the_metrics_endpoint():
+    """Test that the callers waiting for a limiter and their wait times are served in the Prometheus text."""
+    import aiohttp
+
+    from metrics import MetricsServer, registry as metrics_registry
+
+    registry = RateLimiterRegistry({'platforms': {'metricsplatform': {'max_in_flight': 1}}})
+    release = asyncio.Event()
+
+    async def call():
+        async with registry.acquire('MetricsPlatform', 'user1'):
+            await release.wait()
+
+    async def scrape(session, url):
+        async with session.get(url) as response:
+            return await response.text()
+
+    async def run():
+        server = MetricsServer(metrics_registry)
+        url = await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                calls = [asyncio.create_task(call()) for _ in range(3)]
+                await asyncio.sleep(0.05)
+                while_waiting = await scrape(session, url)
+                release.set()
+                await asyncio.gather(*calls)
+                afterwards = await scrape(session, url)
+        finally:
+            await server.stop()
+        return while_waiting, afterwards
+
+    while_waiting, afterwards = asyncio.run(run())
+    # One call holds the platform's only slot; the other two wait for it
+    assert 'socialmedia_rate_limit_waiting{platform="metricsplatform",account="*"} 2' in while_waiting
+    assert 'socialmedia_rate_limit_waiting{platform="metricsplatform",account="*"} 0' in afterwards
+    assert 'socialmedia_rate_limit_wait_seconds_count{platform="metricsplatform",account="*"} 3' in afterwards
+    assert 'socialmedia_rate_limit_wait_seconds_count{platform="metricsplatform",account="user1"} 3' in afterwards
+
+
+def test_calls_costing_several_tokens():
+    """Test that a call costing several tokens takes them all, and one costing more than the burst waits for a
+    full bucket and leaves it in debt."""
+    limiter = RateLimiter(rate=20.0, burst=5)
+
+    async def run():
+        async with limiter.acquire(tokens=3):
+            pass
+        assert limiter.bucket.tokens == pytest.approx(2, abs=0.1)
+        start = time.monotonic()
+        async with limiter.acquire(tokens=8):  # Waits for 3 more tokens, at 20 per second
+            pass
+        waited = time.monotonic() - start
+        assert limiter.bucket.tokens == pytest.approx(-3, abs=0.1)
+        return waited
+
+    waited = asyncio.run(run())
+    assert 0.1 <= waited < 0.5
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from bot_manager.bot_core.errors import CredentialError, RateLimitError
+from social_media.dead_letter_queue import DeadLetterQueue
+from social_media.retry import RetryEngine, RetryPolicy
+
+
+@pytest.fixture
+def retry_engine():
+    """Fixture to create a retry engine without real waits."""
+    return RetryEngine.from_config({
+        'transient': {'max_attempts': 3, 'base_delay': 0.001, 'max_delay': 0.002},
+        'credential': {'max_attempts': 2, 'base_delay': 0.0, 'reauthenticate': True},
+    })
+
+
+def make_operation(errors):
+    """Returns an operation failing with the given errors, in order, before it succeeds."""
+    calls = []
+
+    async def operation():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return 'posted'
+
+    return operation, calls
+
+
+def test_backoff_grows_and_is_capped():
+    """Test the exponential backoff without jitter."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, multiplier=2.0, jitter=0.0)
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+    assert 0.0 <= RetryPolicy(base_delay=1.0, jitter=1.0).delay(1) <= 1.0
+
+
+def test_transient_errors_are_retried(retry_engine):
+    """Test that transient errors are retried until the operation succeeds."""
+    operation, calls = make_operation([RateLimitError(), ConnectionError()])
+    assert asyncio.run(retry_engine.run(operation)) == 'posted'
+    assert len(calls) == 3
+
+
+def test_transient_errors_give_up_after_max_attempts(retry_engine):
+    """Test that the last error is raised once the attempts are used up."""
+    operation, calls = make_operation([TimeoutError()] * 5)
+    with pytest.raises(TimeoutError):
+        asyncio.run(retry_engine.run(operation))
+    assert len(calls) == 3
+
+
+def test_credential_error_reauthenticates_and_retries_once(retry_engine):
+    """Test that a credential error refreshes the credentials before the single retry."""
+    refreshed = []
+    operation, calls = make_operation([CredentialError()])
+    assert asyncio.run(retry_engine.run(operation, reauthenticate=lambda: refreshed.append(True))) == 'posted'
+    assert refreshed == [True]
+
+    operation, calls = make_operation([CredentialError(), CredentialError()])
+    with pytest.raises(CredentialError):
+        asyncio.run(retry_engine.run(operation, reauthenticate=lambda: None))
+    assert len(calls) == 2
+
+
+def test_other_errors_are_not_retried(retry_engine):
+    """Test that errors without a policy fail right away."""
+    operation, calls = make_operation([ValueError('bad post')])
+    with pytest.raises(ValueError):
+        asyncio.run(retry_engine.run(operation))
+    assert len(calls) == 1
+
+
+def test_dead_letter_queue_round_trip(tmp_path):
+    """Test that dead-lettered posts are persisted and can be removed."""
+    queue = DeadLetterQueue(tmp_path / 'plan_dead_letters.jsonl')
+    queue.add('plan', 'Facebook', 1, CredentialError(), 2, {'Post ID': 1, 'Content': 'one'})
+    queue.add('plan', 'Instagram', 2, TimeoutError('slow'), 5, {'Post ID': 2, 'Content': 'two'})
+
+    entries = DeadLetterQueue(tmp_path / 'plan_dead_letters.jsonl').entries()
+    assert [(entry['post_id'], entry['error_class'], entry['attempts']) for entry in entries] == \
+           [(1, 'CredentialError', 2), (2, 'TimeoutError', 5)]
+    assert entries[0]['row'] == {'Post ID': 1, 'Content': 'one'}
+
+    queue.remove([1])
+    assert [entry['post_id'] for entry in queue.entries()] == [2]
@@ -5,7 +5,7 @@ from pandas.testing import assert_frame_equal
 
 import pytest
 # Adjust the import according to your project structure
-from scheduler.data_manager.excel_data_manager import ExcelDataManager
+from task_management.data_manager.excel_data_manager import ExcelDataManager
 
 
 # Create a fixture for the ExcelDataManager
@@ -102,3 +102,82 @@ def test_save_changes_to_excel(excel_manager):
     # Reload the file to verify changes
     reloaded_df = pd.read_excel(excel_manager.excel_file_path)
     assert reloaded_df.loc[reloaded_df['Post ID'] == 2, 'Status'].values[0] == 'Completed'
+
+
+def test_save_changes_to_excel_writes_only_changed_statuses(excel_manager):
+    """Test that saving touches only the statuses changed since the last load or save."""
+    from openpyxl import load_workbook
+
+    # Simulate an edit of Post ID 1 made in the file after it was loaded
+    workbook = load_workbook(excel_manager.excel_file_path)
+    workbook['Sheet1']['G2'] = 'Edited'
+    workbook.save(excel_manager.excel_file_path)
+
+    excel_manager.df.loc[excel_manager.df['Post ID'] == 2, 'Status'] = 'Completed'
+    assert excel_manager.get_dirty_statuses() == {2: 'Completed'}
+    assert excel_manager.save_changes_to_excel()
+    assert excel_manager.get_dirty_statuses() == {}
+
+    reloaded_df = pd.read_excel(excel_manager.excel_file_path)
+    assert reloaded_df['Status'].tolist() == ['Edited', 'Completed', 'Posted']
+
+    # A second save reuses the row index and writes only the new change
+    excel_manager.df.loc[excel_manager.df['Post ID'] == 3, 'Status'] = 'Error'
+    assert excel_manager.save_changes_to_excel()
+
+    reloaded_df = pd.read_excel(excel_manager.excel_file_path)
+    assert reloaded_df['Status'].tolist() == ['Edited', 'Completed', 'Error']
+
+
+def test_post_index_follows_dataframe_changes(excel_manager):
+    """Test that the date index is rebuilt when the DataFrame is replaced."""
+    assert excel_manager.load_current_date_posts()['Post ID'].tolist() == [2]
+
+    df = excel_manager.df.copy()
+    df.loc[df['Post ID'] == 1, 'Scheduled Time'] = datetime.now()
+    excel_manager.df = df
+
+    assert excel_manager.load_current_date_posts()['Post ID'].tolist() == [1, 2]
+
+
+def test_load_excel_data_uses_cache(temp_excel_file):
+    """Test that the sheet is loaded from the cache while it matches the Excel file."""
+    ExcelDataManager(excel_file_path=temp_excel_file)
+    cached_manager = ExcelDataManager(excel_file_path=temp_excel_file)
+    uncached_manager = ExcelDataManager(excel_file_path=temp_excel_file, use_cache=False)
+    assert_frame_equal(cached_manager.df, uncached_manager.df)
+
+    # Saved statuses are patched into the cache instead of invalidating it
+    cached_manager.df.loc[cached_manager.df['Post ID'] == 1, 'Status'] = 'Posted'
+    assert cached_manager.save_changes_to_excel()
+    assert cached_manager._plan_cache.is_fresh()
+    assert_frame_equal(ExcelDataManager(excel_file_path=temp_excel_file).df,
+                       ExcelDataManager(excel_file_path=temp_excel_file, use_cache=False).df)
+
+    # Any other change of the file makes the cache stale
+    df = pd.read_excel(temp_excel_file)
+    df.loc[df['Post ID'] == 3, 'Content'] = 'Edited content'
+    df.to_excel(temp_excel_file, index=False)
+    assert not cached_manager._plan_cache.is_fresh()
+    reloaded_manager = ExcelDataManager(excel_file_path=temp_excel_file)
+    assert reloaded_manager.df.loc[reloaded_manager.df['Post ID'] == 3, 'Content'].values[0] == 'Edited content'
+
+
+def test_edit_saved_while_parsing_is_not_cached(temp_excel_file, monkeypatch):
+    """Test that a sheet parsed while the file was edited is not cached, so the edit is read on the next load."""
+    read_excel = pd.read_excel
+
+    def read_excel_during_edit(*args, **kwargs):
+        df = read_excel(*args, **kwargs)
+        edited = df.copy()
+        edited.loc[edited['Post ID'] == 3, 'Content'] = 'Edited content'
+        edited.to_excel(temp_excel_file, index=False)
+        return df
+
+    monkeypatch.setattr(pd, 'read_excel', read_excel_during_edit)
+    manager = ExcelDataManager(excel_file_path=temp_excel_file)
+    monkeypatch.setattr(pd, 'read_excel', read_excel)
+
+    assert not manager._plan_cache.is_fresh()
+    reloaded_manager = ExcelDataManager(excel_file_path=temp_excel_file)
+    assert reloaded_manager.df.loc[reloaded_manager.df['Post ID'] == 3, 'Content'].values[0] == 'Edited content'
@@ -0,0 +1,71 @@
+import json
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from task_management.data_manager.journal_data_manager import JournalDataManager
+
+
+def outcome(post_id, status, ts):
+    return {'ts': ts, 'plan': 'plan', 'platform': 'Facebook', 'post_id': post_id, 'status': status,
+            'latency': 0.2, 'attempts': 1, 'error_class': None if status == 'Posted' else 'TransientError'}
+
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    """Fixture to create a journal with records on two days."""
+    journal_dir = tmp_path / 'journal' / 'plan'
+    journal_dir.mkdir(parents=True)
+    days = {
+        '2024-02-16': [outcome(1, 'Error', '2024-02-16T11:54:00.303'), outcome(2, 'Posted', '2024-02-16T11:54:00.318')],
+        '2024-02-17': [outcome(1, 'Posted', '2024-02-17T09:00:00.000'), outcome(3, 'Error', '2024-02-17T09:00:01.000')],
+    }
+    for day, records in days.items():
+        (journal_dir / f'{day}.jsonl').write_text(''.join(json.dumps(record) + '\n' for record in records))
+    return journal_dir
+
+
+def test_read_day_opens_only_that_day(journal_dir):
+    """Test that a day's records are read from its own file."""
+    journal_manager = JournalDataManager(journal_dir)
+    assert journal_manager.days() == [date(2024, 2, 16), date(2024, 2, 17)]
+    assert [record['post_id'] for record in journal_manager.read_day(date(2024, 2, 17))] == [1, 3]
+    assert journal_manager.read_day(date(2024, 2, 18)) == []
+
+
+def test_read_range(journal_dir):
+    """Test reading the records of a range of days, oldest first."""
+    journal_manager = JournalDataManager(journal_dir)
+    records = journal_manager.read_range(start=date(2024, 2, 16), end=date(2024, 2, 17))
+    assert [(record['post_id'], record['status']) for record in records] == [
+        (1, 'Error'), (2, 'Posted'), (1, 'Posted'), (3, 'Error')]
+    assert len(journal_manager.read_range(start=date(2024, 2, 17))) == 2
+
+
+def test_partial_last_line_is_skipped(journal_dir):
+    """Test that a record still being written does not break reading the day."""
+    with open(journal_dir / '2024-02-17.jsonl', 'a') as journal_file:
+        journal_file.write('{"ts": "2024-02-17T09:00:02.000", "plan": "pl')
+
+    assert len(JournalDataManager(journal_dir).read_day(date(2024, 2, 17))) == 2
+
+
+def test_update_df_from_journal(journal_dir):
+    """Test that the last journaled status of each post is applied."""
+    df = pd.DataFrame({'Post ID': [1, 2, 3, 4], 'Status': ['Scheduled'] * 4})
+    updated_df = JournalDataManager(journal_dir).update_df_from_journal(df)
+    assert list(updated_df['Status']) == ['Posted', 'Posted', 'Error', 'Scheduled']
+
+
+def test_update_df_from_journal_only_today(tmp_path):
+    """Test that only today's file is read when asked to."""
+    journal_dir = tmp_path / 'journal'
+    journal_dir.mkdir()
+    today = datetime.now().date()
+    (journal_dir / '2000-01-01.jsonl').write_text(json.dumps(outcome(1, 'Error', '2000-01-01T10:00:00')) + '\n')
+    (journal_dir / f'{today.isoformat()}.jsonl').write_text(json.dumps(outcome(2, 'Posted', today.isoformat())) + '\n')
+
+    df = pd.DataFrame({'Post ID': [1, 2], 'Status': ['Scheduled', 'Scheduled']})
+    updated_df = JournalDataManager(journal_dir).update_df_from_journal(df, only_today=True)
+    assert list(updated_df['Status']) == ['Scheduled', 'Posted']
@@ -2,7 +2,7 @@ import pytest
 from pathlib import Path
 import pandas as pd
 from datetime import datetime, timedelta
-from scheduler.data_manager.log_data_manager import LogDataManager  # Adjust the import path according to your project structure
+from task_management.data_manager.log_data_manager import LogDataManager
 
 
 @pytest.fixture
@@ -37,3 +37,75 @@ def test_update_df_from_logs(sample_log_file, sample_df):
     # Define expected outcomes based on the log file content
     expected_statuses = ['Posted', 'Posted', 'Error', 'Error']
     assert all(updated_df['Status'] == expected_statuses), "The statuses should be updated according to the log file."
+
+
+def test_read_new_logs_reads_only_appended_lines(sample_log_file):
+    """Test that the tailing reader parses only the lines appended since the committed checkpoint."""
+    log_manager = LogDataManager(log_file_path=sample_log_file)
+    assert [entry['post_id'] for entry in log_manager.read_new_logs()] == [1, 2, 3, 4]
+    log_manager.commit_checkpoint()
+
+    with open(sample_log_file, 'a') as log_file:
+        log_file.write("2024-02-17 09:00:00,000 - DEBUG - plan.xlsx - Facebook - Post ID: 5 - Posted - message from app\n")
+        # A partially written line is left for the next call
+        log_file.write("2024-02-17 09:00:01,000 - DEBUG - plan.xlsx - Facebook - Post ID: 6 - Pos")
+
+    assert log_manager.read_new_logs() == [{'post_id': 5, 'status': 'Posted'}]
+    log_manager.commit_checkpoint()
+
+    with open(sample_log_file, 'a') as log_file:
+        log_file.write("ted - message from app\n")
+
+    # A new manager resumes from the persisted checkpoint
+    assert LogDataManager(log_file_path=sample_log_file).read_new_logs() == [{'post_id': 6, 'status': 'Posted'}]
+
+
+def test_read_new_logs_uncommitted_entries_are_read_again(sample_log_file):
+    """Test that entries are returned again until the checkpoint is committed."""
+    log_manager = LogDataManager(log_file_path=sample_log_file)
+    assert len(log_manager.read_new_logs()) == 4
+    assert len(log_manager.read_new_logs()) == 4
+
+
+def test_read_new_logs_after_truncation(sample_log_file):
+    """Test that a truncated log file is read again from its start."""
+    log_manager = LogDataManager(log_file_path=sample_log_file)
+    log_manager.read_new_logs()
+    log_manager.commit_checkpoint()
+
+    sample_log_file.write_text(
+        "2024-02-17 09:00:00,000 - DEBUG - plan.xlsx - Instagram - Post ID: 7 - Error - message from app\n")
+
+    assert log_manager.read_new_logs() == [{'post_id': 7, 'status': 'Error'}]
+
+
+def test_read_new_logs_after_rotation(sample_log_file):
+    """Test that the rest of a rotated log file is read before the new log file."""
+    log_manager = LogDataManager(log_file_path=sample_log_file)
+    log_manager.read_new_logs()
+    log_manager.commit_checkpoint()
+
+    with open(sample_log_file, 'a') as log_file:
+        log_file.write("2024-02-17 09:00:00,000 - DEBUG - plan.xlsx - Facebook - Post ID: 8 - Posted - message from app\n")
+    sample_log_file.rename(sample_log_file.with_name(sample_log_file.name + '.1'))
+    sample_log_file.write_text(
+        "2024-02-17 09:05:00,000 - DEBUG - plan.xlsx - Facebook - Post ID: 9 - Posted - message from app\n")
+
+    assert [entry['post_id'] for entry in log_manager.read_new_logs()] == [8, 9]
+
+
+def test_update_df_from_logs_last_entry_wins(tmp_path):
+    """Test that the last logged status of a post is applied and unknown posts are ignored."""
+    log_file = tmp_path / "sample.log"
+    log_file.write_text("""\
+2024-02-16 11:54:00,303 - DEBUG - plan.xlsx - Facebook - Post ID: 1 - Error - message from app
+2024-02-16 11:55:00,303 - DEBUG - plan.xlsx - Facebook - Post ID: 1 - Posted - message from app
+2024-02-16 11:56:00,303 - DEBUG - plan.xlsx - Facebook - Post ID: 9 - Posted - message from app
+2024-02-16 11:57:00,303 - DEBUG - plan.xlsx - Instagram - Post ID: 2 - Posted - message from app
+2024-02-16 11:58:00,303 - DEBUG - plan.xlsx - Instagram - Post ID: 2 - Error - message from app
+""")
+    df = pd.DataFrame({'Post ID': [1, 2, 3], 'Status': ['Scheduled', 'Scheduled', 'Scheduled']})
+
+    updated_df = LogDataManager(log_file_path=log_file).update_df_from_logs(df)
+
+    assert updated_df['Status'].tolist() == ['Posted', 'Error', 'Scheduled']
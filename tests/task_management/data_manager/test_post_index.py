@@ -0,0 +1,38 @@
+import pandas as pd
+from datetime import datetime, date
+
+import pytest
+from task_management.data_manager.post_index import ScheduledPostIndex
+
+
+@pytest.fixture
+def posts_df():
+    """Fixture to create posts scheduled out of order, including one without a scheduled time."""
+    return pd.DataFrame({
+        'Post ID': [1, 2, 3, 4, 5],
+        'Scheduled Time': pd.to_datetime(['2024-02-17 09:00', '2024-02-16 23:59', '2024-02-16 08:00',
+                                          None, '2024-02-16 12:00']),
+        'Status': ['Scheduled'] * 5,
+    })
+
+
+def test_posts_for_date(posts_df):
+    """Test that posts of a date are returned in DataFrame order."""
+    index = ScheduledPostIndex(posts_df)
+    assert index.posts_for_date(date(2024, 2, 16))['Post ID'].tolist() == [2, 3, 5]
+    assert index.posts_for_date(date(2024, 2, 18)).empty
+    assert len(index) == 4
+
+
+def test_posts_in_window(posts_df):
+    """Test that the window includes its start and excludes its end."""
+    index = ScheduledPostIndex(posts_df)
+    window = index.posts_in_window(datetime(2024, 2, 16, 8, 0), datetime(2024, 2, 16, 23, 59))
+    assert window['Post ID'].tolist() == [3, 5]
+
+
+def test_next_due(posts_df):
+    """Test that the next due posts are ordered by scheduled time."""
+    index = ScheduledPostIndex(posts_df)
+    assert index.next_due(2, now=datetime(2024, 2, 16, 9, 0))['Post ID'].tolist() == [5, 2]
+    assert index.next_due(10, now=datetime(2024, 2, 17, 9, 0))['Post ID'].tolist() == [1]
@@ -0,0 +1,82 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from task_management.data_manager.post_state_store import PostStateStore
+
+
+@pytest.fixture
+def plan_df():
+    return pd.DataFrame({
+        'Post ID': [1, 2, 3],
+        'Platform': ['Facebook', 'Instagram', 'Facebook'],
+        'Content': ['one', 'two', 'three'],
+        'Scheduled Time': [datetime(2024, 2, 16, 11), datetime(2024, 2, 16, 9), datetime(2024, 2, 17, 10)],
+        'Status': ['Scheduled', 'Scheduled', 'Scheduled'],
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PostStateStore(tmp_path / 'state.db')
+    yield store
+    store.close()
+
+
+def test_import_only_writes_changed_rows(store, plan_df):
+    """Test that a re-import of the workbook only touches new, edited and removed rows."""
+    assert store.import_dataframe('plan', plan_df) == {'inserted': 3, 'updated': 0, 'deleted': 0, 'statuses': 0}
+    assert store.import_dataframe('plan', plan_df) == {'inserted': 0, 'updated': 0, 'deleted': 0, 'statuses': 0}
+
+    edited = plan_df.copy()
+    edited.loc[0, 'Content'] = 'one, edited'
+    edited = pd.concat([edited[edited['Post ID'] != 3], plan_df.iloc[[2]].assign(**{'Post ID': 4})])
+    assert store.import_dataframe('plan', edited) == {'inserted': 1, 'updated': 1, 'deleted': 1, 'statuses': 0}
+    assert store.load_posts('plan')['Content'].tolist() == ['two', 'one, edited', 'three']
+
+
+def test_statuses_are_kept_until_edited_in_the_workbook(store, plan_df):
+    """Test that runtime statuses survive re-imports, while statuses edited in the workbook win."""
+    store.import_dataframe('plan', plan_df)
+    store.set_status('plan', 1, 'Posted')
+    store.set_statuses('plan', {2: 'Error'})
+
+    # The workbook still says 'Scheduled', as it was not exported yet
+    store.import_dataframe('plan', plan_df)
+    assert store.dirty_statuses('plan') == {1: 'Posted', 2: 'Error'}
+
+    store.mark_exported('plan', {1: 'Posted', 2: 'Error'})
+    assert store.dirty_statuses('plan') == {}
+
+    # Post 2 is set back to 'Scheduled' in the workbook to post it again
+    retried = plan_df.assign(Status=['Posted', 'Scheduled', 'Scheduled'])
+    assert store.import_dataframe('plan', retried)['statuses'] == 1
+    assert store.load_posts('plan').set_index('Post ID')['Status'].to_dict() == {
+        1: 'Posted', 2: 'Scheduled', 3: 'Scheduled'}
+
+
+def test_posts_for_date(store, plan_df):
+    """Test that a day's posts are loaded in order of their scheduled time, with the workbook's columns."""
+    store.import_dataframe('plan', plan_df)
+    store.import_dataframe('other_plan', plan_df)
+    store.set_status('plan', 1, 'Posted')
+
+    df = store.posts_for_date('plan', date(2024, 2, 16))
+    assert df.columns.tolist() == plan_df.columns.tolist()
+    assert df['Post ID'].tolist() == [2, 1]
+    assert df['Status'].tolist() == ['Scheduled', 'Posted']
+    assert df['Scheduled Time'].tolist() == [pd.Timestamp('2024-02-16 09:00'), pd.Timestamp('2024-02-16 11:00')]
+    assert store.posts_for_date('plan', date(2024, 2, 18)).empty
+    assert store.load_posts('plan', status='Posted')['Post ID'].tolist() == [1]
+
+
+def test_set_status_does_not_wait_for_the_database(store, plan_df):
+    """Test that statuses are recorded while the database is busy, and read back once they are committed."""
+    store.import_dataframe('plan', plan_df)
+
+    with store._lock:  # e.g. an import or export in a worker thread
+        store.set_status('plan', 1, 'Posted')
+        store.set_status('plan', 2, 'Error')
+
+    assert store.dirty_statuses('plan') == {1: 'Posted', 2: 'Error'}
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from task_management.scheduling.job_store import PostJobStore
+
+
+def test_pending_jobs_survive_reopening(tmp_path):
+    """Test that jobs are read back by (plan, Post ID) from a new connection, earliest first."""
+    database_path = tmp_path / 'state.db'
+    store = PostJobStore(database_path)
+    row = {'Post ID': 2, 'Platform': 'Facebook', 'Content': 'two'}
+    store.upsert_jobs('plan', [
+        (np.int64(2), 'Facebook', pd.Timestamp('2024-02-16 12:00'), 2 ** 64 - 1, row),
+        (np.int64(1), 'Instagram', pd.Timestamp('2024-02-16 11:00'), 7, {'Post ID': 1}),
+    ])
+    store.upsert_jobs('other_plan', [(1, 'Facebook', datetime(2024, 2, 16, 10), 3, {'Post ID': 1})])
+    store.close()
+
+    jobs = PostJobStore(database_path).pending_jobs('plan')
+    assert [job['post_id'] for job in jobs] == [1, 2]
+    assert jobs[1]['platform'] == 'Facebook'
+    assert jobs[1]['scheduled_time'] == pd.Timestamp('2024-02-16 12:00')
+    assert jobs[1]['row_hash'] == 2 ** 64 - 1
+    assert jobs[1]['row']['Content'] == 'two'
+    assert jobs[1]['row']['Scheduled Time'] == pd.Timestamp('2024-02-16 12:00')
+
+
+def test_finished_and_removed_jobs_are_not_pending(tmp_path):
+    """Test that finished jobs keep their state and removed jobs are gone."""
+    store = PostJobStore(tmp_path / 'state.db')
+    store.upsert_jobs('plan', [(post_id, 'Facebook', datetime(2024, 2, 16, 10), post_id, {}) for post_id in (1, 2, 3)])
+    store.mark_finished('plan', np.int64(1), 'posted')
+    store.remove_jobs('plan', [2])
+
+    assert [job['post_id'] for job in store.pending_jobs('plan')] == [3]
+    assert store.job_states('plan') == {1: 'posted', 3: 'pending'}
+
+    # Scheduling a finished post again makes it pending again
+    store.upsert_jobs('plan', [(1, 'Facebook', datetime(2024, 2, 17, 10), 1, {})])
+    assert store.job_states('plan') == {1: 'pending', 3: 'pending'}
+
+
+def test_writes_do_not_wait_for_the_database(tmp_path):
+    """Test that writes return while the database is busy, and are committed together once it is free."""
+    store = PostJobStore(tmp_path / 'state.db')
+    store.upsert_jobs('plan', [(post_id, 'Facebook', datetime(2024, 2, 16, 10), post_id, {'Post ID': post_id})
+                               for post_id in range(1, 4)])
+    store.flush()
+
+    with store._lock:  # e.g. a long transaction of the writer thread
+        for post_id in range(1, 3):
+            store.mark_finished('plan', post_id, 'posted')
+        store.remove_jobs('plan', [3])
+
+    assert store.job_states('plan') == {1: 'posted', 2: 'posted'}
+    store.close()
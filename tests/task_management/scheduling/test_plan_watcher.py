@@ -0,0 +1,49 @@
+import asyncio
+
+from task_management.scheduling.plan_watcher import PlanFileWatcher
+
+
+def test_plan_watcher_reports_changes(tmp_path):
+    """Test that the watcher calls back once per change of the file."""
+    plan_file = tmp_path / "plan.xlsx"
+    plan_file.write_text("v1")
+    changes = []
+
+    async def on_change():
+        changes.append(plan_file.read_text())
+
+    async def run():
+        watcher = PlanFileWatcher(plan_file, on_change, poll_interval=0.05)
+        watcher.start()
+        await asyncio.sleep(0.2)
+        plan_file.write_text("version 2")
+        await asyncio.sleep(0.5)
+        await watcher.stop()
+
+    asyncio.run(run())
+    assert changes == ["version 2"]
+
+
+def test_plan_watcher_ignores_own_writes(tmp_path):
+    """Test that a write made within own_write is not reported, and a later outside edit is."""
+    plan_file = tmp_path / "plan.xlsx"
+    plan_file.write_text("v1")
+    changes = []
+
+    async def on_change():
+        changes.append(plan_file.read_text())
+
+    async def run():
+        watcher = PlanFileWatcher(plan_file, on_change, poll_interval=0.05)
+        watcher.start()
+        await asyncio.sleep(0.2)
+        with watcher.own_write():
+            plan_file.write_text("exported")
+            await asyncio.sleep(0.2)
+        await asyncio.sleep(0.3)
+        plan_file.write_text("edited by the user")
+        await asyncio.sleep(0.5)
+        await watcher.stop()
+
+    asyncio.run(run())
+    assert changes == ["edited by the user"]
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from task_management.scheduling.post_dispatcher import JOB_ERROR, JOB_EXECUTED, JOB_MISSED, PostDispatcher
+
+
+def test_jobs_run_in_order_of_their_run_dates():
+    """Test that jobs run when due, earliest first, including rescheduled and replaced ones, and not removed ones."""
+    ran = []
+    events = []
+
+    async def job(name):
+        ran.append(name)
+        if name == 'fails':
+            raise ValueError(name)
+
+    async def run():
+        dispatcher = PostDispatcher(misfire_grace_time=60)
+        dispatcher.add_listener(lambda event: events.append((event.code, event.job_id)))
+        now = datetime.now()
+        dispatcher.add_job('c', now + timedelta(seconds=0.06), job, ['c'])
+        dispatcher.add_job('a', now + timedelta(seconds=0.02), job, ['a'])
+        dispatcher.add_job('removed', now + timedelta(seconds=0.01), job, ['removed'])
+        dispatcher.add_job('b', now + timedelta(hours=1), job, ['b'])
+        dispatcher.add_job('fails', now + timedelta(seconds=0.08), job, ['fails'])
+        dispatcher.add_job('missed', now - timedelta(minutes=5), job, ['missed'])
+        dispatcher.start()
+        dispatcher.remove_job('removed')
+        dispatcher.reschedule_job('b', now + timedelta(seconds=0.04))
+        dispatcher.add_job('c', now + timedelta(seconds=0.05), job, ['c, replaced'])
+        with pytest.raises(KeyError):
+            dispatcher.remove_job('removed')
+        await asyncio.sleep(0.2)
+        remaining = len(dispatcher)
+        dispatcher.shutdown()
+        return remaining
+
+    assert asyncio.run(run()) == 0
+    assert ran == ['a', 'b', 'c, replaced', 'fails']
+    assert events == [(JOB_MISSED, 'missed'), (JOB_EXECUTED, 'a'), (JOB_EXECUTED, 'b'), (JOB_EXECUTED, 'c'),
+                      (JOB_ERROR, 'fails')]
+
+
+def test_stale_entries_are_compacted():
+    """Test that rescheduling many times does not grow the heap without bound."""
+    async def job():
+        pass
+
+    dispatcher = PostDispatcher()
+    later = datetime.now() + timedelta(hours=1)
+    for i in range(100):
+        dispatcher.add_job(str(i), later, job)
+    for minutes in range(100):
+        for i in range(100):
+            dispatcher.reschedule_job(str(i), later + timedelta(minutes=minutes))
+    assert len(dispatcher) == 100
+    assert len(dispatcher._heap) < 2 * 100 + 1000
+    assert [job.id for job in dispatcher.get_jobs()][:3] == ['0', '1', '2']
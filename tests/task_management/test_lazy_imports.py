@@ -0,0 +1,29 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def imported_modules(statement: str):
+    """Runs an import statement in a fresh interpreter and returns the names of the modules it loaded."""
+    result = subprocess.run([sys.executable, '-c', f'import sys; {statement}; print(" ".join(sys.modules))'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_importing_task_management_does_not_load_heavy_dependencies():
+    modules = imported_modules('import task_management')
+    for heavy in ('pandas', 'openpyxl', 'apscheduler', 'rich'):
+        assert heavy not in modules
+
+
+def test_logger_config_has_no_import_side_effects():
+    modules = imported_modules('import logger_config, logging; assert not logging.getLogger().handlers')
+    assert 'rich' not in modules
+
+
+def test_lazy_attributes_are_loaded_on_access():
+    modules = imported_modules('from task_management import ExcelDataManager')
+    assert 'pandas' in modules
+    assert 'task_management.data_manager.excel_data_manager' in modules
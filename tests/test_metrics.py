@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import aiohttp
+
+from metrics import MetricsRegistry, MetricsServer, timed
+
+
+def test_histogram_buckets_are_cumulative_in_the_prometheus_text():
+    registry = MetricsRegistry()
+    latency = registry.histogram('test_latency_seconds', 'Latency.', ('platform',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value, 'Facebook')
+
+    text = registry.render_prometheus()
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert 'test_latency_seconds_bucket{platform="Facebook",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{platform="Facebook",le="1.0"} 3' in text
+    assert 'test_latency_seconds_bucket{platform="Facebook",le="+Inf"} 4' in text
+    assert 'test_latency_seconds_count{platform="Facebook"} 4' in text
+    assert 'test_latency_seconds_sum{platform="Facebook"} 6.05' in text
+
+
+def test_counters_gauges_and_timers(tmp_path):
+    registry = MetricsRegistry()
+    posts = registry.counter('test_posts_total', 'Posts.', ('status',))
+    in_flight = registry.gauge('test_in_flight', 'In flight.')
+    seconds = registry.histogram('test_job_seconds', 'Jobs.', ('job',))
+    assert registry.counter('test_posts_total', 'Posts.', ('status',)) is posts
+
+    posts.inc('Posted')
+    posts.inc('Posted', amount=2)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    @timed(seconds, 'sync')
+    def sync_job():
+        return 1
+
+    @timed(seconds, 'async')
+    async def async_job():
+        return 2
+
+    assert sync_job() == 1
+    assert asyncio.run(async_job()) == 2
+    assert posts.value('Posted') == 3
+    assert in_flight.value() == 1
+    assert seconds.count('sync') == seconds.count('async') == 1
+
+    dump_path = tmp_path / 'metrics.json'
+    registry.dump_json(dump_path)
+    dumped = json.loads(dump_path.read_text())['metrics']
+    assert dumped['test_posts_total']['series'] == [{'labels': {'status': 'Posted'}, 'value': 3.0}]
+    assert dumped['test_job_seconds']['type'] == 'histogram'
+
+
+def test_metrics_server_serves_prometheus_text_and_json():
+    registry = MetricsRegistry()
+    registry.counter('test_posts_total', 'Posts.').inc()
+
+    async def run():
+        server = MetricsServer(registry)
+        url = await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as response:
+                    text = await response.text()
+                    content_type = response.headers['Content-Type']
+                async with session.get(url + '.json') as response:
+                    data = await response.json()
+        finally:
+            await server.stop()
+        return text, content_type, data
+
+    text, content_type, data = asyncio.run(run())
+    assert content_type.startswith('text/plain; version=0.0.4')
+    assert 'test_posts_total 1.0' in text
+    assert data['test_posts_total']['series'][0]['value'] == 1.0
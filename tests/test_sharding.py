@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+from sharding import ShardCoordinator, assign_plans, scale_rate_limits
+
+
+def test_assign_plans_is_stable_and_balanced():
+    """Test that plans are spread evenly and always to the same worker."""
+    plan_paths = [Path(f'plan_{i}.xlsx') for i in range(7)]
+    assignments = assign_plans(plan_paths, 3)
+    assert [len(plans) for plans in assignments] == [3, 2, 2]
+    assert assign_plans(list(reversed(plan_paths)), 3) == assignments
+    assert sorted(sum(assignments, []), key=str) == plan_paths
+    # More workers than plans leaves no empty workers
+    assert len(assign_plans(plan_paths[:2], 4)) == 2
+
+
+def test_scale_rate_limits_divides_limits_among_workers():
+    """Test that the workers' limits add up to the configured limits."""
+    config = {'platforms': {'facebook': {'max_in_flight': 10, 'rate': 10.0, 'burst': 20}, 'instagram': None},
+              'accounts': {'default': {'max_in_flight': 1, 'rate': None}}}
+    shares = [scale_rate_limits(config, 4, worker_id) for worker_id in range(4)]
+    assert [scaled['platforms']['facebook']['max_in_flight'] for scaled in shares] == [3, 3, 2, 2]
+    assert sum(scaled['platforms']['facebook']['max_in_flight'] for scaled in shares) == 10
+    assert sum(scaled['platforms']['facebook']['rate'] for scaled in shares) == 10.0
+    assert sum(scaled['platforms']['facebook']['burst'] for scaled in shares) == 20
+    assert all(scaled['platforms']['instagram'] is None for scaled in shares)
+    # Too small to divide; every worker keeps one
+    assert all(scaled['accounts']['default'] == {'max_in_flight': 1, 'rate': None} for scaled in shares)
+
+
+def crash_once_worker(worker_id, plan_paths, status_queue, known_statuses, num_workers, marker_dir):
+    """Reports post 1 of each plan, crashes on its first run, and reports post 2 once restarted."""
+    marker = Path(marker_dir) / f'worker_{worker_id}'
+    if not marker.exists():
+        for plan_path in plan_paths:
+            status_queue.put((worker_id, plan_path.stem, 1, 'Posted'))
+        marker.touch()
+        status_queue.close()
+        status_queue.join_thread()
+        os._exit(1)
+    for plan_path in plan_paths:
+        # The restarted worker knows what it completed before the crash
+        assert known_statuses[plan_path.stem] == {1: 'Posted'}
+        status_queue.put((worker_id, plan_path.stem, 2, 'Posted'))
+
+
+def test_crashed_worker_is_restarted_with_its_plans(tmp_path):
+    """Test that a crashed worker is restarted with the same plans and the statuses it reported."""
+    from functools import partial
+
+    plan_paths = [Path('plan_a.xlsx'), Path('plan_b.xlsx'), Path('plan_c.xlsx')]
+    coordinator = ShardCoordinator(plan_paths, 2, target=partial(crash_once_worker, marker_dir=str(tmp_path)),
+                                   restart_delay=0)
+    coordinator.start()
+    coordinator.run()
+    coordinator.stop()
+
+    assert coordinator.restarts == {0: 1, 1: 1}
+    assert all(process.exitcode == 0 for process in coordinator.processes.values())
+    assert coordinator.statuses == {plan: {1: 'Posted', 2: 'Posted'} for plan in ('plan_a', 'plan_b', 'plan_c')}